@@ -0,0 +1,256 @@
+# The MIT License (MIT)
+# Copyright © 2024 Apollo
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+import asyncio
+import statistics
+import time
+from typing import Any, Dict, List, Optional, Type
+
+import bittensor as bt
+
+from api.get_query_axons import candidate_uids
+from api.hedge import HedgedAPI
+from base.dendrite import PooledDendrite, changed_endpoints
+
+
+class AxonPool:
+    """
+    The live API axons, ranked by their recent success rate over their latency.
+    Entries are keyed by hotkey, so a uid taken over by a new hotkey starts over.
+    """
+
+    def __init__(self, decay: float = 0.2):
+        self.decay = decay
+        self.entries: Dict[str, Dict] = {}
+
+    def update(
+        self,
+        metagraph: "bt.metagraph",
+        uids: List[int],
+        latencies: Dict[int, Optional[float]],
+    ):
+        """
+        Replaces the pool with `uids`, keeping the record of known hotkeys.
+        A latency of None marks a uid that did not answer the ping.
+        """
+        known = [entry["latency"] for entry in self.entries.values()]
+        entries = {}
+        for uid in uids:
+            hotkey = metagraph.hotkeys[uid]
+            entry = self.entries.get(hotkey)
+            if entry is None:
+                # Ping latency is no estimate of proof latency, start at the median.
+                latency = statistics.median(known) if known else latencies[uid]
+                entry = {"success": 1.0, "latency": latency or 0.0}
+            elif latencies[uid] is not None:
+                # Let axons that failed recently recover while they stay reachable.
+                entry["success"] += self.decay * (1.0 - entry["success"])
+            entry["uid"] = uid
+            entry["axon"] = metagraph.axons[uid]
+            entry["alive"] = latencies[uid] is not None
+            entries[hotkey] = entry
+        self.entries = entries
+
+    def record(self, response: "bt.Synapse", ok: bool):
+        entry = self.entries.get(response.axon.hotkey)
+        if entry is None:
+            return
+        entry["success"] += self.decay * (float(ok) - entry["success"])
+        if ok and response.dendrite.process_time is not None:
+            latency = float(response.dendrite.process_time)
+            entry["latency"] += self.decay * (latency - entry["latency"])
+
+    def live(self) -> List[Dict]:
+        """The reachable entries, best first."""
+        return sorted(
+            (entry for entry in self.entries.values() if entry["alive"]),
+            key=lambda entry: entry["success"] / max(entry["latency"], 1e-3),
+            reverse=True,
+        )
+
+    def best(self, k: int) -> List["bt.AxonInfo"]:
+        return [entry["axon"] for entry in self.live()[:k]]
+
+
+class ApiClient:
+    """
+    A long-lived client for the subnet APIs. It keeps a metagraph snapshot for
+    `metagraph_ttl` seconds and a pool of live API axons that is refreshed in the
+    background every `refresh_interval` seconds, so a query only picks the best
+    ranked axons from the pool instead of syncing and pinging first.
+
+        async with ApiClient(wallet, netuid) as client:
+            commitment = await commit(poly, wallet, client=client)
+    """
+
+    def __init__(
+        self,
+        wallet: "bt.wallet",
+        netuid: int,
+        subtensor: "bt.Subtensor" = None,
+        chain_endpoint: str = None,
+        metagraph_ttl: float = 600.0,
+        refresh_interval: float = 60.0,
+        ping_timeout: float = 3.0,
+        n: float = 0.1,
+        dendrite: Optional["bt.dendrite"] = None,
+        verifier: Optional[Any] = None,
+    ):
+        self.wallet = wallet
+        self.netuid = netuid
+        self.subtensor = subtensor
+        self.chain_endpoint = chain_endpoint
+        self.metagraph_ttl = metagraph_ttl
+        self.refresh_interval = refresh_interval
+        self.ping_timeout = ping_timeout
+        self.n = n
+        self.dendrite = dendrite or PooledDendrite(wallet)
+        # A local prover client the handlers verify responses with.
+        self.verifier = verifier
+        self.pool = AxonPool()
+        self.handlers: Dict[Type[HedgedAPI], HedgedAPI] = {}
+        self.snapshot: Optional["bt.metagraph"] = None
+        self.synced_at = 0.0
+        self.refreshed_at = float("-inf")
+        # Created on first use, so it binds to the loop the client runs on (Python < 3.10).
+        self.refresh_lock: Optional[asyncio.Lock] = None
+        self.refresh_task: Optional[asyncio.Task] = None
+
+    async def __aenter__(self) -> "ApiClient":
+        self.start()
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    def sync_metagraph(self) -> "bt.metagraph":
+        if self.subtensor is None:
+            self.subtensor = bt.Subtensor(chain_endpoint=self.chain_endpoint)
+        return self.subtensor.metagraph(self.netuid)
+
+    async def metagraph(self) -> "bt.metagraph":
+        """The metagraph snapshot, synced again once it is older than the TTL."""
+        if (
+            self.snapshot is None
+            or time.monotonic() - self.synced_at > self.metagraph_ttl
+        ):
+            loop = asyncio.get_running_loop()
+            metagraph = await loop.run_in_executor(None, self.sync_metagraph)
+            if self.snapshot is not None and isinstance(self.dendrite, PooledDendrite):
+                self.dendrite.recycle(
+                    changed_endpoints(self.snapshot.axons, metagraph.axons)
+                )
+            self.snapshot, self.synced_at = metagraph, time.monotonic()
+        return self.snapshot
+
+    async def ping(
+        self, metagraph: "bt.metagraph", uids: List[int]
+    ) -> Dict[int, Optional[float]]:
+        """Pings `uids`, returning their latency or None if they did not answer."""
+        responses = await asyncio.gather(
+            *(
+                self.dendrite.call(
+                    target_axon=metagraph.axons[uid],
+                    synapse=bt.Synapse(),
+                    timeout=self.ping_timeout,
+                    deserialize=False,
+                )
+                for uid in uids
+            ),
+            return_exceptions=True,
+        )
+        latencies = {}
+        for uid, response in zip(uids, responses):
+            ok = (
+                not isinstance(response, BaseException)
+                and response.dendrite.status_code == 200
+            )
+            latencies[uid] = float(response.dendrite.process_time or 0) if ok else None
+        return latencies
+
+    async def refresh(self, max_age: float = 0.0):
+        """
+        Syncs the metagraph if stale and pings the candidate API axons, unless
+        the pool was refreshed within the last `max_age` seconds.
+        """
+        if self.refresh_lock is None:
+            self.refresh_lock = asyncio.Lock()
+        async with self.refresh_lock:
+            if time.monotonic() - self.refreshed_at < max_age:
+                return
+            try:
+                metagraph = await self.metagraph()
+                uids = candidate_uids(metagraph, n=self.n)
+                self.pool.update(metagraph, uids, await self.ping(metagraph, uids))
+                bt.logging.debug(
+                    f"API axon pool: {len(self.pool.live())} live of {len(uids)} candidates"
+                )
+            finally:
+                self.refreshed_at = time.monotonic()
+
+    async def run(self):
+        while True:
+            try:
+                await self.refresh(max_age=self.refresh_interval)
+            except Exception as e:
+                bt.logging.error(f"Failed to refresh the API axon pool: {e}")
+            wait = self.refreshed_at + self.refresh_interval - time.monotonic()
+            await asyncio.sleep(max(wait, 0.0))
+
+    def start(self):
+        """Starts refreshing the axon pool in the background."""
+        if self.refresh_task is None:
+            self.refresh_task = asyncio.ensure_future(self.run())
+
+    async def close(self):
+        if self.refresh_task is not None:
+            self.refresh_task.cancel()
+            try:
+                await self.refresh_task
+            except asyncio.CancelledError:
+                pass
+            self.refresh_task = None
+        await self.dendrite.aclose_session()
+
+    async def axons(
+        self, k: int = 3, uids: Optional[List[int]] = None
+    ) -> List["bt.AxonInfo"]:
+        """The `k` best ranked live axons, or the axons of `uids`."""
+        if uids is not None:
+            metagraph = await self.metagraph()
+            return [metagraph.axons[uid] for uid in uids]
+        if not self.pool.live():
+            # Unless a refresh just finished while waiting for the lock.
+            await self.refresh(max_age=self.ping_timeout)
+        return self.pool.best(k)
+
+    def handler(self, api: Type[HedgedAPI]) -> HedgedAPI:
+        """The instance of `api` sharing this client's dendrite and axon pool."""
+        if api not in self.handlers:
+            self.handlers[api] = api(
+                self.wallet,
+                dendrite=self.dendrite,
+                pool=self.pool,
+                verifier=self.verifier,
+            )
+        return self.handlers[api]
+
+    async def query(
+        self, api: Type[HedgedAPI], k: int = 3, uid: Optional[int] = None, **kwargs
+    ):
+        axons = await self.axons(k, None if uid is None else [uid])
+        return await self.handler(api)(axons=axons, **kwargs)
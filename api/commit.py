@@ -14,62 +14,40 @@
 # THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
 # THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
 # THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
-# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
-# DEALINGS IN THE SOFTWARE.
 
-from typing import Any, List, Optional, Union
+import random
+from typing import List, Optional, Union
 
 import bittensor as bt
-from bittensor.subnets import SubnetsAPI
 
+from api.client import ApiClient
+from api.get_query_axons import get_query_api_axons
+from api.hedge import HedgedAPI
 from base.protocol import Prove
-from utils import get_query_api_axons
-
-import random
+from utils.encoding import is_point
 
 COMMITMENT_API_NETUID = 0
 COMMITMENT_API_NAME = "commitment"
 
 
-class CommitmentAPI(SubnetsAPI):
-    def __init__(self, wallet: "bt.wallet"):
-        super().__init__(wallet)
+class CommitmentAPI(HedgedAPI):
+    def __init__(self, wallet: "bt.wallet", **kwargs):
+        super().__init__(wallet, **kwargs)
         self.netuid = COMMITMENT_API_NETUID
         self.name = COMMITMENT_API_NAME
 
-    def prepare_synapse(self, p: str) -> Prove:
+    def prepare_synapse(self, poly: List[str], index: int = 0) -> Prove:
         synapse = Prove(
-            poly=p,
+            index=index,
+            poly=poly,
         )
         return synapse
 
-    def process_responses(self, responses: List[Union["bt.Synapse", Any]]) -> str:
-        failure_modes = {"code": [], "message": []}
-        commitments = []
-        for response in responses:
-            if response.dendrite.status_code != 200:
-                failure_modes["code"].append(response.dendrite.status_code)
-                failure_modes["message"].append(response.dendrite.status_message)
-                continue
-            commitments.append(response.commitment)
-
-        with self.select_commitment(commitments) as output:
-            if not output:
-                bt.logging.error(
-                    f"Failed to receive valid proof from any miner: {failure_modes}"
-                )
-                return ""
-            else:
-                bt.logging.debug(f"Received valid proof from some miner: {output}")
-                return output
-
-    # Filter out invalid responses and select a final response from the valid ones.
-    @staticmethod
-    def select_commitment(outputs: List[Any]) -> Optional[str]:
-        with [output for output in outputs if isinstance(output, str)] as valid_outputs:
-            if len(valid_outputs) > 0:
-                return valid_outputs[0]
-        return None
+    def validate(self, response: Prove) -> bool:
+        return super().validate(response) and is_point(response.commitment)
+
+    def output(self, response: Prove) -> str:
+        return response.commitment
 
 
 async def commit(
@@ -79,7 +57,22 @@ async def commit(
     chain_endpoint: str = None,
     netuid: int = None,  # TODO: add our netuid
     uid: int = None,
-) -> str:
+    index: int = 0,
+    k: int = 3,
+    hedge_delay: Union[float, str, None] = None,
+    client: Optional[ApiClient] = None,
+) -> Optional[str]:
+    if client is not None:
+        # Long-lived clients answer from their cached metagraph and axon pool.
+        return await client.query(
+            CommitmentAPI,
+            k=k,
+            uid=uid,
+            poly=poly,
+            index=index,
+            hedge_delay=hedge_delay,
+        )
+
     handler = CommitmentAPI(wallet)
 
     subtensor = subtensor or bt.Subtensor(chain_endpoint=chain_endpoint)
@@ -89,12 +82,16 @@ async def commit(
     if uid is not None:
         uids = [uid]
 
-    all_axons = await get_query_api_axons(wallet=wallet, metagraph=metagraph, uids=uids)
-    axons = random.choices(all_axons, k=3)
+    all_axons = await get_query_api_axons(
+        wallet=wallet, metagraph=metagraph, uids=uids, dendrite=handler.dendrite
+    )
+    axons = random.sample(all_axons, k=min(k, len(all_axons)))
 
     commitment = await handler(
         axons=axons,
         poly=poly,
+        index=index,
+        hedge_delay=hedge_delay,
     )
 
     return commitment
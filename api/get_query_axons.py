@@ -84,6 +84,17 @@ async def ping_uids(dendrite, metagraph, uids, timeout=3):
     return successful_uids, failed_uids
 
 
+def candidate_uids(metagraph, n=0.1):
+    """
+    Returns the UIDs with validator trust among the top `n` fraction of nodes by stake.
+    """
+    vtrust_uids = [
+        uid.item() for uid in metagraph.uids if metagraph.validator_trust[uid] > 0
+    ]
+    top_uids = np.where(metagraph.S > np.quantile(metagraph.S, 1 - n))[0].tolist()
+    return list(set(top_uids).intersection(set(vtrust_uids)))
+
+
 async def get_query_api_nodes(dendrite, metagraph, n=0.1, timeout=3):
     """
     Fetches the available API nodes to query for the particular subnet.
@@ -98,13 +109,8 @@ async def get_query_api_nodes(dendrite, metagraph, n=0.1, timeout=3):
         list: A list of UIDs representing the available API nodes.
     """
     bt.logging.debug(f"Fetching available API nodes for subnet {metagraph.netuid}")
-    vtrust_uids = [
-        uid.item() for uid in metagraph.uids if metagraph.validator_trust[uid] > 0
-    ]
-    top_uids = np.where(metagraph.S > np.quantile(metagraph.S, 1 - n))[0].tolist()
-    init_query_uids = set(top_uids).intersection(set(vtrust_uids))
     query_uids, _ = await ping_uids(
-        dendrite, metagraph, list(init_query_uids), timeout=timeout
+        dendrite, metagraph, candidate_uids(metagraph, n=n), timeout=timeout
     )
     bt.logging.debug(
         f"Available API node UIDs for subnet {metagraph.netuid}: {query_uids}"
@@ -114,7 +120,9 @@ async def get_query_api_nodes(dendrite, metagraph, n=0.1, timeout=3):
     return query_uids
 
 
-async def get_query_api_axons(wallet, metagraph=None, n=0.1, timeout=3, uids=None):
+async def get_query_api_axons(
+    wallet, metagraph=None, n=0.1, timeout=3, uids=None, dendrite=None
+):
     """
     Retrieves the axons of query API nodes based on their availability and stake.
 
@@ -124,11 +132,13 @@ async def get_query_api_axons(wallet, metagraph=None, n=0.1, timeout=3, uids=Non
         n (float, optional): The fraction of top nodes to consider based on stake. Defaults to 0.1.
         timeout (int, optional): The timeout in seconds for pinging nodes. Defaults to 3.
         uids (Union[List[int], int], optional): The specific UID(s) of the API node(s) to query. Defaults to None.
+        dendrite (bittensor.dendrite, optional): The dendrite to ping nodes with. Pass a long-lived dendrite to reuse its connections across calls. Defaults to a new dendrite.
 
     Returns:
         list: A list of axon objects for the available API nodes.
     """
-    dendrite = bt.dendrite(wallet=wallet)
+    if dendrite is None:
+        dendrite = bt.dendrite(wallet=wallet)
 
     if metagraph is None:
         metagraph = bt.metagraph(netuid=21)
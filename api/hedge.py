@@ -0,0 +1,238 @@
+# The MIT License (MIT)
+# Copyright © 2024 Apollo
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, List, Optional, Tuple, Union
+
+import bittensor as bt
+from bittensor.subnets import SubnetsAPI
+
+from utils.metrics import Metrics
+
+# Pass as `hedge_delay` to stagger requests by the observed latency.
+AUTO = "auto"
+
+
+async def hedged_call(
+    dendrite: "bt.dendrite",
+    axons: List["bt.AxonInfo"],
+    synapse: "bt.Synapse",
+    validate: Callable[["bt.Synapse"], bool],
+    timeout: float = 12.0,
+    hedge_delay: Optional[float] = None,
+    verify: Optional[Callable[["bt.Synapse"], Awaitable[bool]]] = None,
+) -> Tuple[Optional["bt.Synapse"], List["bt.Synapse"]]:
+    """
+    Sends `synapse` to distinct `axons` and returns the first response that passes
+    `validate`, cancelling the requests still in flight.
+
+    Without `hedge_delay` all axons are queried at once. With a delay, the next
+    axon is only queried once the delay passed without a valid response, or as
+    soon as a response fails validation.
+
+    With `verify`, responses passing `validate` are only accepted once
+    `verify(response)` resolves to True. Verification runs while the other
+    requests stay in flight.
+
+    Returns:
+        Tuple: The first valid response, or None, and all responses received.
+    """
+    waiting = list(axons)
+    pending = set()
+    received = []
+    # Verification tasks and the responses they check.
+    checks = {}
+
+    def launch():
+        axon = waiting.pop(0)
+        pending.add(
+            asyncio.ensure_future(
+                dendrite.call(
+                    target_axon=axon,
+                    synapse=synapse.copy(),
+                    timeout=timeout,
+                    deserialize=False,
+                )
+            )
+        )
+
+    try:
+        while waiting or pending:
+            while waiting and (not pending or hedge_delay is None):
+                launch()
+
+            done, _ = await asyncio.wait(
+                pending,
+                timeout=hedge_delay if waiting else None,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if not done:
+                # Nothing came back within the hedge delay, hedge with the next axon.
+                launch()
+                continue
+
+            for task in done:
+                pending.discard(task)
+                if task in checks:
+                    response = checks.pop(task)
+                    try:
+                        if task.result():
+                            return response, received
+                    except Exception as e:
+                        bt.logging.error(f"Failed to verify response: {e}")
+                    continue
+
+                response = task.result()
+                received.append(response)
+                if not validate(response):
+                    continue
+                if verify is None:
+                    return response, received
+                check = asyncio.ensure_future(verify(response))
+                checks[check] = response
+                pending.add(check)
+        return None, received
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+class HedgedAPI(SubnetsAPI):
+    """
+    A subnet API that races distinct axons and keeps the first response passing
+    `validate`. Response latencies are observed so that `hedge_delay=AUTO`
+    staggers requests by the `hedge_quantile` of recent latencies, and the
+    outcome of each response is recorded in `pool` if one is given.
+
+    Responses are checked structurally by `validate`. Given a `verifier`, a
+    local prover client, responses are also checked in depth by `verify`.
+    """
+
+    def __init__(
+        self,
+        wallet: "bt.wallet",
+        hedge_delay: Union[float, str, None] = None,
+        hedge_quantile: float = 95,
+        dendrite: Optional["bt.dendrite"] = None,
+        pool: Optional[Any] = None,
+        verifier: Optional[Any] = None,
+    ):
+        super().__init__(wallet)
+        if dendrite is not None:
+            self.dendrite = dendrite
+        # Records the outcome of every response, e.g. an `api.client.AxonPool`.
+        self.pool = pool
+        self.verifier = verifier
+        self.hedge_delay = hedge_delay
+        self.hedge_quantile = hedge_quantile
+        self.metrics = Metrics()
+
+    def validate(self, response: "bt.Synapse") -> bool:
+        """Checks a response locally before accepting it."""
+        return response.dendrite.status_code == 200
+
+    def verify(self, synapse: "bt.Synapse", response: "bt.Synapse") -> bool:
+        """
+        Checks a response to `synapse` in depth with the local `verifier`.
+        Runs in an executor, so it may block.
+        """
+        return True
+
+    def current_hedge_delay(
+        self, hedge_delay: Union[float, str, None]
+    ) -> Optional[float]:
+        if hedge_delay == AUTO:
+            # Until latencies were observed, query all axons at once.
+            return self.metrics.percentile("latency_s", self.hedge_quantile)
+        return hedge_delay
+
+    async def query_api(
+        self,
+        axons: Union["bt.axon", List["bt.axon"]],
+        deserialize: Optional[bool] = False,
+        timeout: Optional[int] = 12,
+        hedge_delay: Union[float, str, None] = None,
+        **kwargs: Optional[Any],
+    ) -> Any:
+        axons = axons if isinstance(axons, list) else [axons]
+        synapse = self.prepare_synapse(**kwargs)
+        bt.logging.debug(f"Racing {len(axons)} axons with synapse {synapse.name}...")
+
+        rejected = []
+
+        async def verify(response: "bt.Synapse") -> bool:
+            loop = asyncio.get_running_loop()
+            valid = await loop.run_in_executor(None, self.verify, synapse, response)
+            if not valid:
+                rejected.append(response)
+                self.metrics.inc("failed_verification")
+            return valid
+
+        start = time.time()
+        winner, responses = await hedged_call(
+            self.dendrite,
+            axons,
+            synapse,
+            self.validate,
+            timeout=timeout,
+            hedge_delay=self.current_hedge_delay(
+                self.hedge_delay if hedge_delay is None else hedge_delay
+            ),
+            verify=verify if self.verifier is not None else None,
+        )
+        if winner is not None:
+            self.metrics.observe("latency_s", float(winner.dendrite.process_time))
+            self.metrics.observe("time_to_first_valid_s", time.time() - start)
+        else:
+            self.metrics.inc("no_valid_response")
+        self.record(responses, rejected)
+        if winner is None:
+            self.log_failures(responses)
+            return None
+        return self.process_responses([winner])
+
+    def record(self, responses: List["bt.Synapse"], rejected: List["bt.Synapse"] = ()):
+        """Records the outcome of `responses` in the axon pool, if there is one."""
+        if self.pool is None:
+            return
+        for response in responses:
+            accepted = self.validate(response) and not any(
+                response is other for other in rejected
+            )
+            self.pool.record(response, accepted)
+
+    def process_responses(self, responses: List[Union["bt.Synapse", Any]]) -> Any:
+        for response in responses:
+            if self.validate(response):
+                bt.logging.debug(f"Received valid response from {response.axon.hotkey}")
+                return self.output(response)
+        self.log_failures(responses)
+        return None
+
+    def log_failures(self, responses: List["bt.Synapse"]):
+        failure_modes = {"code": [], "message": []}
+        for response in responses:
+            failure_modes["code"].append(response.dendrite.status_code)
+            failure_modes["message"].append(response.dendrite.status_message)
+        bt.logging.error(
+            f"Failed to receive a valid response from any miner: {failure_modes}"
+        )
+
+    def output(self, response: "bt.Synapse") -> Any:
+        """Extracts the result from a valid response."""
+        return response
@@ -14,61 +14,57 @@
 # THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
 # THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
 # THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
-# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
-# DEALINGS IN THE SOFTWARE.
 
-from typing import Any, List, Optional, Union
+import random
+from typing import List, Optional, Tuple, Union
 
 import bittensor as bt
-from bittensor.subnets import SubnetsAPI
+from fourier import Client
 
-from base.protocol import Open
-from utils import get_query_api_axons
-import random
+from api.client import ApiClient
+from api.get_query_axons import get_query_api_axons
+from api.hedge import HedgedAPI
+from base.protocol import Prove
+from utils.encoding import is_point, is_scalar
 
 OPEN_API_NETUID = 1
 OPEN_API_NAME = "proof"
 
 
-class OpenAPI(SubnetsAPI):
-    def __init__(self, wallet: "bt.wallet"):
-        super().__init__(wallet)
+class OpenAPI(HedgedAPI):
+    def __init__(self, wallet: "bt.wallet", **kwargs):
+        super().__init__(wallet, **kwargs)
         self.netuid = OPEN_API_NETUID
         self.name = OPEN_API_NAME
 
-    def prepare_synapse(self, commitment: str, x: str, y: str) -> Open:
-        synapse = Open(
-            commitment=commitment,
-            x=x,
+    def prepare_synapse(self, poly: List[str], x: str, index: int = 0) -> Prove:
+        synapse = Prove(
+            index=index,
+            poly=poly,
+            alpha=x,
         )
         return synapse
 
-    def process_responses(self, responses: List[Union["bt.Synapse", Any]]) -> str:
-        failure_modes = {"code": [], "message": []}
-        proofs = []
-        for response in responses:
-            if response.dendrite.status_code != 200:
-                failure_modes["code"].append(response.dendrite.status_code)
-                failure_modes["message"].append(response.dendrite.status_message)
-                continue
-            proofs.append(response.proof)
-
-        with self.select_proof(proofs) as output:
-            if not output:
-                bt.logging.error(
-                    f"Failed to receive valid proof from any miner: {failure_modes}"
-                )
-                return ""
-            else:
-                bt.logging.debug(f"Received valid proof from some miner: {output}")
-                return output
-
-    @staticmethod
-    def select_proof(outputs: List[Any]) -> Optional[str]:
-        with [output for output in outputs if isinstance(output, str)] as valid_outputs:
-            if len(valid_outputs) > 0:
-                return valid_outputs[0]
-        return None
+    def validate(self, response: Prove) -> bool:
+        return (
+            super().validate(response)
+            and is_point(response.commitment)
+            and is_scalar(response.eval)
+            and is_point(response.proof)
+        )
+
+    def verify(self, synapse: Prove, response: Prove) -> bool:
+        with self.verifier.worker_verify(
+            synapse.index,
+            response.proof,
+            synapse.alpha,
+            response.eval,
+            response.commitment,
+        ) as resp:
+            return resp.status_code == 200 and resp.json().get("valid") is True
+
+    def output(self, response: Prove) -> Tuple[str, str, str]:
+        return response.commitment, response.eval, response.proof
 
 
 async def open(
@@ -79,8 +75,34 @@ async def open(
     chain_endpoint: str = None,
     netuid: int = None,  # TODO: add our netuid
     uid: int = None,
-) -> str:
-    handler = OpenAPI(wallet)
+    index: int = 0,
+    k: int = 3,
+    hedge_delay: Union[float, str, None] = None,
+    client: Optional[ApiClient] = None,
+    verifier: Optional[Client] = None,
+) -> Optional[Tuple[str, str, str]]:
+    """
+    Opens `poly` at `x`, returning the commitment, the evaluation and the proof.
+    Given `verifier`, a client for a local prover with the same setup, openings
+    are verified before they are accepted. With `client`, the client's verifier
+    is used.
+    """
+    if client is not None:
+        # The client's handlers verify with the client's verifier.
+        if verifier is not None and verifier is not client.verifier:
+            raise Exception("Pass the verifier to the ApiClient instead.")
+        # Long-lived clients answer from their cached metagraph and axon pool.
+        return await client.query(
+            OpenAPI,
+            k=k,
+            uid=uid,
+            poly=poly,
+            x=x,
+            index=index,
+            hedge_delay=hedge_delay,
+        )
+
+    handler = OpenAPI(wallet, verifier=verifier)
 
     subtensor = subtensor or bt.Subtensor(chain_endpoint=chain_endpoint)
     metagraph = subtensor.metagraph(netuid)
@@ -89,19 +111,17 @@ async def open(
     if uid is not None:
         uids = [uid]
 
-    all_axons = await get_query_api_axons(wallet=wallet, metagraph=metagraph, uids=uids)
-    axons = random.choices(all_axons, k=3)
+    all_axons = await get_query_api_axons(
+        wallet=wallet, metagraph=metagraph, uids=uids, dendrite=handler.dendrite
+    )
+    axons = random.sample(all_axons, k=min(k, len(all_axons)))
 
-    proof = await handler(
+    opening = await handler(
         axons=axons,
         poly=poly,
         x=x,
+        index=index,
+        hedge_delay=hedge_delay,
     )
 
-    return proof
-
-if __name__ == "__main__":
-    api = OpenAPI(bt.wallet())
-    
-    synapse = api.prepare_synapse("commitment", "x", "y")
-
+    return opening
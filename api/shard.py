@@ -0,0 +1,172 @@
+# The MIT License (MIT)
+# Copyright © 2021 Yuma Rao
+# Copyright © 2023 Opentensor Foundation
+# Copyright © 2023 Opentensor Technologies Inc
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+
+import asyncio
+import time
+from typing import List, Optional, Union
+
+import bittensor as bt
+
+from api.client import ApiClient
+from api.commit import CommitmentAPI
+from api.get_query_axons import get_query_api_axons
+from api.hedge import hedged_call
+from base.protocol import Prove
+from utils import curve
+
+
+def split(poly: List[str], machines_scale: int) -> List[List[str]]:
+    """Splits `poly` into the `2^machines_scale` rows of its bivariate form."""
+    rows = 2**machines_scale
+    if not poly or len(poly) % rows != 0:
+        raise Exception(
+            f"Cannot split a polynomial of size {len(poly)} into {rows} rows."
+        )
+    width = len(poly) // rows
+    return [poly[i * width : (i + 1) * width] for i in range(rows)]
+
+
+class ShardedCommitmentAPI(CommitmentAPI):
+    """
+    Commits to a polynomial larger than one worker's row. The polynomial is split
+    into `2^machines_scale` rows, the rows are committed to by miners in parallel
+    and the row commitments are summed into the full bivariate commitment.
+
+    Every row tries the axons in its own rotation, moving on to the next axon
+    when its miner fails, returns an invalid commitment or is slower than the
+    hedge delay.
+    """
+
+    def validate(self, response: Prove) -> bool:
+        if not super().validate(response):
+            return False
+        try:
+            curve.decompress(response.commitment)
+        except Exception:
+            return False
+        return True
+
+    async def commit_row(
+        self,
+        axons: List["bt.AxonInfo"],
+        index: int,
+        row: List[str],
+        timeout: float,
+        hedge_delay: float,
+    ) -> Optional[str]:
+        winner, responses = await hedged_call(
+            self.dendrite,
+            axons,
+            self.prepare_synapse(poly=row, index=index),
+            lambda response: self.validate(response) and response.index == index,
+            timeout=timeout,
+            hedge_delay=hedge_delay,
+        )
+        self.record(responses)
+        self.metrics.inc("row_failures", len(responses) - (winner is not None))
+        if winner is None:
+            self.log_failures(responses)
+            return None
+        self.metrics.observe("latency_s", float(winner.dendrite.process_time))
+        return winner.commitment
+
+    async def query_api(
+        self,
+        axons: Union["bt.axon", List["bt.axon"]],
+        deserialize: Optional[bool] = False,
+        timeout: Optional[int] = 12,
+        hedge_delay: Union[float, str, None] = None,
+        poly: List[str] = None,
+        machines_scale: int = 0,
+    ) -> Optional[str]:
+        axons = axons if isinstance(axons, list) else [axons]
+        if not axons:
+            raise Exception("No axons to commit with.")
+        rows = split(poly, machines_scale)
+        # Without a hedge delay, rows only move on once their miner fails or times out.
+        delay = self.current_hedge_delay(
+            self.hedge_delay if hedge_delay is None else hedge_delay
+        )
+        if delay is None:
+            delay = timeout
+        bt.logging.debug(f"Committing to {len(rows)} rows across {len(axons)} axons...")
+
+        start = time.time()
+        commitments = await asyncio.gather(
+            *(
+                self.commit_row(
+                    axons[i % len(axons) :] + axons[: i % len(axons)],
+                    i,
+                    row,
+                    timeout,
+                    delay,
+                )
+                for i, row in enumerate(rows)
+            )
+        )
+        missing = [i for i, commitment in enumerate(commitments) if commitment is None]
+        if missing:
+            self.metrics.inc("no_valid_response")
+            bt.logging.error(f"Failed to commit to rows {missing} of the polynomial.")
+            return None
+        self.metrics.observe("sharded_commit_s", time.time() - start)
+        return curve.aggregate(commitments)
+
+
+async def commit_sharded(
+    poly: List[str],
+    machines_scale: int,
+    wallet: "bt.wallet",
+    subtensor: "bt.Subtensor" = None,
+    chain_endpoint: str = None,
+    netuid: int = None,  # TODO: add our netuid
+    k: Optional[int] = None,
+    timeout: float = 12,
+    hedge_delay: Union[float, str, None] = None,
+    client: Optional[ApiClient] = None,
+) -> Optional[str]:
+    """
+    Commits to `poly` split into `2^machines_scale` rows, spread over `k` miners
+    (by default one per row), returning the commitment to the full polynomial.
+    """
+    k = k or 2**machines_scale
+    if client is not None:
+        return await client.query(
+            ShardedCommitmentAPI,
+            k=k,
+            poly=poly,
+            machines_scale=machines_scale,
+            timeout=timeout,
+            hedge_delay=hedge_delay,
+        )
+
+    handler = ShardedCommitmentAPI(wallet)
+
+    subtensor = subtensor or bt.Subtensor(chain_endpoint=chain_endpoint)
+    metagraph = subtensor.metagraph(netuid)
+
+    axons = await get_query_api_axons(
+        wallet=wallet, metagraph=metagraph, dendrite=handler.dendrite
+    )
+
+    return await handler(
+        axons=axons[:k],
+        poly=poly,
+        machines_scale=machines_scale,
+        timeout=timeout,
+        hedge_delay=hedge_delay,
+    )
@@ -14,25 +14,24 @@
 # THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
 # THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
 # THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
-# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
-# DEALINGS IN THE SOFTWARE.
 
 import random
-from typing import Any, List, Optional, Union
+from typing import Optional, Union
 
 import bittensor as bt
-from bittensor.subnets import SubnetsAPI
 
+from api.client import ApiClient
+from api.get_query_axons import get_query_api_axons
+from api.hedge import HedgedAPI
 from base.protocol import Verify
-from utils import get_query_api_axons
 
 VERIFICATION_API_NETUID = 2
 VERIFICATION_API_NAME = "verification"
 
 
-class VerificationAPI(SubnetsAPI):
-    def __init__(self, wallet: "bt.wallet"):
-        super().__init__(wallet)
+class VerificationAPI(HedgedAPI):
+    def __init__(self, wallet: "bt.wallet", **kwargs):
+        super().__init__(wallet, **kwargs)
         self.netuid = VERIFICATION_API_NETUID
         self.name = VERIFICATION_API_NAME
 
@@ -42,43 +41,22 @@ class VerificationAPI(SubnetsAPI):
         x: str,
         y: str,
         proof: str,
+        index: int = 0,
     ) -> Verify:
         synapse = Verify(
+            index=index,
             commitment=commitment,
-            x=x,
-            y=y,
+            alpha=x,
+            eval=y,
             proof=proof,
         )
         return synapse
 
-    def process_responses(self, responses: List[Union["bt.Synapse", Any]]) -> bool:
-        failure_modes = {"code": [], "message": []}
-        proofs = []
-        for response in responses:
-            if response.dendrite.status_code != 200:
-                failure_modes["code"].append(response.dendrite.status_code)
-                failure_modes["message"].append(response.dendrite.status_message)
-                continue
-            proofs.append(response.proof)
-
-        with self.select_valid(proofs) as output:
-            if not output:
-                bt.logging.error(
-                    f"Failed to receive valid proof from any miner: {failure_modes}"
-                )
-                return ""
-            else:
-                bt.logging.debug(f"Received valid proof from some miner: {output}")
-                return output
-
-    @staticmethod
-    def select_valid(outputs: List[Any]) -> Optional[str]:
-        with [
-            output for output in outputs if isinstance(output, bool)
-        ] as valid_outputs:
-            if len(valid_outputs) > 0:
-                return valid_outputs[0]
-        return None
+    def validate(self, response: Verify) -> bool:
+        return super().validate(response) and isinstance(response.valid, bool)
+
+    def output(self, response: Verify) -> bool:
+        return response.valid
 
 
 async def verify(
@@ -91,7 +69,25 @@ async def verify(
     chain_endpoint: str = None,
     netuid: int = None,  # TODO: add our netuid
     uid: int = None,
-) -> str:
+    index: int = 0,
+    k: int = 3,
+    hedge_delay: Union[float, str, None] = None,
+    client: Optional[ApiClient] = None,
+) -> Optional[bool]:
+    if client is not None:
+        # Long-lived clients answer from their cached metagraph and axon pool.
+        return await client.query(
+            VerificationAPI,
+            k=k,
+            uid=uid,
+            commitment=commitment,
+            x=x,
+            y=y,
+            proof=proof,
+            index=index,
+            hedge_delay=hedge_delay,
+        )
+
     handler = VerificationAPI(wallet)
 
     subtensor = subtensor or bt.Subtensor(chain_endpoint=chain_endpoint)
@@ -101,8 +97,10 @@ async def verify(
     if uid is not None:
         uids = [uid]
 
-    all_axons = await get_query_api_axons(wallet=wallet, metagraph=metagraph, uids=uids)
-    axons = random.choices(all_axons, k=3)
+    all_axons = await get_query_api_axons(
+        wallet=wallet, metagraph=metagraph, uids=uids, dendrite=handler.dendrite
+    )
+    axons = random.sample(all_axons, k=min(k, len(all_axons)))
 
     valid = await handler(
         axons=axons,
@@ -110,6 +108,8 @@ async def verify(
         x=x,
         y=y,
         proof=proof,
+        index=index,
+        hedge_delay=hedge_delay,
     )
 
     return valid
@@ -0,0 +1,172 @@
+# The MIT License (MIT)
+# Copyright © 2024 Apollo
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+import threading
+import time
+import traceback
+import weakref
+from typing import Callable, Optional, Tuple
+
+import bittensor as bt
+
+BLOCK_TIME = 12.0
+
+
+class BlockTracker:
+    """
+    Follows the chain head of one subtensor on a background thread and answers
+    `block` from memory.
+
+    The follower subscribes to new block headers on its own connection, so it
+    never shares a websocket with the neuron's calls, and falls back to polling
+    once per block when subscribing fails or for mock subtensors. When the next
+    head is late, reads extrapolate at most one block past the last head, so
+    they never run ahead of the next head and never go back.
+
+    The head is published as one tuple, so reads take no lock. The tracker only
+    holds a weak reference to its subtensor, and the follower stops once the
+    subtensor is gone.
+    """
+
+    def __init__(
+        self,
+        subtensor: "bt.subtensor",
+        block_time: float = BLOCK_TIME,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.subtensor_ref = weakref.ref(subtensor)
+        self.block_time = block_time
+        self.clock = clock
+        self.head: Optional[Tuple[int, float]] = None
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+
+    @property
+    def subtensor(self) -> Optional["bt.subtensor"]:
+        return self.subtensor_ref()
+
+    @property
+    def block(self) -> int:
+        head = self.head
+        if head is None:
+            head = self.refresh()
+        number, seen = head
+        return number if self.clock() - seen < self.block_time else number + 1
+
+    def publish(self, number: int):
+        head = self.head
+        # Heads never go back, even if a stale poll lands after a newer one.
+        if head is None or number >= head[0]:
+            self.head = (int(number), self.clock())
+
+    def refresh(self) -> Tuple[int, float]:
+        """Reads the head from the chain, the first read blocks on this call."""
+        with self.lock:
+            if self.head is None:
+                self.publish(self.subtensor.get_current_block())
+                self.start()
+        return self.head
+
+    def start(self):
+        if self.thread is not None:
+            return
+        self.stop_event.clear()
+        self.thread = threading.Thread(
+            target=self.run, name="block-tracker", daemon=True
+        )
+        self.thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self.stop_event.set()
+        if self.thread is not None:
+            # A subscription only returns on the next head, the thread is a daemon.
+            self.thread.join(timeout)
+            self.thread = None
+
+    def stopped(self) -> bool:
+        return self.stop_event.is_set() or self.subtensor is None
+
+    def run(self):
+        subtensor = self.subtensor
+        if subtensor is None:
+            return
+        if isinstance(subtensor, bt.MockSubtensor) or not isinstance(
+            subtensor, bt.subtensor
+        ):
+            # Mock and stand-in subtensors have no chain to subscribe to.
+            del subtensor
+            self.poll(None)
+            return
+
+        endpoint = subtensor.chain_endpoint
+        del subtensor
+        try:
+            follower = bt.subtensor(network=endpoint)
+        except Exception:
+            bt.logging.warning(
+                f"Could not connect the block tracker: {traceback.format_exc()}"
+            )
+            self.poll(None)
+            return
+
+        try:
+            follower.substrate.subscribe_block_headers(self.on_header)
+        except Exception:
+            if self.stopped():
+                return
+            bt.logging.warning(
+                f"Block header subscription failed, polling instead: {traceback.format_exc()}"
+            )
+            self.poll(follower)
+
+    def on_header(self, header: dict, update_nr: int, subscription_id: str):
+        self.publish(header["header"]["number"])
+        # Any return value ends the subscription.
+        return True if self.stopped() else None
+
+    def poll(self, follower: Optional["bt.subtensor"]):
+        """Polls `follower`, or the tracked subtensor without a follower, once per block."""
+        while not self.stop_event.wait(self.block_time):
+            subtensor = follower if follower is not None else self.subtensor
+            if subtensor is None or self.stopped():
+                return
+            try:
+                self.publish(subtensor.get_current_block())
+            except Exception:
+                bt.logging.warning(
+                    f"Failed to poll the block: {traceback.format_exc()}"
+                )
+            finally:
+                del subtensor
+
+
+trackers: "weakref.WeakKeyDictionary[bt.subtensor, BlockTracker]" = (
+    weakref.WeakKeyDictionary()
+)
+trackers_lock = threading.Lock()
+
+
+def block_tracker(subtensor: "bt.subtensor") -> BlockTracker:
+    """Returns the tracker of `subtensor`, neurons and objects sharing a subtensor share it."""
+    tracker = trackers.get(subtensor)
+    if tracker is None:
+        with trackers_lock:
+            tracker = trackers.get(subtensor)
+            if tracker is None:
+                tracker = trackers[subtensor] = BlockTracker(subtensor)
+    return tracker
@@ -0,0 +1,128 @@
+# The MIT License (MIT)
+# Copyright © 2024 Apollo
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+from typing import Iterable, Optional, Set, Tuple
+
+import aiohttp
+import bittensor as bt
+
+from utils.metrics import Metrics
+
+Endpoint = Tuple[str, int]
+
+
+def endpoint(axon: "bt.AxonInfo") -> Endpoint:
+    return axon.ip, axon.port
+
+
+def changed_endpoints(
+    before: Iterable["bt.AxonInfo"], after: Iterable["bt.AxonInfo"]
+) -> Set[Endpoint]:
+    """The endpoints of uids whose axon moved to a different ip or port."""
+    return {
+        endpoint(old)
+        for old, new in zip(before, after)
+        if endpoint(old) != endpoint(new)
+    }
+
+
+class PooledDendrite(bt.dendrite):
+    """
+    A dendrite whose HTTP session keeps bounded pools of keep-alive connections
+    to the axons it queries, so consecutive rounds and API calls reuse
+    connections instead of opening new ones.
+
+    Connection creation and reuse are counted in `metrics`
+    (`dendrite_connections_created`, `dendrite_connections_reused`), and
+    `recycle` closes the idle connections of axons that moved.
+    """
+
+    def __init__(
+        self,
+        wallet: "bt.wallet",
+        limit: int = 256,
+        limit_per_host: int = 8,
+        keepalive_timeout: float = 60.0,
+        metrics: Optional[Metrics] = None,
+    ):
+        super().__init__(wallet=wallet)
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.metrics = metrics or Metrics()
+
+    def trace_config(self) -> aiohttp.TraceConfig:
+        trace_config = aiohttp.TraceConfig()
+
+        async def on_request_start(session, context, params):
+            self.metrics.inc("dendrite_requests")
+
+        async def on_connection_create_end(session, context, params):
+            self.metrics.inc("dendrite_connections_created")
+
+        async def on_connection_reuseconn(session, context, params):
+            self.metrics.inc("dendrite_connections_reused")
+
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+        return trace_config
+
+    @property
+    async def session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector, trace_configs=[self.trace_config()]
+            )
+        return self._session
+
+    def recycle(self, endpoints: Set[Endpoint]) -> int:
+        """
+        Closes the idle pooled connections to `endpoints`. Must run on the event
+        loop of the session, e.g. through `loop.call_soon_threadsafe`.
+
+        Returns:
+            int: The number of connections closed.
+        """
+        if not endpoints or self._session is None or self._session.closed:
+            return 0
+        # aiohttp has no public API to drop the pool of a single host.
+        pools = getattr(self._session.connector, "_conns", {})
+        closed = 0
+        for key in [key for key in pools if (key.host, key.port) in endpoints]:
+            for protocol, _ in pools.pop(key):
+                protocol.close()
+                closed += 1
+        self.metrics.inc("dendrite_connections_recycled", closed)
+        bt.logging.debug(f"Recycled {closed} connections to {len(endpoints)} axons")
+        return closed
+
+    def stats(self) -> dict:
+        counters = self.metrics.snapshot()["counters"]
+        created = counters.get("dendrite_connections_created", 0)
+        reused = counters.get("dendrite_connections_reused", 0)
+        return {
+            "requests": counters.get("dendrite_requests", 0),
+            "connections_created": created,
+            "connections_reused": reused,
+            "reuse_ratio": reused / (created + reused) if created + reused else 0.0,
+        }
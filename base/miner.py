@@ -17,15 +17,19 @@
 
 import argparse
 import asyncio
+import copy
 import threading
 import time
 import traceback
+from contextlib import contextmanager
+from typing import List, Tuple
 
 import bittensor as bt
 from bittensor.errors import NotVerifiedException
-from fourier import Client
 
 from base.neuron import BaseNeuron
+from base.protocol import OVER_CAPACITY
+from utils import calibration
 from utils.config import add_miner_args
 
 
@@ -63,25 +67,27 @@ class BaseMinerNeuron(BaseNeuron):
 
         # Attach determiners which functions are called when servicing a request.
         bt.logging.info("Attaching forward function to miner axon.")
-        self.axon.attach(
-            forward_fn=self.forward,
-            blacklist_fn=self.blacklist,
-            priority_fn=self.priority,
-        )
+        for forward_fn, blacklist_fn, priority_fn in self.axon_handlers():
+            self.axon.attach(
+                forward_fn=forward_fn,
+                blacklist_fn=blacklist_fn,
+                priority_fn=priority_fn,
+            )
         bt.logging.info(f"Axon created: {self.axon}")
 
         # Start the local ZKG RPC server.
-        PORT = 1337
-        self.client = Client(
-            port=PORT,
-            bin=self.config.prover_path,
-            uncompressed=self.config.uncompressed,
-            setup_path=self.config.setup_path,
-            precompute_path=self.config.precompute_path,
-        )
-        self.client.start(
-            scale=self.config.scale, machines_scale=self.config.machines_scale
-        )
+        self.client = self.start_prover(port=1337)
+
+        # Bound the number of concurrent proofs, optionally sized by measuring the prover.
+        if self.config.neuron.calibrate:
+            self.calibrate()
+        workers = self.config.neuron.proof_workers
+        self.proof_slots = threading.BoundedSemaphore(workers) if workers else None
+        self.proof_queue_limit = self.config.neuron.proof_queue_limit
+        self.proofs_waiting = 0
+        self.queue_lock = threading.Lock()
+        self.metrics.set("proof_workers", workers)
+        self.metrics.set("proof_queue_limit", self.proof_queue_limit)
 
         # Instantiate runners
         self.should_exit: bool = False
@@ -89,6 +95,85 @@ class BaseMinerNeuron(BaseNeuron):
         self.thread: threading.Thread = None
         self.lock = asyncio.Lock()
 
+    def calibrate(self):
+        """
+        Measures the proving capacity of the local prover and sizes the proof workers
+        and queue limit from it.
+        """
+        bt.logging.info("Calibrating proving capacity.")
+        capacity = calibration.calibrate(
+            self.client,
+            cycles=self.config.neuron.calibration_cycles,
+            deadline=self.config.neuron.calibration_deadline,
+        )
+        self.config.neuron.proof_workers = capacity["workers"]
+        self.config.neuron.proof_queue_limit = max(1, capacity["queue_limit"])
+        self.metrics.set("capacity_proofs_per_sec", capacity["proofs_per_sec"])
+        self.metrics.set("capacity_latency_s", capacity["latency_s"])
+        bt.logging.info(
+            f"Measured capacity: {capacity['proofs_per_sec']:.2f} proofs/s at "
+            f"{capacity['workers']} workers with {capacity['latency_s']:.3f}s latency, "
+            f"queue limit {self.config.neuron.proof_queue_limit}"
+        )
+
+    def queue_full(self) -> bool:
+        """Whether a new request would be turned away by `proving_slot`."""
+        with self.queue_lock:
+            return bool(
+                self.proof_slots is not None
+                and self.proof_queue_limit
+                and self.proofs_waiting >= self.proof_queue_limit
+            )
+
+    def admit(self, synapse: bt.Synapse) -> Tuple[bool, str]:
+        """
+        Admission check for the blacklist functions. Requests the miner has no capacity
+        for are refused by the axon before they reach the forward function, with a
+        status message validators recognize.
+        """
+        if self.queue_full():
+            self.metrics.inc("proofs_rejected")
+            bt.logging.warning(
+                f"Refusing request from {synapse.dendrite.hotkey}: {OVER_CAPACITY}"
+            )
+            return True, OVER_CAPACITY
+        return False, "Admitted"
+
+    @contextmanager
+    def proving_slot(self):
+        """
+        Waits for a free proof worker. Requests that got past `admit` while the queue
+        filled up are refused here without waiting: the exception reaches the
+        validator as an error response carrying `OVER_CAPACITY`.
+        """
+        if self.proof_slots is None:
+            yield
+            return
+
+        with self.queue_lock:
+            admitted = not (
+                self.proof_queue_limit and self.proofs_waiting >= self.proof_queue_limit
+            )
+            if admitted:
+                self.proofs_waiting += 1
+        if not admitted:
+            self.metrics.inc("proofs_rejected")
+            raise Exception(OVER_CAPACITY)
+
+        try:
+            self.proof_slots.acquire()
+        finally:
+            with self.queue_lock:
+                self.proofs_waiting -= 1
+        try:
+            yield
+        finally:
+            self.proof_slots.release()
+
+    def axon_handlers(self) -> List[Tuple]:
+        """The (forward, blacklist, priority) functions served by the axon, one per synapse type."""
+        return [(self.forward, self.blacklist, self.priority)]
+
     def run(self):
         """
         Initiates and manages the main loop for the miner on the Bittensor network. The main loop handles graceful shutdown on keyboard interrupts and logs unforeseen errors.
@@ -114,13 +199,15 @@ class BaseMinerNeuron(BaseNeuron):
 
         # Check that miner is registered on the network.
         self.sync()
+        self.start_synchronizer()
 
         # Serve passes the axon information to the network + netuid we are hosting on.
         # This will auto-update if the axon port of external ip have changed.
         bt.logging.info(
             f"Serving miner axon {self.axon} on network: {self.config.subtensor.chain_endpoint} with netuid: {self.config.netuid}"
         )
-        self.axon.serve(netuid=self.config.netuid, subtensor=self.subtensor)
+        with self.subtensor_lock:
+            self.axon.serve(netuid=self.config.netuid, subtensor=self.subtensor)
 
         # Start  starts the miner's axon, making it active on the network.
         self.axon.start()
@@ -133,8 +220,8 @@ class BaseMinerNeuron(BaseNeuron):
         while not self.should_exit:
             try:
                 if step % 10 == 0:
-                    self.sync()
-                    metagraph = self.subtensor.metagraph(self.config.netuid)
+                    if self.synchronizer is None:
+                        self.sync()
                     log = (
                         f"Step:{step} | "
                         f"Block:{self.metagraph.block.item()} | "
@@ -152,7 +239,8 @@ class BaseMinerNeuron(BaseNeuron):
             # If someone intentionally stops the miner, it'll safely terminate operations.
             except KeyboardInterrupt:
                 self.axon.stop()
-                self.client.stop()
+                self.stop_synchronizer()
+                self.stop_prover()
                 bt.logging.success("Miner killed by keyboard interrupt.")
                 exit()
 
@@ -178,7 +266,8 @@ class BaseMinerNeuron(BaseNeuron):
         Stops the miner's operations that are running in the background thread.
         """
         if self.is_running:
-            self.client.stop()
+            self.stop_synchronizer()
+            self.stop_prover()
             bt.logging.debug("Stopping miner in background thread.")
             self.should_exit = True
             self.thread.join(5)
@@ -212,5 +301,8 @@ class BaseMinerNeuron(BaseNeuron):
         """Resyncs the metagraph and updates the hotkeys and moving averages based on the new metagraph."""
         bt.logging.info("resync_metagraph()")
 
-        # Sync the metagraph.
-        self.metagraph.sync(subtensor=self.subtensor)
+        # Sync a copy of the metagraph and publish it once complete, so
+        # requests being handled never see a partially synced metagraph.
+        metagraph = copy.deepcopy(self.metagraph)
+        metagraph.sync(subtensor=self.subtensor)
+        self.metagraph = metagraph
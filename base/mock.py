@@ -19,10 +19,28 @@ import time
 
 import asyncio
 import base64
+import ipaddress
 import random
+import typing
 import bittensor as bt
+import numpy as np
 
-from typing import List
+from concurrent.futures import Executor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Union
+
+
+def mock_wallet(config: "bt.Config") -> "bt.MockWallet":
+    """
+    A mock wallet whose hotkey is derived from the wallet and hotkey names, so
+    several mock neurons in one process get distinct hotkeys.
+    """
+    wallet = bt.MockWallet(config=config)
+    wallet.set_hotkey(
+        bt.Keypair.create_from_uri(f"//{wallet.name}/{wallet.hotkey_str}"),
+        encrypt=False,
+        overwrite=True,
+    )
+    return wallet
 
 
 class MockSubtensor(bt.MockSubtensor):
@@ -33,7 +51,9 @@ class MockSubtensor(bt.MockSubtensor):
             self.create_subnet(netuid)
 
         # Register ourself (the validator) as a neuron at uid=0
-        if wallet is not None:
+        if wallet is not None and not self.is_hotkey_registered(
+            netuid=netuid, hotkey_ss58=wallet.hotkey.ss58_address
+        ):
             self.force_register_neuron(
                 netuid=netuid,
                 hotkey=wallet.hotkey.ss58_address,
@@ -42,8 +62,13 @@ class MockSubtensor(bt.MockSubtensor):
                 stake=100000,
             )
 
-        # Register n mock neurons who will be miners
+        # Register n mock neurons who will be miners, unless another neuron
+        # on the subnet did already.
         for i in range(1, n + 1):
+            if self.is_hotkey_registered(
+                netuid=netuid, hotkey_ss58=f"miner-hotkey-{i}"
+            ):
+                continue
             self.force_register_neuron(
                 netuid=netuid,
                 hotkey=f"miner-hotkey-{i}",
@@ -54,23 +79,361 @@ class MockSubtensor(bt.MockSubtensor):
 
 
 class MockMetagraph(bt.metagraph):
-    def __init__(self, netuid=1, network="mock", subtensor=None):
+    def __init__(self, netuid=1, network="mock", subtensor=None, localhost=True):
         super().__init__(netuid=netuid, network=network, sync=False)
 
         if subtensor is not None:
             self.subtensor = subtensor
         self.sync(subtensor=subtensor)
 
-        for axon in self.axons:
-            axon.ip = "127.0.0.0"
-            axon.port = 8091
+        # Point every axon at the local host, unless the axons were served.
+        if localhost:
+            for axon in self.axons:
+                axon.ip = "127.0.0.0"
+                axon.port = 8091
 
         bt.logging.info(f"Metagraph: {self}")
         bt.logging.info(f"Axons: {self.axons}")
 
+
+class MockNetwork:
+    """
+    Builds large mock subnets in bulk, and scripts churn on them.
+
+    `MockSubtensor` registers neurons one at a time, checking every registered
+    hotkey for duplicates, so a few thousand neurons take minutes. This writes
+    the chain state of many neurons at once instead, with realistic stakes:
+    a few validators hold most of the stake, with validator permits, and most
+    miners little. A fraction of the neurons serves an axon, each at its own
+    endpoint. `replace` and `register` then change the subnet like hotkey
+    deregistrations and new registrations on the real chain.
+    """
+
+    def __init__(
+        self,
+        subtensor: Optional[bt.MockSubtensor] = None,
+        netuid: int = 1,
+        seed: Optional[int] = None,
+    ):
+        self.subtensor = subtensor or bt.MockSubtensor()
+        self.netuid = netuid
+        self.rng = np.random.default_rng(seed)
+        self.registered = 0
+        if not self.subtensor.subnet_exists(netuid):
+            self.subtensor.create_subnet(netuid)
+
+    @property
+    def state(self) -> dict:
+        return self.subtensor.chain_state["SubtensorModule"]
+
+    @property
+    def n(self) -> int:
+        return self.subtensor._get_most_recent_storage(
+            self.state["SubnetworkN"][self.netuid]
+        )
+
+    def populate(
+        self,
+        n: int,
+        validators: int = 64,
+        serving: float = 0.95,
+        validator_stake: float = 10_000,
+        miner_stake: float = 10,
+    ) -> List[int]:
+        """
+        Registers `n` neurons. The `validators` neurons with the most stake get a
+        validator permit. Validator stakes are Pareto distributed from
+        `validator_stake` TAO, miner stakes lognormal around `miner_stake` TAO.
+        """
+        validators = min(validators, n)
+        stakes = np.concatenate(
+            [
+                validator_stake * (1 + self.rng.pareto(1.16, validators)),
+                miner_stake * self.rng.lognormal(0, 1.5, n - validators),
+            ]
+        )
+        self.rng.shuffle(stakes)
+        permits = np.zeros(n, dtype=bool)
+        permits[np.argsort(stakes)[n - validators :]] = True
+        return self.register(
+            stakes=stakes, permits=permits, serving=self.rng.random(n) < serving
+        )
+
+    def register(
+        self,
+        stakes: Sequence[float],
+        permits: Optional[Sequence[bool]] = None,
+        serving: Optional[Sequence[bool]] = None,
+        uids: Optional[Sequence[int]] = None,
+        hotkeys: Optional[Sequence[str]] = None,
+    ) -> List[int]:
+        """
+        Registers a neuron per stake, with new hotkeys unless `hotkeys` are given,
+        at the next free uids or in place of the neurons at `uids`. Returns the uids.
+        """
+        count = len(stakes)
+        permits = np.zeros(count, dtype=bool) if permits is None else permits
+        serving = np.ones(count, dtype=bool) if serving is None else serving
+        block = self.subtensor.block_number
+        netuid = self.netuid
+        if uids is None:
+            uids = list(range(self.n, self.n + count))
+            self.state["SubnetworkN"][netuid][block] = self.n + count
+
+        total = 0
+        for k, (uid, stake, permit, serves) in enumerate(
+            zip(uids, stakes, permits, serving)
+        ):
+            self.registered += 1
+            hotkey = f"mock-hotkey-{netuid}-{self.registered}"
+            if hotkeys is not None:
+                hotkey = hotkeys[k]
+            coldkey = f"mock-coldkey-{netuid}-{self.registered}"
+            self.deregister(uid)
+
+            rao = int(bt.Balance.from_tao(float(stake)).rao)
+            total += rao
+            self.state["Stake"][hotkey] = {coldkey: {block: rao}}
+            self.state["Uids"][netuid][hotkey] = {block: uid}
+            self.state["Keys"][netuid].setdefault(uid, {})[block] = hotkey
+            self.state["Owner"][hotkey] = {block: coldkey}
+            self.state["IsNetworkMember"][hotkey] = {netuid: {block: True}}
+            for column, value in [
+                ("Active", True),
+                ("LastUpdate", block),
+                ("Rank", 0.0),
+                ("Emission", 0.0),
+                ("Incentive", 0.0),
+                ("Consensus", 0.0),
+                ("Trust", 0.0),
+                ("ValidatorTrust", 0.0),
+                ("Dividends", 0.0),
+                ("PruningScores", 0.0),
+                ("ValidatorPermit", bool(permit)),
+                ("Weights", []),
+                ("Bonds", []),
+            ]:
+                self.state[column][netuid].setdefault(uid, {})[block] = value
+            self.state["Prometheus"][netuid][hotkey] = {block: {}}
+            self.state["Axons"][netuid][hotkey] = {
+                block: self.axon_info(uid) if serves else {}
+            }
+
+        self.state["TotalStake"][block] = (
+            self.subtensor._get_most_recent_storage(self.state["TotalStake"]) + total
+        )
+        return list(uids)
+
+    def deregister(self, uid: int):
+        """Marks the hotkey at `uid`, if any, as no longer registered."""
+        keys = self.state["Keys"][self.netuid]
+        if uid not in keys:
+            return
+        block = self.subtensor.block_number
+        hotkey = self.subtensor._get_most_recent_storage(keys[uid])
+        # The mock chain can't look up a uid of None, forget the hotkey instead.
+        self.state["Uids"][self.netuid].pop(hotkey, None)
+        self.state["IsNetworkMember"][hotkey][self.netuid][block] = False
+
+    def axon_info(self, uid: int) -> dict:
+        return dict(
+            block=self.subtensor.block_number,
+            version=1,
+            ip=int(ipaddress.IPv4Address("10.0.0.0")) + uid,
+            port=8091,
+            ip_type=4,
+            protocol=4,
+            placeholder1=0,
+            placeholder2=0,
+        )
+
+    def replace(self, fraction: float, protect: Sequence[int] = ()) -> List[int]:
+        """
+        Replaces the hotkeys of a random `fraction` of the neurons, like
+        deregistrations do. Neurons with a validator permit or in `protect`
+        are kept. Returns the uids.
+        """
+        permits = self.state["ValidatorPermit"][self.netuid]
+        candidates = [
+            uid
+            for uid in range(self.n)
+            if uid not in protect
+            and not self.subtensor._get_most_recent_storage(permits[uid])
+        ]
+        count = min(len(candidates), int(round(fraction * self.n)))
+        uids = sorted(self.rng.choice(candidates, count, replace=False).tolist())
+        stakes = self.rng.lognormal(0, 1.5, count)
+        return self.register(stakes=stakes, uids=uids)
+
+    def churn(
+        self, replace: float = 0.01, register: int = 0, protect: Sequence[int] = ()
+    ) -> List[int]:
+        """Advances a block, replacing and registering neurons. Returns the changed uids."""
+        self.subtensor.do_block_step()
+        changed = self.replace(replace, protect=protect)
+        if register:
+            changed += self.register(stakes=self.rng.lognormal(0, 1.5, register))
+        return changed
+
+    def metagraph(self) -> "MockMetagraph":
+        return MockMetagraph(
+            netuid=self.netuid, subtensor=self.subtensor, localhost=False
+        )
+
+
+class MockLink:
+    """
+    The network between the mock dendrite and one mock axon.
+
+    Each way, a message takes `latency` seconds plus its size over `bandwidth`
+    (bytes per second, unlimited if None). `latency` is either a callable that
+    draws it, or the median of a lognormal distribution with shape `jitter`.
+    A request is dropped with probability `error_rate`.
+    """
+
+    def __init__(
+        self,
+        latency: Union[float, Callable[[], float]] = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        bandwidth: Optional[float] = None,
+        seed: Optional[int] = None,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.bandwidth = bandwidth
+        self.random = random.Random(seed)
+
+    def delay(self, size: int) -> float:
+        """The time in seconds a message of `size` bytes takes."""
+        if callable(self.latency):
+            latency = self.latency()
+        elif self.jitter:
+            latency = self.latency * self.random.lognormvariate(0, self.jitter)
+        else:
+            latency = self.latency
+        return latency + (size / self.bandwidth if self.bandwidth else 0.0)
+
+    def drops(self) -> bool:
+        return self.random.random() < self.error_rate
+
+
 class MockDendrite(bt.dendrite):
-    def __init__(self, wallet):
+    """
+    A dendrite for the mock network.
+
+    Axons whose hotkey has a handler attached are served in process: requests
+    go over a `MockLink`, are blacklisted and answered by the handler, and the
+    response comes back over the link, subject to the timeout of the query.
+    A handler is either a neuron with `axon_handlers()`, e.g. a `Miner`, or a
+    callable taking and returning a synapse. Blocking handlers run in `executor`.
+    Other axons answer with a copy of the request after a random time.
+    """
+
+    def __init__(
+        self,
+        wallet,
+        handlers: Optional[Dict[str, Any]] = None,
+        links: Optional[Dict[str, MockLink]] = None,
+        link: Optional[MockLink] = None,
+        executor: Optional[Executor] = None,
+    ):
         super().__init__(wallet)
+        self.routes: Dict[str, Dict[Optional[str], tuple]] = {}
+        self.links = links or {}
+        self.link = link or MockLink()
+        self.executor = executor
+        for hotkey, handler in (handlers or {}).items():
+            self.attach(hotkey, handler)
+
+    def attach(self, hotkey: str, handler: Any):
+        """Serves the axon of `hotkey` with a neuron or a synapse handler."""
+        if hasattr(handler, "axon_handlers"):
+            routes = {}
+            for forward_fn, blacklist_fn, _ in handler.axon_handlers():
+                synapse_type = next(
+                    t
+                    for name, t in typing.get_type_hints(forward_fn).items()
+                    if name != "return"
+                )
+                routes[synapse_type.__name__] = (forward_fn, blacklist_fn)
+        else:
+            routes = {None: (handler, None)}
+        self.routes[hotkey] = routes
+
+    def detach(self, hotkey: str):
+        self.routes.pop(hotkey, None)
+
+    async def serve(self, axon: bt.axon, synapse: bt.Synapse) -> bt.Synapse:
+        """Sends a request over the link of an axon and waits for the response."""
+        routes = self.routes[axon.hotkey]
+        forward_fn, blacklist_fn = routes.get(
+            synapse.name, routes.get(None, (None, None))
+        )
+        link = self.links.get(axon.hotkey, self.link)
+        if link.drops():
+            raise ConnectionError(f"Request to {axon.hotkey} dropped.")
+
+        await asyncio.sleep(link.delay(len(synapse.json())))
+        if forward_fn is None:
+            return synapse.copy(update={"axon": bt.TerminalInfo(status_code=404)})
+        if blacklist_fn is not None:
+            blacklisted, reason = await blacklist_fn(synapse)
+            if blacklisted:
+                # The message the axon answers blacklisted requests with.
+                return synapse.copy(
+                    update={
+                        "axon": bt.TerminalInfo(
+                            status_code=403,
+                            status_message=f"Forbidden. Key is blacklisted: {reason}.",
+                        )
+                    }
+                )
+
+        if asyncio.iscoroutinefunction(forward_fn):
+            response = await forward_fn(synapse.copy())
+        else:
+            response = await asyncio.get_event_loop().run_in_executor(
+                self.executor, forward_fn, synapse.copy()
+            )
+        await asyncio.sleep(link.delay(len(response.json())))
+        return response
+
+    async def routed_response(
+        self, axon: bt.axon, synapse: bt.Synapse, timeout: float
+    ) -> bt.Synapse:
+        start_time = time.time()
+        try:
+            response = await asyncio.wait_for(self.serve(axon, synapse), timeout)
+            status_code = response.axon.status_code or 200
+            # Merge the response into the request, like the real dendrite does.
+            for key in synapse.dict().keys():
+                if key in ("axon", "dendrite"):
+                    continue
+                try:
+                    setattr(synapse, key, getattr(response, key))
+                except Exception:
+                    pass
+            status_message = response.axon.status_message or {
+                200: "OK",
+                403: "Forbidden",
+                404: "Not Found",
+            }.get(status_code, "Error")
+        except asyncio.TimeoutError:
+            status_code, status_message = 408, "Timeout"
+        except ConnectionError as e:
+            status_code, status_message = 503, str(e)
+        except Exception as e:
+            status_code, status_message = 500, str(e)
+
+        synapse.dendrite.status_code = status_code
+        synapse.dendrite.status_message = status_message
+        synapse.axon.status_code = status_code
+        synapse.dendrite.process_time = str(
+            timeout if status_code == 408 else time.time() - start_time
+        )
+        return synapse
 
     async def forward(
         self,
@@ -89,6 +452,10 @@ class MockDendrite(bt.dendrite):
                 start_time = time.time()
                 s = synapse.copy()
                 s = self.preprocess_synapse_for_request(axon, s, timeout)
+                if axon.hotkey in self.routes:
+                    s = await self.routed_response(axon, s, timeout)
+                    return s.deserialize() if deserialize else s
+
                 process_time = random.random()
                 if process_time < timeout:
                     s.dendrite.process_time = str(time.time() - start_time)
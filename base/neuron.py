@@ -16,17 +16,24 @@
 # DEALINGS IN THE SOFTWARE.
 
 import copy
+import os
+import threading
 import typing
 
 import bittensor as bt
 
 from abc import ABC, abstractmethod
+from fourier import Client
 
 # Sync calls set weights and also resyncs the metagraph.
 from utils.config import check_config, add_args, config
-from utils.misc import ttl_get_block
+from utils.metrics import Metrics
+from utils import prover
+from utils.profiling import Profiler
 from base import __spec_version__ as spec_version
-from base.mock import MockSubtensor, MockMetagraph
+from base.blocks import block_tracker
+from base.mock import MockSubtensor, MockMetagraph, mock_wallet
+from base.synchronizer import ChainSynchronizer
 
 
 class BaseNeuron(ABC):
@@ -57,7 +64,8 @@ class BaseNeuron(ABC):
 
     @property
     def block(self):
-        return ttl_get_block(self)
+        # Followed in the background per subtensor, only the first read waits on the chain.
+        return block_tracker(self.subtensor).block
 
     def __init__(self, config=None):
         base_config = copy.deepcopy(config or BaseNeuron.config())
@@ -79,7 +87,7 @@ class BaseNeuron(ABC):
         bt.logging.info("Setting up bittensor objects.")
 
         if self.config.mock:
-            self.wallet = bt.MockWallet(config=self.config)
+            self.wallet = mock_wallet(self.config)
             self.subtensor = MockSubtensor(
                 netuid=self.config.netuid, wallet=self.wallet
             )
@@ -106,6 +114,58 @@ class BaseNeuron(ABC):
             f"Running neuron on subnet: {self.config.netuid} with uid {self.uid} using network: {self.subtensor.chain_endpoint}"
         )
         self.step = 0
+        self.metrics = Metrics()
+        self.synchronizer: ChainSynchronizer = None
+        # substrate-interface websockets are not thread-safe. Calls on `self.subtensor`
+        # take this lock, so the main loop and the chain synchronizer never interleave.
+        self.subtensor_lock = threading.RLock()
+
+        # Collapsed-stack profiler around forward calls, armed by config or SIGUSR1.
+        self.profiler = Profiler(
+            output_dir=self.config.neuron.full_path,
+            name=self.config.neuron.name,
+            calls=self.config.neuron.profile_calls,
+            interval=self.config.neuron.profile_interval,
+        )
+        self.profiler.install_signal_handler()
+        if self.config.neuron.profile:
+            self.profiler.arm()
+
+    def start_prover(self, port: int) -> Client:
+        """
+        Starts the local ZKG RPC server on `port` and returns a client for it.
+        With `--prover_stub` the pure-Python stand-in is used instead of the prover binary.
+        With `--prover_attach` a prover daemon already serving on the port is used if it
+        is healthy and was started with the same scale and setup.
+        """
+        port = self.config.prover_port or port
+        self.prover_attached = False
+        if self.config.prover_attach:
+            client = prover.attach(self.config, port)
+            if client is not None:
+                self.prover_attached = True
+                return client
+            bt.logging.warning(f"Starting a new prover on port {port} instead.")
+
+        return prover.launch(self.config, port)
+
+    def stop_prover(self):
+        """Stops the local ZKG RPC server, unless it is a daemon this neuron attached to."""
+        if not getattr(self, "prover_attached", False):
+            self.client.stop()
+
+    def start_synchronizer(self):
+        """Moves syncing with the chain to a background thread if configured."""
+        if self.config.neuron.background_sync and self.synchronizer is None:
+            self.synchronizer = ChainSynchronizer(
+                self, interval=self.config.neuron.sync_interval
+            )
+            self.synchronizer.start()
+
+    def stop_synchronizer(self):
+        if self.synchronizer is not None:
+            self.synchronizer.stop()
+            self.synchronizer = None
 
     @abstractmethod
     async def forward(self, synapse: bt.Synapse) -> bt.Synapse:
@@ -119,17 +179,19 @@ class BaseNeuron(ABC):
         """
         Wrapper for synchronizing the state of the network for the given miner or validator.
         """
-        # Ensure miner or validator hotkey is still registered on the network.
-        self.check_registered()
+        with self.subtensor_lock:
+            # Ensure miner or validator hotkey is still registered on the network.
+            self.check_registered()
 
-        if self.should_sync_metagraph():
-            self.resync_metagraph()
+            if self.should_sync_metagraph():
+                self.resync_metagraph()
 
-        if self.should_set_weights():
-            self.set_weights()
+            if self.should_set_weights():
+                self.set_weights()
 
         # Always save state.
         self.save_state()
+        self.metrics.dump(os.path.join(self.config.neuron.full_path, "metrics.json"))
 
     def check_registered(self):
         # --- Check for registration.
@@ -0,0 +1,118 @@
+# The MIT License (MIT)
+# Copyright © 2024 Apollo
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+import asyncio
+import time
+from collections import deque
+from concurrent.futures import Executor
+from typing import Any, Awaitable, Callable, Deque, Optional
+
+import bittensor as bt
+
+from utils.metrics import Metrics
+
+
+class RoundPipeline:
+    """
+    Overlaps the stages of consecutive validation rounds.
+
+    A round goes through four stages:
+    - generate(): builds a challenge. Blocking, runs in `executor`.
+    - dispatch(challenge): queries the miners. A coroutine on the event loop.
+    - verify(challenge, dispatched): scores the responses. Blocking, runs in `executor`.
+    - apply(dispatched, rewards): updates the scores. Runs on the event loop.
+
+    Up to `depth` rounds are in flight at once, and the challenge of the next
+    round is generated while the current rounds are dispatched and verified.
+    Rounds are applied strictly in the order they were started, so the score
+    updates are the same as if the rounds had run one after another.
+    """
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        generate: Callable[[], Any],
+        dispatch: Callable[[Any], Awaitable[Any]],
+        verify: Callable[[Any, Any], Any],
+        apply: Callable[[Any, Any], None],
+        depth: int = 2,
+        executor: Optional[Executor] = None,
+        metrics: Optional[Metrics] = None,
+        retry_delay: float = 5.0,
+    ):
+        self.loop = loop
+        self.generate = generate
+        self.dispatch = dispatch
+        self.verify = verify
+        self.apply = apply
+        self.depth = max(1, depth)
+        self.executor = executor
+        self.metrics = metrics or Metrics()
+        self.retry_delay = retry_delay
+        self.rounds: Deque[asyncio.Future] = deque()
+        self.prefetched: Optional[asyncio.Future] = None
+
+    def next_challenge(self) -> asyncio.Future:
+        """Hands out the prefetched challenge and starts generating the next one."""
+        challenge = self.prefetched or self.loop.run_in_executor(
+            self.executor, self.generate
+        )
+        self.prefetched = self.loop.run_in_executor(self.executor, self.generate)
+        return challenge
+
+    async def run_round(self, challenge: asyncio.Future):
+        start = time.time()
+        challenge = await challenge
+        dispatched = await self.dispatch(challenge)
+        rewards = await self.loop.run_in_executor(
+            self.executor, self.verify, challenge, dispatched
+        )
+        self.metrics.observe("round_latency_s", time.time() - start)
+        return dispatched, rewards
+
+    async def step(self):
+        """Fills the pipeline up to `depth` rounds and completes the oldest round."""
+        while len(self.rounds) < self.depth:
+            self.rounds.append(
+                asyncio.ensure_future(self.run_round(self.next_challenge()))
+            )
+        self.metrics.set("rounds_in_flight", len(self.rounds))
+        await self.complete_oldest()
+
+    async def close(self):
+        """Cancels the rounds in flight and the prefetched challenge."""
+        pending = list(self.rounds)
+        if self.prefetched is not None:
+            pending.append(self.prefetched)
+        self.rounds.clear()
+        self.prefetched = None
+        for future in pending:
+            future.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    async def complete_oldest(self):
+        oldest = self.rounds.popleft()
+        try:
+            dispatched, rewards = await oldest
+        except Exception as e:
+            self.metrics.inc("rounds_failed")
+            bt.logging.error(f"Validation round failed: {e}")
+            bt.logging.error(f"Retrying in {self.retry_delay} seconds...")
+            await asyncio.sleep(self.retry_delay)
+            return
+        self.apply(dispatched, rewards)
+        self.metrics.inc("rounds")
@@ -20,6 +20,10 @@ from typing import List, Optional
 import bittensor as bt
 from pydantic import Field
 
+# Part of the status message of requests a miner turned away because its proof queue
+# was full. Validators don't score those like failed proofs.
+OVER_CAPACITY = "Proof queue is full."
+
 
 class Prove(bt.Synapse):
     """
@@ -61,3 +65,110 @@ class Prove(bt.Synapse):
 
     def deserialize(self):
         return self
+
+
+class ProveBatch(bt.Synapse):
+    """
+    A protocol for proving several polynomial rows in one request, possibly at
+    different inputs. Row k is `polys[k]` of worker `indices[k]`, opened at
+    `alphas[k]`.
+    """
+
+    indices: List[int] = Field(
+        ...,
+        title="Worker Indices",
+        description="The index the miner should use for each row.",
+        frozen=True,
+    )
+    polys: List[List[str]] = Field(
+        ...,
+        title="Polynomials",
+        description="The polynomial rows to prove.",
+        frozen=True,
+    )
+    alphas: List[str] = Field(
+        ...,
+        title="Inputs",
+        description="The input to evaluate each row at.",
+        frozen=True,
+    )
+    evals: Optional[List[Optional[str]]] = Field(
+        title="Evaluations",
+        description="The evaluation of each row at its input.",
+        default=None,
+    )
+    commitments: Optional[List[Optional[str]]] = Field(
+        title="Commitments",
+        description="The commitment to each row.",
+        default=None,
+    )
+    proofs: Optional[List[Optional[str]]] = Field(
+        title="Proofs",
+        description="The opening proof of each row.",
+        default=None,
+    )
+
+    def row(self, k: int) -> Prove:
+        """Row `k` of the batch as a `Prove`, with the terminal info of the batch."""
+
+        def pick(values: Optional[List]) -> Optional[str]:
+            return values[k] if values is not None and k < len(values) else None
+
+        return Prove(
+            index=self.indices[k] if k < len(self.indices) else 0,
+            poly=[],
+            alpha=pick(self.alphas),
+            eval=pick(self.evals),
+            commitment=pick(self.commitments),
+            proof=pick(self.proofs),
+            dendrite=self.dendrite,
+            axon=self.axon,
+        )
+
+    def deserialize(self):
+        return self
+
+
+class Verify(bt.Synapse):
+    """
+    A protocol for verifying KZG opening proofs.
+    """
+
+    index: int = Field(
+        ...,
+        title="Worker Index",
+        description="The Index of the worker that produced the proof.",
+        frozen=True,
+    )
+    commitment: str = Field(
+        ...,
+        title="Commitment",
+        description="The commitment to the polynomial.",
+        frozen=True,
+    )
+    alpha: str = Field(
+        ...,
+        title="Input",
+        description="The input the polynomial was opened at.",
+        frozen=True,
+    )
+    eval: str = Field(
+        ...,
+        title="Evaluation",
+        description="The claimed evaluation of the polynomial at the input.",
+        frozen=True,
+    )
+    proof: str = Field(
+        ...,
+        title="Proof",
+        description="The opening proof.",
+        frozen=True,
+    )
+    valid: Optional[bool] = Field(
+        title="Valid",
+        description="Whether the proof is valid.",
+        default=None,
+    )
+
+    def deserialize(self):
+        return self
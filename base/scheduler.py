@@ -0,0 +1,176 @@
+# The MIT License (MIT)
+# Copyright © 2024 Apollo
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+import asyncio
+import random
+import time
+from collections import deque
+from concurrent.futures import Executor
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Sequence, Tuple
+
+import bittensor as bt
+
+from utils.metrics import Metrics
+
+
+class RollingScheduler:
+    """
+    Evaluates miners continuously instead of in synchronized rounds.
+
+    Up to `target` miner evaluations are in flight at once, and a new one is
+    started as soon as one completes, so the upload of challenges and the
+    verification of proofs are spread evenly over time. An evaluation goes
+    through the stages of a pipelined round, for a single miner:
+    - generate(): builds a challenge. Blocking, runs in `executor`.
+    - dispatch(challenge, row, uid): queries miner `uid` with one row of the challenge.
+    - verify(challenge, dispatched): scores the response. Blocking, runs in `executor`.
+    - apply(dispatched, rewards): updates the scores. Runs on the event loop.
+
+    The `rows(challenge)` rows of a challenge are handed out to consecutive
+    evaluations, and the next challenge is generated while they are in use.
+    Miners are picked from shuffled passes over `candidates()`, so every miner
+    is evaluated once per pass, and never twice at the same time.
+    """
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        candidates: Callable[[], Sequence[int]],
+        generate: Callable[[], Any],
+        rows: Callable[[Any], int],
+        dispatch: Callable[[Any, int, int], Awaitable[Any]],
+        verify: Callable[[Any, Any], Any],
+        apply: Callable[[Any, Any], None],
+        target: int = 8,
+        executor: Optional[Executor] = None,
+        metrics: Optional[Metrics] = None,
+        retry_delay: float = 5.0,
+    ):
+        self.loop = loop
+        self.candidates = candidates
+        self.generate = generate
+        self.rows = rows
+        self.dispatch = dispatch
+        self.verify = verify
+        self.apply = apply
+        self.target = max(1, target)
+        self.executor = executor
+        self.metrics = metrics or Metrics()
+        self.retry_delay = retry_delay
+        # Evaluations in flight and the uid each of them queries.
+        self.inflight: Dict[asyncio.Future, int] = {}
+        # The uids left in the current pass over the metagraph.
+        self.cycle: Deque[int] = deque()
+        self.challenge: Optional[asyncio.Future] = None
+        self.prefetched: Optional[asyncio.Future] = None
+        self.row = 0
+        self.row_lock = asyncio.Lock()
+
+    def next_uid(self) -> Optional[int]:
+        """
+        The next uid of the current pass that is not being evaluated already.
+        Starts the next pass early if the rest of the current one is busy.
+        """
+        busy = set(self.inflight.values())
+        for uid in self.cycle:
+            if uid not in busy:
+                self.cycle.remove(uid)
+                return uid
+
+        candidates = list(self.candidates())
+        if len(self.cycle) >= len(candidates):
+            # Every candidate is busy.
+            return None
+        random.shuffle(candidates)
+        self.cycle.extend(candidates)
+        return self.next_uid()
+
+    def next_challenge(self) -> asyncio.Future:
+        """Hands out the prefetched challenge and starts generating the next one."""
+        challenge = self.prefetched or self.loop.run_in_executor(
+            self.executor, self.generate
+        )
+        self.prefetched = self.loop.run_in_executor(self.executor, self.generate)
+        return challenge
+
+    async def claim_row(self) -> Tuple[Any, int]:
+        """Hands out the next unused row, moving on to a new challenge when they run out."""
+        async with self.row_lock:
+            if self.challenge is None:
+                self.challenge, self.row = self.next_challenge(), 0
+            try:
+                challenge = await self.challenge
+                if self.row >= self.rows(challenge):
+                    self.challenge, self.row = self.next_challenge(), 0
+                    challenge = await self.challenge
+            except Exception:
+                # Don't keep handing out a challenge that failed to generate.
+                self.challenge = None
+                raise
+            row = self.row
+            self.row += 1
+            return challenge, row
+
+    async def evaluate(self, uid: int):
+        start = time.time()
+        challenge, row = await self.claim_row()
+        dispatched = await self.dispatch(challenge, row, uid)
+        rewards = await self.loop.run_in_executor(
+            self.executor, self.verify, challenge, dispatched
+        )
+        self.metrics.observe("evaluation_latency_s", time.time() - start)
+        return dispatched, rewards
+
+    async def step(self):
+        """Tops up the evaluations in flight to `target` and completes the first to finish."""
+        while len(self.inflight) < self.target:
+            uid = self.next_uid()
+            if uid is None:
+                break
+            self.inflight[asyncio.ensure_future(self.evaluate(uid))] = uid
+        self.metrics.set("evaluations_in_flight", len(self.inflight))
+
+        if not self.inflight:
+            bt.logging.error("No miners available to query.")
+            await asyncio.sleep(self.retry_delay)
+            return
+
+        done, _ = await asyncio.wait(
+            list(self.inflight), return_when=asyncio.FIRST_COMPLETED
+        )
+        for future in done:
+            uid = self.inflight.pop(future)
+            try:
+                dispatched, rewards = future.result()
+            except Exception as e:
+                self.metrics.inc("evaluations_failed")
+                bt.logging.error(f"Evaluation of uid {uid} failed: {e}")
+                bt.logging.error(f"Retrying in {self.retry_delay} seconds...")
+                await asyncio.sleep(self.retry_delay)
+                continue
+            self.apply(dispatched, rewards)
+            self.metrics.inc("evaluations")
+
+    async def close(self):
+        """Cancels the evaluations in flight and the challenges being generated."""
+        pending = list(self.inflight)
+        pending += [f for f in (self.challenge, self.prefetched) if f is not None]
+        self.inflight.clear()
+        self.challenge, self.prefetched = None, None
+        for future in pending:
+            future.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
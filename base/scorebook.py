@@ -0,0 +1,146 @@
+# The MIT License (MIT)
+# Copyright © 2024 Apollo
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+
+class ScoreBook:
+    """
+    Per-uid validator state, kept as preallocated column arrays.
+
+    Columns, indexed by uid:
+    - scores: the moving average of the rewards of the miner (float32).
+    - updated: the block at which the miner was last scored.
+    - hotkey_ids: the hotkey registered on the uid, as an index into `names`.
+    - samples: the number of times the miner was scored since it registered.
+
+    The columns are updated in place. They only grow when the metagraph
+    expands, by doubling their capacity, so scoring a round allocates nothing
+    the size of the metagraph. `scores` and the other properties are views
+    of the first `n` entries and change as the book is updated.
+    """
+
+    def __init__(self, alpha: float = 0.1, capacity: int = 256):
+        self.alpha = alpha
+        self.n = 0
+        self.names: List[str] = []
+        self.ids: Dict[str, int] = {}
+        self._scores = np.zeros(capacity, dtype=np.float32)
+        self._updated = np.zeros(capacity, dtype=np.int64)
+        self._hotkey_ids = np.full(capacity, -1, dtype=np.int64)
+        self._samples = np.zeros(capacity, dtype=np.int64)
+
+    @property
+    def capacity(self) -> int:
+        return len(self._scores)
+
+    @property
+    def scores(self) -> np.ndarray:
+        return self._scores[: self.n]
+
+    @property
+    def updated(self) -> np.ndarray:
+        return self._updated[: self.n]
+
+    @property
+    def hotkey_ids(self) -> np.ndarray:
+        return self._hotkey_ids[: self.n]
+
+    @property
+    def samples(self) -> np.ndarray:
+        return self._samples[: self.n]
+
+    @property
+    def hotkeys(self) -> List[str]:
+        return [self.names[i] if i >= 0 else None for i in self.hotkey_ids]
+
+    def intern(self, hotkey: str) -> int:
+        if hotkey not in self.ids:
+            self.ids[hotkey] = len(self.names)
+            self.names.append(hotkey)
+        return self.ids[hotkey]
+
+    def reserve(self, n: int):
+        """Makes room for `n` uids, at least doubling the capacity when it grows."""
+        if n <= self.capacity:
+            return
+        capacity = max(n, 2 * self.capacity)
+        for name, fill in [
+            ("_scores", 0),
+            ("_updated", 0),
+            ("_hotkey_ids", -1),
+            ("_samples", 0),
+        ]:
+            column = getattr(self, name)
+            grown = np.full(capacity, fill, dtype=column.dtype)
+            grown[: self.n] = column[: self.n]
+            setattr(self, name, grown)
+
+    def clear(self, uids):
+        self._scores[uids] = 0
+        self._updated[uids] = 0
+        self._samples[uids] = 0
+
+    def sync(self, hotkeys: Sequence[str]):
+        """
+        Follows the hotkeys of a metagraph: uids whose hotkey was replaced
+        lose their scores, and new uids start from zero.
+        """
+        n = len(hotkeys)
+        self.reserve(n)
+        ids = np.fromiter((self.intern(h) for h in hotkeys), dtype=np.int64, count=n)
+        common = min(n, self.n)
+        replaced = np.flatnonzero(self._hotkey_ids[:common] != ids[:common])
+        self.clear(replaced)
+        # Uids that left the metagraph are cleared for reuse.
+        self.clear(slice(n, max(n, self.n)))
+        self._hotkey_ids[n : max(n, self.n)] = -1
+        self._hotkey_ids[:n] = ids
+        self.n = n
+
+    def update(self, uids: np.ndarray, rewards: np.ndarray, block: int = 0):
+        """
+        Folds the rewards of a round into the moving averages. Miners that
+        were not part of the round decay towards zero. Assumes the uids are
+        mutually exclusive.
+        """
+        scores = self.scores
+        scores *= 1 - self.alpha
+        scores[uids] += self.alpha * rewards
+        self._updated[uids] = block
+        self._samples[uids] += 1
+
+    def state(self) -> Dict[str, np.ndarray]:
+        return {
+            "scores": self.scores,
+            "updated": self.updated,
+            "samples": self.samples,
+            "hotkeys": np.array(self.hotkeys),
+        }
+
+    def load(self, state):
+        """Restores the book from `state`, as saved from `state()`."""
+        self.n = 0
+        self.clear(slice(None))
+        self._hotkey_ids[:] = -1
+        self.sync([str(hotkey) for hotkey in state["hotkeys"]])
+        self.scores[:] = state["scores"][: self.n]
+        for column in ("updated", "samples"):
+            if column in state:
+                getattr(self, column)[:] = state[column][: self.n]
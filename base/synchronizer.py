@@ -0,0 +1,75 @@
+# The MIT License (MIT)
+# Copyright © 2024 Apollo
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+import threading
+import time
+import traceback
+from typing import Optional
+
+import bittensor as bt
+
+
+class ChainSynchronizer:
+    """
+    Runs a neuron's `sync()` (registration check, metagraph refresh, weight
+    setting and state saving) on its own thread and cadence, so slow or stuck
+    subtensor calls never stall the forward loop.
+
+    The neuron publishes each refreshed metagraph by swapping `neuron.metagraph`
+    for a new object rather than syncing it in place, so the forward loop always
+    reads a complete snapshot.
+    """
+
+    def __init__(self, neuron, interval: float = 24.0):
+        self.neuron = neuron
+        self.interval = interval
+        self.stop_event = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self.stop_event.clear()
+        self.thread = threading.Thread(
+            target=self.run, name="chain-synchronizer", daemon=True
+        )
+        self.thread.start()
+        bt.logging.info(f"Syncing with the chain every {self.interval} seconds.")
+
+    def stop(self, timeout: float = 5.0):
+        self.stop_event.set()
+        if self.thread is not None:
+            # A stuck subtensor call can outlive the timeout, the thread is a daemon.
+            self.thread.join(timeout)
+            self.thread = None
+
+    def run(self):
+        while not self.stop_event.wait(self.interval):
+            self.sync_once()
+
+    def sync_once(self):
+        start = time.time()
+        try:
+            self.neuron.sync()
+        except SystemExit:
+            # `check_registered` exits when the hotkey is deregistered.
+            bt.logging.error("Hotkey is no longer registered, stopping.")
+            self.neuron.should_exit = True
+            self.stop_event.set()
+        except Exception:
+            self.neuron.metrics.inc("sync_failures")
+            bt.logging.error(f"Background sync failed: {traceback.format_exc()}")
+        finally:
+            self.neuron.metrics.observe("sync_latency_s", time.time() - start)
@@ -19,16 +19,22 @@
 import argparse
 import asyncio
 import copy
+import functools
 import threading
+from abc import abstractmethod
 from traceback import print_exception
-from typing import List
+from typing import List, Optional, Tuple
 
 import bittensor as bt
 import numpy as np
-from fourier import Client
 
+from base.dendrite import PooledDendrite, changed_endpoints
 from base.mock import MockDendrite
 from base.neuron import BaseNeuron
+from base.pipeline import RoundPipeline
+from base.scheduler import RollingScheduler
+from base.scorebook import ScoreBook
+from base.weights import WeightSubmitter, own_connection
 from utils.config import add_validator_args
 
 
@@ -51,19 +57,48 @@ class BaseValidatorNeuron(BaseNeuron):
         bt.turn_console_on()
         super().__init__(config=config)
 
-        # Save a copy of the hotkeys to local memory.
-        self.hotkeys = copy.deepcopy(self.metagraph.hotkeys)
-
         # Dendrite lets us send messages to other nodes (axons) in the network.
+        # Create asyncio event loop to manage async tasks.
+        self.loop = asyncio.get_event_loop()
+
+        # Connections to miners are kept alive and reused across rounds.
         if self.config.mock:
             self.dendrite = MockDendrite(wallet=self.wallet)
         else:
-            self.dendrite = bt.dendrite(wallet=self.wallet)
+            self.dendrite = PooledDendrite(
+                wallet=self.wallet,
+                limit=self.config.neuron.dendrite_pool_size,
+                limit_per_host=self.config.neuron.dendrite_pool_per_axon,
+                keepalive_timeout=self.config.neuron.dendrite_keepalive,
+                metrics=self.metrics,
+            )
         bt.logging.info(f"Dendrite: {self.dendrite}")
 
         # Set up initial scoring weights for validation
         bt.logging.info("Building validation weights.")
-        self.scores = np.zeros(self.metagraph.n, dtype=np.float32)
+        # The scores and the hotkey they belong to, by uid.
+        self.scorebook = ScoreBook(alpha=self.config.neuron.moving_average_alpha)
+        self.scorebook.sync(self.metagraph.hotkeys)
+        # Guards the scores, which pipelined rounds update while the chain is synced.
+        self.scores_lock = threading.Lock()
+        self.pipeline: RoundPipeline = None
+        self.scheduler: RollingScheduler = None
+
+        # Submit weights off the critical path if configured.
+        self.weight_submitter: WeightSubmitter = None
+        # The submitter thread calls the chain while `sync()` does, over its own connection.
+        self.weights_subtensor: "bt.subtensor" = self.subtensor
+        if self.config.neuron.async_set_weights:
+            self.weights_subtensor = own_connection(self.subtensor)
+            self.weight_submitter = WeightSubmitter(
+                functools.partial(
+                    self.submit_weights, subtensor=self.weights_subtensor
+                ),
+                metrics=self.metrics,
+                retries=self.config.neuron.set_weights_retries,
+                backoff=self.config.neuron.set_weights_backoff,
+            )
+            self.weight_submitter.start()
 
         # Init sync with the network. Updates the metagraph.
         self.sync()
@@ -74,21 +109,8 @@ class BaseValidatorNeuron(BaseNeuron):
         else:
             bt.logging.warning("axon off, not serving ip to chain.")
 
-        # Create asyncio event loop to manage async tasks.
-        self.loop = asyncio.get_event_loop()
-
         # change port to 1338 so it doesn't conflict with the miner
-        PORT = 1338
-        self.client = Client(
-            port=PORT,
-            bin=self.config.prover_path,
-            setup_path=self.config.setup_path,
-            uncompressed=self.config.uncompressed,
-            precompute_path=self.config.precompute_path,
-        )
-        self.client.start(
-            scale=self.config.scale, machines_scale=self.config.machines_scale
-        )
+        self.client = self.start_prover(port=1338)
 
         # Instantiate runners
         self.should_exit: bool = False
@@ -96,6 +118,22 @@ class BaseValidatorNeuron(BaseNeuron):
         self.thread: threading.Thread = None
         self.lock = asyncio.Lock()
 
+    @property
+    def scores(self) -> np.ndarray:
+        return self.scorebook.scores
+
+    @property
+    def hotkeys(self) -> List[str]:
+        return self.scorebook.hotkeys
+
+    def stop_weight_submitter(self):
+        if self.weight_submitter is not None:
+            self.weight_submitter.stop()
+            self.weight_submitter = None
+        if self.weights_subtensor is not self.subtensor:
+            self.weights_subtensor.close()
+            self.weights_subtensor = self.subtensor
+
     def serve_axon(self):
         """Serve axon to enable external connections."""
 
@@ -125,6 +163,105 @@ class BaseValidatorNeuron(BaseNeuron):
         ]
         await asyncio.gather(*coroutines)
 
+    @abstractmethod
+    def generate_round(self):
+        """Builds the challenge of a pipelined round. Blocking."""
+        ...
+
+    @abstractmethod
+    async def dispatch_round(self, challenge):
+        """Queries the miners with a challenge and returns what `verify_round` needs."""
+        ...
+
+    @abstractmethod
+    def verify_round(self, challenge, dispatched) -> np.ndarray:
+        """Scores the responses of a dispatched round. Blocking."""
+        ...
+
+    @abstractmethod
+    def apply_round(self, dispatched, rewards: np.ndarray):
+        """Applies the rewards of a round to the scores."""
+        ...
+
+    @abstractmethod
+    def candidate_uids(self) -> List[int]:
+        """The uids the rolling scheduler evaluates."""
+        ...
+
+    @abstractmethod
+    def challenge_rows(self, challenge) -> int:
+        """The number of miners that can be queried with one challenge."""
+        ...
+
+    @abstractmethod
+    async def dispatch_row(self, challenge, row: int, uid: int):
+        """Queries one miner with one row of a challenge, like `dispatch_round`."""
+        ...
+
+    async def rolling_forward(self):
+        """
+        Completes as many miner evaluations as the rolling scheduler keeps in flight
+        and syncs with the chain, starting a new evaluation whenever one completes.
+        """
+        if self.scheduler is None:
+            self.scheduler = RollingScheduler(
+                loop=self.loop,
+                candidates=self.candidate_uids,
+                generate=self.generate_round,
+                rows=self.challenge_rows,
+                dispatch=self.dispatch_row,
+                verify=self.verify_round,
+                apply=self.apply_round,
+                target=self.config.neuron.rolling_inflight,
+                metrics=self.metrics,
+            )
+        for _ in range(self.scheduler.target):
+            await self.scheduler.step()
+        if self.synchronizer is None:
+            await self.loop.run_in_executor(None, self.sync)
+
+    async def pipelined_forward(self):
+        """
+        Completes one round of the round pipeline and syncs with the chain, without
+        stalling the rounds in flight.
+        """
+        if self.pipeline is None:
+            self.pipeline = RoundPipeline(
+                loop=self.loop,
+                generate=self.generate_round,
+                dispatch=self.dispatch_round,
+                verify=self.verify_round,
+                apply=self.apply_round,
+                depth=self.config.neuron.max_inflight_rounds,
+                metrics=self.metrics,
+            )
+        await self.pipeline.step()
+        if self.synchronizer is None:
+            await self.loop.run_in_executor(None, self.sync)
+
+    async def close_rounds(self):
+        """Cancels the rounds, evaluations and challenges still in flight."""
+        if self.pipeline is not None:
+            await self.pipeline.close()
+            self.pipeline = None
+        if self.scheduler is not None:
+            await self.scheduler.close()
+            self.scheduler = None
+
+    def stop_rounds(self):
+        """Runs `close_rounds` on the validator's event loop, whether or not it is running."""
+        try:
+            if self.loop.is_running():
+                # The run thread did not stop in time and still owns the loop.
+                closing = asyncio.run_coroutine_threadsafe(
+                    self.close_rounds(), self.loop
+                )
+                closing.result(5)
+            else:
+                self.loop.run_until_complete(self.close_rounds())
+        except Exception as e:
+            bt.logging.warning(f"Failed to close the rounds in flight: {e}")
+
     def run(self):
         """
         Initiates and manages the main loop for the miner on the Bittensor network. The main loop handles graceful shutdown on keyboard interrupts and logs unforeseen errors.
@@ -147,6 +284,7 @@ class BaseValidatorNeuron(BaseNeuron):
 
         # Check that validator is registered on the network.
         self.sync()
+        self.start_synchronizer()
 
         bt.logging.info(f"Validator starting at block: {self.block}")
 
@@ -155,22 +293,43 @@ class BaseValidatorNeuron(BaseNeuron):
             try:
                 bt.logging.info(f"step({self.step}) block({self.block})")
 
-                # Run multiple forwards concurrently.
-                self.loop.run_until_complete(self.concurrent_forward())
-
-                # Check if we should exit.
-                if self.should_exit:
-                    break
-
-                # Sync metagraph and potentially set weights.
-                self.sync()
+                if self.config.neuron.rolling_inflight > 0:
+                    # Evaluate miners continuously, syncing in between.
+                    with self.profiler.track():
+                        self.loop.run_until_complete(self.rolling_forward())
+
+                    if self.should_exit:
+                        break
+                elif self.config.neuron.max_inflight_rounds > 1:
+                    # Overlap consecutive rounds, syncing in between.
+                    with self.profiler.track():
+                        self.loop.run_until_complete(self.pipelined_forward())
+
+                    if self.should_exit:
+                        break
+                else:
+                    # Run multiple forwards concurrently.
+                    with self.profiler.track():
+                        self.loop.run_until_complete(self.concurrent_forward())
+
+                    # Check if we should exit.
+                    if self.should_exit:
+                        break
+
+                    # Sync metagraph and potentially set weights, unless a
+                    # background synchronizer does so.
+                    if self.synchronizer is None:
+                        self.sync()
 
                 self.step += 1
 
             # If someone intentionally stops the validator, it'll safely terminate operations.
             except KeyboardInterrupt:
+                self.stop_rounds()
                 self.axon.stop()
-                self.client.stop()
+                self.stop_synchronizer()
+                self.stop_weight_submitter()
+                self.stop_prover()
                 bt.logging.success("Validator killed by keyboard interrupt.")
                 exit()
 
@@ -197,10 +356,13 @@ class BaseValidatorNeuron(BaseNeuron):
         Stops the validator's operations that are running in the background thread.
         """
         if self.is_running:
-            self.client.stop()
+            self.stop_synchronizer()
+            self.stop_weight_submitter()
+            self.stop_prover()
             bt.logging.debug("Stopping validator in background thread.")
             self.should_exit = True
             self.thread.join(5)
+            self.stop_rounds()
             self.is_running = False
             bt.logging.debug("Stopped")
 
@@ -222,39 +384,71 @@ class BaseValidatorNeuron(BaseNeuron):
                        None if the context was exited without an exception.
         """
         if self.is_running:
+            self.stop_synchronizer()
+            self.stop_weight_submitter()
             bt.logging.debug("Stopping validator in background thread.")
             self.should_exit = True
             self.thread.join(5)
+            self.stop_rounds()
             self.is_running = False
             bt.logging.debug("Stopped")
 
     def set_weights(self):
         """
         Sets the validator weights to the metagraph hotkeys based on the scores it has received from the miners. The weights determine the trust and incentive level the validator assigns to miner nodes on the network.
+        With `--neuron.async_set_weights` the weights are submitted by a background job and this returns immediately.
         """
+        with self.scores_lock:
+            scores = self.scores.copy()
+        snapshot = (scores, self.metagraph)
+
+        if self.weight_submitter is not None:
+            self.weight_submitter.submit(snapshot)
+            return
+
+        result, msg = self.submit_weights(snapshot)
+        if result is True:
+            bt.logging.info("set_weights on chain successfully!")
+        else:
+            bt.logging.error("set_weights failed", msg)
 
-        # Check if self.scores contains any NaN values and log a warning if it does.
-        if np.isnan(self.scores).any():
+    def normalize_weights(self, scores: np.ndarray) -> np.ndarray:
+        """The raw weights of the scores, before the subnet's weight limits are applied."""
+        # Check if the scores contain any NaN values and log a warning if they do.
+        if np.isnan(scores).any():
             bt.logging.warning(
                 f"Scores contain NaN values. This may be due to a lack of responses from miners, or a bug in your reward functions."
             )
 
         # Calculate the average reward for each uid across non-zero values.
         # Replace any NaN values with 0.
-        raw_weights = self.scores / np.linalg.norm(self.scores, ord=1, axis=0, keepdims=True)
+        return scores / np.linalg.norm(scores, ord=1, axis=0, keepdims=True)
+
+    def submit_weights(
+        self,
+        snapshot: Tuple[np.ndarray, "bt.metagraph"],
+        subtensor: Optional["bt.subtensor"] = None,
+    ) -> Tuple[bool, str]:
+        """
+        Normalizes a snapshot of the scores and sets them as weights on chain, over
+        `subtensor` if given, e.g. a connection owned by the weight submitter.
+        """
+        subtensor = subtensor or self.subtensor
+        scores, metagraph = snapshot
+        raw_weights = self.normalize_weights(scores)
 
         bt.logging.debug("raw_weights", raw_weights)
-        bt.logging.debug("raw_weight_uids", str(self.metagraph.uids.tolist()))
+        bt.logging.debug("raw_weight_uids", str(metagraph.uids.tolist()))
         # Process the raw weights to final_weights via subtensor limitations.
         (
             processed_weight_uids,
             processed_weights,
         ) = bt.utils.weight_utils.process_weights_for_netuid(
-            uids=self.metagraph.uids,
+            uids=metagraph.uids,
             weights=raw_weights,
             netuid=self.config.netuid,
-            subtensor=self.subtensor,
-            metagraph=self.metagraph,
+            subtensor=subtensor,
+            metagraph=metagraph,
         )
         bt.logging.debug("processed_weights", processed_weights)
         bt.logging.debug("processed_weight_uids", processed_weight_uids)
@@ -270,7 +464,7 @@ class BaseValidatorNeuron(BaseNeuron):
         bt.logging.debug("uint_uids", uint_uids)
 
         # Set the weights on chain via our subtensor connection.
-        result, msg = self.subtensor.set_weights(
+        return subtensor.set_weights(
             wallet=self.wallet,
             netuid=self.config.netuid,
             uids=uint_uids,
@@ -279,44 +473,33 @@ class BaseValidatorNeuron(BaseNeuron):
             wait_for_inclusion=False,
             version_key=self.spec_version,
         )
-        if result is True:
-            bt.logging.info("set_weights on chain successfully!")
-        else:
-            bt.logging.error("set_weights failed", msg)
 
     def resync_metagraph(self):
         """Resyncs the metagraph and updates the hotkeys and moving averages based on the new metagraph."""
         bt.logging.info("resync_metagraph()")
 
-        # Copies state of metagraph before syncing.
-        previous_metagraph = copy.deepcopy(self.metagraph)
-
-        # Sync the metagraph.
-        self.metagraph.sync(subtensor=self.subtensor)
+        # Sync a copy of the metagraph and publish it once complete, so the
+        # forward loop never reads a partially synced metagraph.
+        metagraph = copy.deepcopy(self.metagraph)
+        metagraph.sync(subtensor=self.subtensor)
 
         # Check if the metagraph axon info has changed.
-        if previous_metagraph.axons == self.metagraph.axons:
+        if metagraph.axons == self.metagraph.axons:
+            self.metagraph = metagraph
             return
 
         bt.logging.info(
             "Metagraph updated, re-syncing hotkeys, dendrite pool and moving averages"
         )
-        # Zero out all hotkeys that have been replaced.
-        for uid, hotkey in enumerate(self.hotkeys):
-            if hotkey != self.metagraph.hotkeys[uid]:
-                self.scores[uid] = 0  # hotkey has been replaced
-
-        # Check to see if the metagraph has changed size.
-        # If so, we need to add new hotkeys and moving averages.
-        if len(self.hotkeys) < len(self.metagraph.hotkeys):
-            # Update the size of the moving average scores.
-            new_moving_average = np.zeros((self.metagraph.n))
-            min_len = min(len(self.hotkeys), len(self.scores))
-            new_moving_average[:min_len] = self.scores[:min_len]
-            self.scores = new_moving_average
-
-        # Update the hotkeys.
-        self.hotkeys = copy.deepcopy(self.metagraph.hotkeys)
+        # Drop pooled connections to axons that moved, on the loop that owns them.
+        moved = changed_endpoints(self.metagraph.axons, metagraph.axons)
+        if moved and isinstance(self.dendrite, PooledDendrite):
+            self.loop.call_soon_threadsafe(self.dendrite.recycle, moved)
+
+        with self.scores_lock:
+            self.metagraph = metagraph
+            # Zero out all hotkeys that have been replaced and make room for new ones.
+            self.scorebook.sync(self.metagraph.hotkeys)
 
     def update_scores(self, rewards: np.ndarray, uids: List[int]):
         """Performs exponential moving average on the scores based on the rewards received from the miners."""
@@ -327,37 +510,25 @@ class BaseValidatorNeuron(BaseNeuron):
             # Replace any NaN values in rewards with 0.
             rewards = np.nan_to_num(rewards, 0)
 
-        # Check if `uids` is already a tensor and clone it to avoid the warning.
-        if isinstance(uids, np.ndarray):
-            uids_array = uids.copy()
-        else:
-            uids_array = np.array(uids)
-
-        # Compute forward pass rewards, assumes uids are mutually exclusive.
-        # shape: [ metagraph.n ]
-        scattered_rewards: np.ndarray = np.zeros_like(self.scores)
-        scattered_rewards[uids_array] = rewards
-        bt.logging.debug(f"Scattered rewards: {rewards}")
-
-        # Update scores with rewards produced by this step.
-        # shape: [ metagraph.n ]
-        alpha: float = self.config.neuron.moving_average_alpha
-        self.scores: np.ndarray = alpha * scattered_rewards + (
-            1 - alpha
-        ) * self.scores
-        bt.logging.debug(f"Updated moving avg scores: {self.scores}")
+        uids_array = np.asarray(uids, dtype=np.int64)
+
+        block = self.block
+        with self.scores_lock:
+            # Update scores with rewards produced by this step, in place.
+            self.scorebook.update(uids_array, rewards, block)
+            bt.logging.debug(f"Updated moving avg scores: {self.scores}")
 
     def save_state(self):
         """Saves the state of the validator to a file."""
         bt.logging.info("Saving validator state.")
 
         # Save the state of the validator to file.
-        np.savez(
-            self.config.neuron.full_path + "/state.npz",
-            step=self.step,
-            scores=self.scores,
-            hotkeys=self.hotkeys,
-        )
+        with self.scores_lock:
+            np.savez(
+                self.config.neuron.full_path + "/state.npz",
+                step=self.step,
+                **self.scorebook.state(),
+            )
 
     def load_state(self):
         """Loads the state of the validator from a file."""
@@ -366,5 +537,5 @@ class BaseValidatorNeuron(BaseNeuron):
         # Load the state of the validator from file.
         state = np.load(self.config.neuron.full_path + "/state.npz")
         self.step = state["step"]
-        self.scores = state["scores"]
-        self.hotkeys = state["hotkeys"]
+        with self.scores_lock:
+            self.scorebook.load(state)
@@ -0,0 +1,155 @@
+# The MIT License (MIT)
+# Copyright © 2024 Apollo
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+import threading
+import time
+import traceback
+from typing import Any, Callable, Optional, Tuple
+
+import bittensor as bt
+
+from utils.metrics import Metrics
+
+_EMPTY = object()
+
+
+def own_connection(subtensor: "bt.subtensor") -> "bt.subtensor":
+    """
+    Opens a separate connection to the chain of `subtensor`. substrate-interface
+    websockets are not thread-safe, so a thread calling the chain next to the
+    neuron's own `sync()` needs its own connection. Mock and stand-in subtensors
+    have no websocket and are returned as is.
+    """
+    if isinstance(subtensor, bt.MockSubtensor) or not isinstance(
+        subtensor, bt.subtensor
+    ):
+        return subtensor
+    return bt.subtensor(network=subtensor.chain_endpoint)
+
+
+class WeightSubmitter:
+    """
+    Submits weights to the chain on a background thread.
+
+    `submit(snapshot)` only stores the snapshot and returns immediately. The
+    thread passes the most recent snapshot to `set_weights`, which returns
+    `(success, message)` like `subtensor.set_weights`. A snapshot that is
+    replaced before it was submitted is dropped, since only the newest weights
+    matter, and failed submissions are retried with exponential backoff unless
+    newer weights arrive in the meantime.
+    """
+
+    def __init__(
+        self,
+        set_weights: Callable[[Any], Tuple[bool, str]],
+        metrics: Optional[Metrics] = None,
+        retries: int = 3,
+        backoff: float = 4.0,
+        max_backoff: float = 60.0,
+    ):
+        self.set_weights = set_weights
+        self.metrics = metrics or Metrics()
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.condition = threading.Condition()
+        self.pending = _EMPTY
+        self.should_stop = False
+        self.busy = False
+        self.thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self.should_stop = False
+        self.thread = threading.Thread(
+            target=self.run, name="weight-submitter", daemon=True
+        )
+        self.thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        with self.condition:
+            self.should_stop = True
+            self.condition.notify_all()
+        if self.thread is not None:
+            self.thread.join(timeout)
+            self.thread = None
+
+    def submit(self, snapshot: Any):
+        with self.condition:
+            if self.pending is not _EMPTY:
+                self.metrics.inc("weights_superseded")
+            self.pending = snapshot
+            self.condition.notify_all()
+
+    def idle(self) -> bool:
+        with self.condition:
+            return self.pending is _EMPTY and not self.busy
+
+    def take(self) -> Any:
+        """Waits for the next snapshot, returns `_EMPTY` when stopping."""
+        with self.condition:
+            while self.pending is _EMPTY and not self.should_stop:
+                self.condition.wait()
+            if self.should_stop:
+                return _EMPTY
+            snapshot, self.pending = self.pending, _EMPTY
+            self.busy = True
+            return snapshot
+
+    def wait_for_retry(self, delay: float) -> bool:
+        """Sleeps before a retry, returns False if newer weights arrived or we are stopping."""
+        deadline = time.time() + delay
+        with self.condition:
+            while self.pending is _EMPTY and not self.should_stop:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return True
+                self.condition.wait(remaining)
+            return False
+
+    def run(self):
+        while True:
+            snapshot = self.take()
+            if snapshot is _EMPTY:
+                return
+            try:
+                self.submit_with_retries(snapshot)
+            finally:
+                with self.condition:
+                    self.busy = False
+
+    def submit_with_retries(self, snapshot: Any):
+        for attempt in range(self.retries + 1):
+            start = time.time()
+            try:
+                success, message = self.set_weights(snapshot)
+            except Exception:
+                success, message = False, traceback.format_exc()
+            self.metrics.observe("set_weights_latency_s", time.time() - start)
+
+            if success:
+                self.metrics.inc("weights_set")
+                bt.logging.info("set_weights on chain successfully!")
+                return
+
+            self.metrics.inc("weights_failed")
+            bt.logging.error(f"set_weights failed (attempt {attempt + 1}): {message}")
+            if attempt == self.retries:
+                return
+            delay = min(self.backoff * 2**attempt, self.max_backoff)
+            if not self.wait_for_retry(delay):
+                bt.logging.info("Dropping retry, newer weights are pending.")
+                return
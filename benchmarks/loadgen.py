@@ -0,0 +1,305 @@
+# The MIT License (MIT)
+# Copyright © 2024 Apollo
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+"""
+Load generator that drives a miner axon with valid Prove challenges.
+
+Challenges are generated and responses verified with the validator's own logic, so the
+prover settings (or `--prover_stub`) must match the ones of the target miner. A mock
+wallet signs the requests, so a local miner should run with `--blacklist.allow_non_registered`.
+
+Closed loop, with a fixed number of clients sending back-to-back requests:
+
+    python -m benchmarks.loadgen --target 127.0.0.1:8091 --target_hotkey <miner hotkey> \
+        --mode closed --levels 1,2,4,8,16 --duration 30 <prover arguments>
+
+Open loop, with requests sent at a fixed rate regardless of completions:
+
+    python -m benchmarks.loadgen ... --mode open --levels 5,10,20,40
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import bittensor as bt
+
+from base.protocol import Prove
+from benchmarks.run import build_neuron
+from benchmarks.stats import summarize
+from neurons.validator import Challenge, Validator
+
+
+def add_loadgen_args(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        "--target",
+        type=str,
+        help="The ip:port of the miner axon to load.",
+        default="127.0.0.1:8091",
+    )
+    parser.add_argument(
+        "--target_hotkey",
+        type=str,
+        help="The ss58 hotkey of the target miner, requests are signed for it.",
+        required=True,
+    )
+    parser.add_argument(
+        "--mode",
+        type=str,
+        choices=["closed", "open"],
+        help="Closed loop (levels are concurrent clients) or open loop (levels are requests per second).",
+        default="closed",
+    )
+    parser.add_argument(
+        "--levels",
+        type=str,
+        help="Comma separated load levels to sweep.",
+        default="1,2,4,8,16",
+    )
+    parser.add_argument(
+        "--duration",
+        type=float,
+        help="Seconds to hold each load level.",
+        default=30.0,
+    )
+    parser.add_argument(
+        "--request_timeout",
+        type=float,
+        help="Timeout of a single request in seconds.",
+        default=30.0,
+    )
+    parser.add_argument(
+        "--challenges",
+        type=int,
+        help="Number of challenges generated up front and cycled through.",
+        default=4,
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        help="Where to write the load test report.",
+        default="loadgen.json",
+    )
+
+
+class LoadGenerator:
+    """
+    Sends challenge rows to a single axon and records latency and outcome per request.
+    """
+
+    def __init__(
+        self,
+        validator: Validator,
+        axon: bt.AxonInfo,
+        challenges: List[Challenge],
+        timeout: float,
+    ):
+        self.validator = validator
+        self.axon = axon
+        self.challenges = challenges
+        self.timeout = timeout
+        # Axons reject out-of-order nonces per dendrite, so every in-flight request
+        # borrows its own dendrite from this free list.
+        self.dendrites: List[bt.dendrite] = []
+        # Verification is a blocking prover call, keep it off the event loop.
+        self.executor = ThreadPoolExecutor(max_workers=4)
+
+    def classify(self, challenge: Challenge, response: Prove) -> str:
+        code = response.dendrite.status_code
+        if code is None or int(code) != 200:
+            return (
+                "timeout" if code is not None and int(code) == 408 else f"http_{code}"
+            )
+        if response.commitment is None or response.proof is None:
+            return "incomplete"
+        valid = self.validator.rpc_worker_verify(
+            i=response.index,
+            proof=response.proof,
+            alpha=challenge.alpha,
+            eval=challenge.evals[response.index],
+            commitment=response.commitment,
+        )
+        return "ok" if valid else "invalid"
+
+    async def send(self, n: int, latencies: List[float], outcomes: Counter):
+        challenge = self.challenges[n % len(self.challenges)]
+        synapse = challenge.to_synapse(
+            (n // len(self.challenges)) % len(challenge.polys)
+        )
+
+        dendrite = (
+            self.dendrites.pop()
+            if self.dendrites
+            else bt.dendrite(wallet=self.validator.wallet)
+        )
+        before = time.perf_counter()
+        response = await dendrite.call(
+            target_axon=self.axon,
+            synapse=synapse,
+            timeout=self.timeout,
+            deserialize=False,
+        )
+        latency = time.perf_counter() - before
+        self.dendrites.append(dendrite)
+
+        try:
+            outcome = await asyncio.get_running_loop().run_in_executor(
+                self.executor, self.classify, challenge, response
+            )
+        except Exception:
+            outcome = "verify_error"
+        outcomes[outcome] += 1
+        if outcome == "ok":
+            latencies.append(latency)
+
+    async def closed_loop(self, concurrency: int, duration: float) -> Dict:
+        latencies, outcomes = [], Counter()
+        start = time.perf_counter()
+
+        async def client(k: int):
+            n = k
+            while time.perf_counter() - start < duration:
+                await self.send(n, latencies, outcomes)
+                n += concurrency
+
+        await asyncio.gather(*(client(k) for k in range(concurrency)))
+        return self.report(latencies, outcomes, time.perf_counter() - start)
+
+    async def open_loop(self, rate: float, duration: float) -> Dict:
+        latencies, outcomes = [], Counter()
+        tasks = []
+        start = time.perf_counter()
+        n = 0
+        while time.perf_counter() - start < duration:
+            tasks.append(asyncio.ensure_future(self.send(n, latencies, outcomes)))
+            n += 1
+            # Schedule on absolute times so slow sends don't lower the offered rate.
+            await asyncio.sleep(max(0.0, start + n / rate - time.perf_counter()))
+        await asyncio.gather(*tasks)
+        report = self.report(latencies, outcomes, time.perf_counter() - start)
+        report["offered_per_sec"] = n / duration
+        return report
+
+    async def close(self):
+        """Closes the aiohttp sessions of the pooled dendrites and the verify pool."""
+        await asyncio.gather(
+            *(dendrite.aclose_session() for dendrite in self.dendrites)
+        )
+        self.dendrites.clear()
+        self.executor.shutdown(wait=False)
+
+    @staticmethod
+    def report(latencies: List[float], outcomes: Counter, wall: float) -> Dict:
+        report = summarize(latencies, wall=wall) if latencies else {"ops_per_sec": 0.0}
+        report["requests"] = sum(outcomes.values())
+        report["outcomes"] = dict(outcomes)
+        return report
+
+
+def find_knee(
+    levels: List[float],
+    reports: List[Dict],
+    min_gain: float = 0.1,
+    max_slowdown: float = 2.0,
+) -> Optional[float]:
+    """
+    Returns the highest load level before saturation, i.e. before throughput stops
+    growing by at least `min_gain` or p95 latency exceeds `max_slowdown` times the
+    p95 latency at the lowest level. Returns None if the miner never saturated.
+    """
+    base_p95 = reports[0].get("p95_s")
+    for k in range(1, len(reports)):
+        previous, current = reports[k - 1], reports[k]
+        stalled = current["ops_per_sec"] < previous["ops_per_sec"] * (1 + min_gain)
+        slowed = (
+            base_p95 is not None
+            and current.get("p95_s", float("inf")) > base_p95 * max_slowdown
+        )
+        if stalled or slowed:
+            return levels[k - 1]
+    return None
+
+
+async def sweep(generator: LoadGenerator, args) -> Dict:
+    levels = [float(level) for level in args.levels.split(",")]
+    reports = []
+    try:
+        for level in levels:
+            if args.mode == "closed":
+                report = await generator.closed_loop(int(level), args.duration)
+            else:
+                report = await generator.open_loop(level, args.duration)
+            bt.logging.info(
+                f"{args.mode} level {level:g}: {report['ops_per_sec']:.2f} proofs/s, "
+                f"p50 {report.get('p50_s', float('nan')):.3f}s "
+                f"p95 {report.get('p95_s', float('nan')):.3f}s "
+                f"p99 {report.get('p99_s', float('nan')):.3f}s, "
+                f"outcomes {report['outcomes']}"
+            )
+            reports.append(report)
+    finally:
+        await generator.close()
+
+    knee = find_knee(levels, reports)
+    bt.logging.info(f"Saturation knee: {knee if knee is not None else 'not reached'}")
+    return {
+        "mode": args.mode,
+        "target": args.target,
+        "levels": dict(zip(args.levels.split(","), reports)),
+        "knee": knee,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    add_loadgen_args(parser)
+    # The remaining arguments are the regular neuron arguments.
+    args, _ = parser.parse_known_args()
+
+    validator = build_neuron(Validator, "loadgen", netuid=1)
+    try:
+        machines = min(
+            validator.config.neuron.sample_size, 2**validator.config.machines_scale
+        )
+        challenges = [
+            validator.generate_challenge(machines) for _ in range(args.challenges)
+        ]
+        ip, port = args.target.rsplit(":", 1)
+        axon = bt.AxonInfo(
+            version=validator.spec_version,
+            ip=ip,
+            port=int(port),
+            ip_type=4,
+            hotkey=args.target_hotkey,
+            coldkey=args.target_hotkey,
+        )
+        generator = LoadGenerator(validator, axon, challenges, args.request_timeout)
+        report = validator.loop.run_until_complete(sweep(generator, args))
+    finally:
+        validator.stop_prover()
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    bt.logging.info(f"Wrote load test report to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
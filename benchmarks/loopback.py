@@ -0,0 +1,263 @@
+# The MIT License (MIT)
+# Copyright © 2024 Apollo
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+"""
+Runs a validator and several miners end to end in one process, without a chain or network.
+
+The validator and the miners share one prover, so verifying competes with proving
+as it does on a shared machine. The miners are served to the validator by the mock
+dendrite over in-memory links, which can add latency, limited bandwidth and dropped
+requests:
+
+    python -m benchmarks.loopback --miners 8 --rounds 20 --output loopback.json <prover arguments>
+
+Every round goes through the validator's own round stages, and the report gives
+the end-to-end round time, the valid proofs per second and the time spent in each
+stage, including proving on the miners.
+"""
+
+import argparse
+import copy
+import json
+import os
+import platform
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+import bittensor as bt
+
+from base.mock import MockLink
+from benchmarks.stats import summarize, timed
+from neurons.miner import Miner
+from neurons.validator import Validator, round_rows
+from utils import prover
+
+LOOPBACK_NETUID = 42
+
+
+def add_loopback_args(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        "--miners",
+        type=int,
+        help="The number of in-process miners.",
+        default=4,
+    )
+    parser.add_argument(
+        "--rounds",
+        type=int,
+        help="The number of validation rounds to run.",
+        default=10,
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        help="Where to write the report.",
+        default="loopback.json",
+    )
+    parser.add_argument(
+        "--link_latency",
+        type=float,
+        help="Median one-way latency in seconds between the validator and each miner.",
+        default=0.0,
+    )
+    parser.add_argument(
+        "--link_jitter",
+        type=float,
+        help="Shape of the lognormal latency distribution, 0 for a fixed latency.",
+        default=0.0,
+    )
+    parser.add_argument(
+        "--link_bandwidth",
+        type=float,
+        help="Bandwidth in bytes per second of each link, 0 for unlimited.",
+        default=0.0,
+    )
+    parser.add_argument(
+        "--link_error_rate",
+        type=float,
+        help="Fraction of requests dropped by the links.",
+        default=0.0,
+    )
+
+
+def build(cls, config: "bt.Config", name: str, **overrides):
+    config = copy.deepcopy(config)
+    config.mock = True
+    config.netuid = LOOPBACK_NETUID
+    config.wallet.name = "loopback"
+    config.wallet.hotkey = name
+    config.neuron.axon_off = True
+    config.neuron.dont_save_events = True
+    for key, value in overrides.items():
+        setattr(config, key, value)
+    return cls(config)
+
+
+class Loopback:
+    """A validator wired to in-process miners, all attached to one prover."""
+
+    def __init__(self, miners: int, link: MockLink, config: "bt.Config" = None):
+        self.config = config or Miner.config()
+        self.port = self.config.prover_port or 1337
+        # Every neuron attaches to the shared prover instead of starting its own.
+        self.prover = prover.launch(self.config, self.port)
+        prover.write_record(self.config, self.prover, self.port)
+        self.miners: List[Miner] = []
+        self.validator: Validator = None
+        self.executor = ThreadPoolExecutor(max_workers=max(4, miners))
+        try:
+            self.miners = [
+                build(
+                    Miner,
+                    self.config,
+                    f"miner-{i}",
+                    prover_attach=True,
+                    prover_port=self.port,
+                )
+                for i in range(miners)
+            ]
+            self.validator = build(
+                Validator,
+                self.config,
+                "validator",
+                prover_attach=True,
+                prover_port=self.port,
+            )
+        except Exception:
+            self.close()
+            raise
+
+        validator = self.validator
+        validator.dendrite.link = link
+        validator.dendrite.executor = self.executor
+        routed = set()
+        for miner in self.miners:
+            # Miners only know the validator once it registered.
+            miner.metagraph.sync(subtensor=miner.subtensor)
+            hotkey = miner.wallet.hotkey.ss58_address
+            validator.dendrite.attach(hotkey, miner)
+            routed.add(hotkey)
+
+        # Only query the in-process miners, not the placeholders of the mock subnet.
+        for axon in validator.metagraph.axons:
+            if axon.hotkey not in routed:
+                axon.ip = "0.0.0.0"
+        rows = 2**validator.config.machines_scale
+        if miners > rows:
+            bt.logging.warning(f"Only {rows} miners can be queried per round.")
+        validator.config.neuron.sample_size = min(miners, rows)
+
+    def run_round(self) -> Dict[str, float]:
+        """Runs one round and returns the time spent in each stage and the valid proofs."""
+        validator = self.validator
+        stages = {}
+        stages["generate"], challenge = timed(validator.generate_round)
+        stages["dispatch"], dispatched = timed(
+            validator.loop.run_until_complete, validator.dispatch_round(challenge)
+        )
+        stages["verify"], rewards = timed(validator.verify_round, challenge, dispatched)
+        stages["apply"], _ = timed(validator.apply_round, dispatched, rewards)
+        stages["proofs"] = int((rewards > 0).sum()) * round_rows(challenge)
+        return stages
+
+    def run(self, rounds: int) -> Dict:
+        samples = {
+            "round": [],
+            "generate": [],
+            "dispatch": [],
+            "verify": [],
+            "apply": [],
+        }
+        proofs, failed = 0, 0
+        for _ in range(rounds):
+            before = time.perf_counter()
+            try:
+                stages = self.run_round()
+            except Exception as e:
+                failed += 1
+                bt.logging.error(f"Loopback round failed: {e}")
+                continue
+            samples["round"].append(time.perf_counter() - before)
+            proofs += stages.pop("proofs")
+            for stage, elapsed in stages.items():
+                samples[stage].append(elapsed)
+
+        if not samples["round"]:
+            raise Exception("No loopback round completed.")
+        wall = sum(samples["round"])
+        results = {name: summarize(values) for name, values in samples.items()}
+        proving = [
+            latency
+            for miner in self.miners
+            for latency in miner.metrics.latencies.get("proof_latency_s", ())
+        ]
+        if proving:
+            results["prove"] = summarize(proving, wall=wall)
+        results["throughput"] = {
+            "proofs": proofs,
+            "failed_rounds": failed,
+            "proofs_per_sec": proofs / wall if wall > 0 else 0.0,
+        }
+        return results
+
+    def close(self):
+        if self.validator is not None:
+            self.validator.stop_prover()
+        self.executor.shutdown(wait=False)
+        self.prover.stop()
+        if os.path.exists(prover.record_path(self.config, self.port)):
+            os.remove(prover.record_path(self.config, self.port))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    add_loopback_args(parser)
+    # The remaining arguments are the regular neuron arguments.
+    args, _ = parser.parse_known_args()
+
+    link = MockLink(
+        latency=args.link_latency,
+        jitter=args.link_jitter,
+        bandwidth=args.link_bandwidth or None,
+        error_rate=args.link_error_rate,
+    )
+    loopback = Loopback(args.miners, link)
+    try:
+        results = loopback.run(args.rounds)
+    finally:
+        loopback.close()
+
+    report = {
+        "meta": {
+            "timestamp": time.time(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "miners": args.miners,
+            "rounds": args.rounds,
+            "scale": loopback.config.scale,
+            "machines_scale": loopback.config.machines_scale,
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    bt.logging.info(f"Wrote loopback report to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,344 @@
+# The MIT License (MIT)
+# Copyright © 2024 Apollo
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+"""
+Performance benchmarks for challenge generation, scoring, serialization, proving
+and the validator's per-uid bookkeeping.
+
+Results are written as JSON and can be compared against a stored baseline, e.g.:
+
+    python -m benchmarks.run --prover_path ./prover --setup_path ./setup --precompute_path ./precompute \
+        --scale 18 --machines_scale 8 --output benchmark.json --baseline baseline.json
+
+The neurons are always built against the mock network, so no wallet or chain is needed.
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+import bittensor as bt
+import numpy as np
+
+from base.mock import MockNetwork
+from base.protocol import Prove
+from base.scorebook import ScoreBook
+from benchmarks.stats import compare, summarize, timed
+from neurons.miner import Miner
+from neurons.validator import Challenge, Validator
+from utils.uids import get_random_uids
+
+SUITES = ["generate_challenge", "rewards", "serialization", "miner_forward"]
+# Suites that only run when asked for.
+EXTRA_SUITES = ["bookkeeping"]
+# The mock subnets of the bookkeeping benchmark.
+BOOKKEEPING_NETUID = 100
+
+
+def add_benchmark_args(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        "--output",
+        type=str,
+        help="Where to write the benchmark results.",
+        default="benchmark.json",
+    )
+    parser.add_argument(
+        "--baseline",
+        type=str,
+        help="Benchmark results to compare against. Exits non-zero on regressions.",
+        default=None,
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        help="Relative slowdown allowed before a metric counts as a regression.",
+        default=0.2,
+    )
+    parser.add_argument(
+        "--iterations",
+        type=int,
+        help="Iterations per measurement.",
+        default=10,
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=str,
+        help="Comma separated concurrency levels for the miner forward benchmark.",
+        default="1,2,4,8",
+    )
+    parser.add_argument(
+        "--suites",
+        type=str,
+        help=f"Comma separated benchmark suites to run, out of {','.join(SUITES + EXTRA_SUITES)}.",
+        default=",".join(SUITES),
+    )
+    parser.add_argument(
+        "--network_sizes",
+        type=str,
+        help="Comma separated subnet sizes for the bookkeeping benchmark.",
+        default="256,1024,4096",
+    )
+    parser.add_argument(
+        "--churn",
+        type=float,
+        help="Fraction of hotkeys replaced between metagraph resyncs in the bookkeeping benchmark.",
+        default=0.01,
+    )
+
+
+def build_neuron(cls, name: str, netuid: int):
+    config = cls.config()
+    config.mock = True
+    config.netuid = netuid
+    config.wallet.name = "benchmock"
+    config.wallet.hotkey = name
+    config.neuron.axon_off = True
+    config.neuron.dont_save_events = True
+    return cls(config)
+
+
+def prove(client, challenge: Challenge, i: int) -> Prove:
+    """Builds a valid response to row `i` of the challenge."""
+    poly = challenge.polys[i]
+    with client.worker_commit(i, poly) as resp:
+        commitment = resp.json().get("commitment")
+    with client.worker_open(i, poly, challenge.alpha) as resp:
+        eval = resp.json().get("eval")
+        proof = resp.json().get("proof")
+    response = Prove(
+        index=i, poly=[], alpha=None, eval=eval, commitment=commitment, proof=proof
+    )
+    response.dendrite.process_time = 0.0
+    return response
+
+
+def bench_generate_challenge(validator: Validator, iterations: int) -> Dict:
+    results = {}
+    machines = 2**validator.config.machines_scale
+    counts = sorted({min(4**k, machines) for k in range(machines.bit_length())})
+    for count in counts:
+        samples = [
+            timed(validator.generate_challenge, count)[0] for _ in range(iterations)
+        ]
+        results[f"generate_challenge/machines={count}"] = summarize(samples)
+    return results
+
+
+def bench_rewards(validator: Validator, challenge: Challenge, iterations: int) -> Dict:
+    responses = [
+        prove(validator.client, challenge, i) for i in range(len(challenge.polys))
+    ]
+    samples = [
+        timed(validator.get_rewards, challenge, responses, 30.0)[0]
+        for _ in range(iterations)
+    ]
+    return {
+        f"get_rewards/responses={len(responses)}": summarize(
+            samples, ops=len(responses) * iterations
+        )
+    }
+
+
+def bench_serialization(challenge: Challenge, response: Prove, iterations: int) -> Dict:
+    results = {}
+    for name, synapse in [("request", challenge.to_synapse(0)), ("response", response)]:
+        encode, decode = [], []
+        for _ in range(iterations):
+            elapsed, body = timed(lambda: json.dumps(synapse.dict()))
+            encode.append(elapsed)
+            decode.append(timed(Prove.parse_raw, body)[0])
+        headers = json.dumps(synapse.to_headers())
+        results[f"serialize/{name}"] = {
+            **summarize(encode),
+            "body_bytes": len(body),
+            "header_bytes": len(headers),
+        }
+        results[f"deserialize/{name}"] = summarize(decode)
+    return results
+
+
+def bench_miner_forward(
+    miner: Miner, challenge: Challenge, iterations: int, levels: List[int]
+) -> Dict:
+    results = {}
+    rows = len(challenge.polys)
+    for concurrency in levels:
+        calls = iterations * concurrency
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            before = time.perf_counter()
+            samples = list(
+                executor.map(
+                    lambda k: timed(miner.forward, challenge.to_synapse(k % rows))[0],
+                    range(calls),
+                )
+            )
+            wall = time.perf_counter() - before
+        results[f"miner_forward/concurrency={concurrency}"] = summarize(
+            samples, wall=wall
+        )
+    return results
+
+
+def bench_bookkeeping(
+    validator: Validator, sizes: List[int], churn: float, iterations: int
+) -> Dict:
+    """
+    Times the per-uid bookkeeping of the validator on large mock subnets, with
+    `churn` of the hotkeys replaced before each metagraph resync.
+    """
+    results = {}
+    saved = (
+        validator.subtensor,
+        validator.metagraph,
+        validator.scorebook,
+        validator.config.netuid,
+    )
+    sample_size = validator.config.neuron.sample_size
+    try:
+        for k, n in enumerate(sizes):
+            network = MockNetwork(netuid=BOOKKEEPING_NETUID + k, seed=k)
+            network.register(
+                stakes=[1000],
+                permits=[True],
+                hotkeys=[validator.wallet.hotkey.ss58_address],
+            )
+            network.populate(n - 1)
+            validator.subtensor = network.subtensor
+            validator.metagraph = network.metagraph()
+            validator.config.netuid = network.netuid
+            validator.scorebook = ScoreBook(
+                alpha=validator.config.neuron.moving_average_alpha
+            )
+            validator.scorebook.sync(validator.metagraph.hotkeys)
+
+            results[f"get_random_uids/n={n}"] = summarize(
+                [
+                    timed(get_random_uids, validator, k=sample_size)[0]
+                    for _ in range(iterations)
+                ]
+            )
+
+            rewards = np.random.random(sample_size).astype(np.float32)
+            update = []
+            for _ in range(iterations):
+                uids = np.random.choice(n, sample_size, replace=False)
+                update.append(timed(validator.update_scores, rewards, uids)[0])
+            results[f"update_scores/n={n}"] = summarize(update)
+
+            resync = []
+            for _ in range(iterations):
+                network.churn(replace=churn, protect=[0])
+                resync.append(timed(validator.resync_metagraph)[0])
+            results[f"resync_metagraph/n={n}"] = summarize(resync)
+
+            # Weight processing and emission live in bittensor and depend on its
+            # version, the validator's own share is normalizing the scores.
+            scores = validator.scores.copy()
+            results[f"normalize_weights/n={n}"] = summarize(
+                [
+                    timed(validator.normalize_weights, scores)[0]
+                    for _ in range(iterations)
+                ]
+            )
+    finally:
+        (
+            validator.subtensor,
+            validator.metagraph,
+            validator.scorebook,
+            validator.config.netuid,
+        ) = saved
+    return results
+
+
+def run(args) -> Dict:
+    suites = args.suites.split(",")
+    results = {}
+
+    validator = build_neuron(Validator, "validator", netuid=1)
+    miner = (
+        build_neuron(Miner, "miner", netuid=2) if "miner_forward" in suites else None
+    )
+    try:
+        if "generate_challenge" in suites:
+            results.update(bench_generate_challenge(validator, args.iterations))
+
+        rows = min(
+            validator.config.neuron.sample_size, 2**validator.config.machines_scale
+        )
+        challenge = validator.generate_challenge(rows)
+
+        if "rewards" in suites:
+            results.update(bench_rewards(validator, challenge, args.iterations))
+        if "serialization" in suites:
+            response = prove(validator.client, challenge, 0)
+            results.update(bench_serialization(challenge, response, args.iterations))
+        if miner is not None:
+            levels = [int(level) for level in args.concurrency.split(",")]
+            results.update(
+                bench_miner_forward(miner, challenge, args.iterations, levels)
+            )
+        if "bookkeeping" in suites:
+            sizes = [int(size) for size in args.network_sizes.split(",")]
+            results.update(
+                bench_bookkeeping(validator, sizes, args.churn, args.iterations)
+            )
+    finally:
+        validator.stop_prover()
+        if miner is not None:
+            miner.stop_prover()
+    return {
+        "meta": {
+            "timestamp": time.time(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "scale": validator.config.scale,
+            "machines_scale": validator.config.machines_scale,
+            "iterations": args.iterations,
+        },
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    add_benchmark_args(parser)
+    # The remaining arguments are the regular neuron arguments.
+    args, _ = parser.parse_known_args()
+
+    report = run(args)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    bt.logging.info(f"Wrote benchmark results to {args.output}")
+
+    if args.baseline is None:
+        return
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare(report["results"], baseline["results"], args.tolerance)
+    for regression in regressions:
+        bt.logging.error(f"Regression: {regression}")
+    if regressions:
+        sys.exit(1)
+    bt.logging.success("No regressions against baseline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# The MIT License (MIT)
+# Copyright © 2024 Apollo
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+import time
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+
+
+def timed(fn: Callable, *args, **kwargs) -> Tuple[float, object]:
+    """Returns the wall-clock duration of a single call and its result."""
+    before = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return time.perf_counter() - before, result
+
+
+def summarize(samples: List[float], ops: int = None, wall: float = None) -> Dict:
+    """
+    Summarizes latency samples in seconds.
+
+    Args:
+        samples (List[float]): Per-operation latencies.
+        ops (int, optional): Operations performed, defaults to the number of samples.
+        wall (float, optional): Wall-clock time spent, defaults to the sum of the samples.
+            Pass this when operations ran concurrently.
+
+    Returns:
+        dict: Latency percentiles and throughput. Keys ending in `_per_sec` are
+        better when higher, all other keys are better when lower.
+    """
+    samples = np.asarray(samples, dtype=np.float64)
+    ops = len(samples) if ops is None else ops
+    wall = float(samples.sum()) if wall is None else wall
+    p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+    return {
+        "mean_s": float(samples.mean()),
+        "p50_s": float(p50),
+        "p95_s": float(p95),
+        "p99_s": float(p99),
+        "ops_per_sec": ops / wall if wall > 0 else 0.0,
+    }
+
+
+def compare(results: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """
+    Compares benchmark results against a stored baseline.
+
+    Returns:
+        List[str]: A description of every metric that regressed by more than `tolerance`.
+    """
+    regressions = []
+    for name, metrics in results.items():
+        for key, value in metrics.items():
+            base = baseline.get(name, {}).get(key)
+            if not base:
+                continue
+            change = (value - base) / base
+            if key.endswith("_per_sec"):
+                change = -change
+            if change > tolerance:
+                regressions.append(
+                    f"{name} {key}: {base:.6g} -> {value:.6g} ({change:+.1%} worse)"
+                )
+    return regressions
@@ -22,7 +22,7 @@ import bittensor as bt
 
 # import base miner class which takes care of most of the boilerplate
 from base.miner import BaseMinerNeuron
-from base.protocol import Prove
+from base.protocol import Prove, ProveBatch, Verify
 
 
 class Miner(BaseMinerNeuron):
@@ -30,6 +30,8 @@ class Miner(BaseMinerNeuron):
     Miner class for the ZKG network.
     The miner handles the following tasks:
     - prove: Commits to a polynomial and computes an opening proof of it.
+    - prove batch: Does the same for several polynomials in one request.
+    - verify: Verifies an opening proof, for API clients.
     """
 
     def __init__(self, config=None):
@@ -53,6 +55,17 @@ class Miner(BaseMinerNeuron):
                 raise Exception("Failed to verify the proof.")
             return response.json().get("eval"), response.json().get("proof")
 
+    def rpc_verify(
+        self, i: int, proof: str, alpha: str, eval: str, commitment: str
+    ) -> bool:
+        with self.client.worker_verify(i, proof, alpha, eval, commitment) as response:
+            if response.status_code != 200:
+                bt.logging.error(
+                    f"RPC request failed with status: {response.status_code}"
+                )
+                raise Exception("Failed to verify the proof.")
+            return response.json().get("valid")
+
     def rpc_commit_and_open(
         self, i: int, poly: str, alpha: str
     ) -> typing.Tuple[str, str]:
@@ -62,7 +75,7 @@ class Miner(BaseMinerNeuron):
 
     async def blacklist(self, synapse: Prove) -> typing.Tuple[bool, str]:
         """
-        Check if the hotkey is blacklisted.
+        Check if the hotkey is blacklisted, or the miner has no capacity for the request.
         """
         try:
             uid = self.metagraph.hotkeys.index(synapse.dendrite.hotkey)
@@ -70,27 +83,28 @@ class Miner(BaseMinerNeuron):
                 f"Not Blacklisting recognized hotkey {synapse.dendrite.hotkey} with uid"
                 f" {uid}"
             )
-            return False, "Hotkey recognized!"
         except Exception:
-            if self.config.blacklist.allow_non_registered:
-                return False, "Allowing unregistered hotkey"
-            else:
+            if not self.config.blacklist.allow_non_registered:
                 bt.logging.warning(
                     "Blacklisting a request from unregistered hotkey"
                     f" {synapse.dendrite.hotkey}"
                 )
                 return True, "Unrecognized hotkey"
 
+        # Refuse requests the proof queue has no room for before their body is read.
+        return self.admit(synapse)
+
     async def priority(self, synapse: Prove) -> float:
         """
         Get the priority of the hotkey.
         """
         try:
-            caller_uid = self.metagraph.hotkeys.index(
+            metagraph = self.metagraph  # The same snapshot for index and stake.
+            caller_uid = metagraph.hotkeys.index(
                 synapse.dendrite.hotkey
             )  # Get the caller index.
             priority = float(
-                self.metagraph.S[caller_uid]
+                metagraph.S[caller_uid]
             )  # Return the stake as the priority.
             bt.logging.trace(
                 f"Prioritizing {synapse.dendrite.hotkey} with value: ", priority
@@ -107,31 +121,117 @@ class Miner(BaseMinerNeuron):
         """
         Query the connected ZKG RPC server (prove).
         """
-        try:
-            bt.logging.info("Received synapse on prove, starting proof generation...")
+        with self.profiler.track(), self.proving_slot():
+            try:
+                bt.logging.info(
+                    "Received synapse on prove, starting proof generation..."
+                )
+                before = time.perf_counter()
+                if synapse.alpha is None:
+                    # Commitment only, e.g. for the commitment API.
+                    commitment = self.rpc_commit(synapse.index, synapse.poly)
+                    eval, proof = None, None
+                else:
+                    commitment, eval, proof = self.rpc_commit_and_open(
+                        synapse.index, synapse.poly, synapse.alpha
+                    )
+                elapsed = time.perf_counter() - before
+                self.metrics.observe("proof_latency_s", elapsed)
+                self.metrics.inc("proofs")
+                bt.logging.info(f"Proof generation completed in {elapsed} seconds")
+
+                synapse = Prove(
+                    # Send back empty values to save bandwidth
+                    index=int(synapse.index),
+                    poly=[],
+                    alpha=None,
+                    # These are the only values we care about sending back
+                    eval=eval,
+                    commitment=commitment,
+                    proof=proof,
+                )
+
+                bt.logging.info("Returning synapse")
+                return synapse
+
+            except Exception as e:
+                self.metrics.inc("proof_failures")
+                bt.logging.error(f"Failed to forward synapse: {e}")
+                return synapse
+
+    def axon_handlers(self) -> typing.List[typing.Tuple]:
+        return super().axon_handlers() + [
+            (self.forward_batch, self.blacklist_batch, self.priority_batch),
+            (self.forward_verify, self.blacklist_verify, self.priority_verify),
+        ]
+
+    async def blacklist_batch(self, synapse: ProveBatch) -> typing.Tuple[bool, str]:
+        return await self.blacklist(synapse)
+
+    async def priority_batch(self, synapse: ProveBatch) -> float:
+        return await self.priority(synapse)
+
+    def forward_batch(self, synapse: ProveBatch) -> ProveBatch:
+        """
+        Query the connected ZKG RPC server for every row of a batch (prove).
+        The rows share one proof slot and are proven back to back.
+        """
+        with self.profiler.track(), self.proving_slot():
+            bt.logging.info(f"Received batch of {len(synapse.polys)} rows on prove.")
+            commitments, evals, proofs = [], [], []
             before = time.perf_counter()
-            commitment, eval, proof = self.rpc_commit_and_open(
-                synapse.index, synapse.poly, synapse.alpha
-            )
+            for index, poly, alpha in zip(
+                synapse.indices, synapse.polys, synapse.alphas
+            ):
+                try:
+                    commitment, eval, proof = self.rpc_commit_and_open(
+                        index, poly, alpha
+                    )
+                    self.metrics.inc("proofs")
+                except Exception as e:
+                    self.metrics.inc("proof_failures")
+                    bt.logging.error(f"Failed to prove row {index}: {e}")
+                    commitment, eval, proof = None, None, None
+                commitments.append(commitment)
+                evals.append(eval)
+                proofs.append(proof)
             elapsed = time.perf_counter() - before
-            bt.logging.info(f"Proof generation completed in {elapsed} seconds")
+            self.metrics.observe("batch_latency_s", elapsed)
+            bt.logging.info(f"Batch proof generation completed in {elapsed} seconds")
 
-            synapse = Prove(
+            return ProveBatch(
+                indices=synapse.indices,
                 # Send back empty values to save bandwidth
-                index=int(synapse.index),
-                poly=[],
-                alpha=None,
-                # These are the only values we care about sending back
-                eval=eval,
-                commitment=commitment,
-                proof=proof,
+                polys=[],
+                alphas=[],
+                evals=evals,
+                commitments=commitments,
+                proofs=proofs,
             )
 
-            bt.logging.info("Returning synapse")
-            return synapse
+    async def blacklist_verify(self, synapse: Verify) -> typing.Tuple[bool, str]:
+        return await self.blacklist(synapse)
+
+    async def priority_verify(self, synapse: Verify) -> float:
+        return await self.priority(synapse)
 
-        except Exception as e:
-            bt.logging.error(f"Failed to forward synapse: {e}")
+    def forward_verify(self, synapse: Verify) -> Verify:
+        """
+        Verify an opening proof with the connected ZKG RPC server.
+        """
+        with self.profiler.track(), self.proving_slot():
+            try:
+                synapse.valid = self.rpc_verify(
+                    synapse.index,
+                    synapse.proof,
+                    synapse.alpha,
+                    synapse.eval,
+                    synapse.commitment,
+                )
+                self.metrics.inc("verifications")
+            except Exception as e:
+                self.metrics.inc("verification_failures")
+                bt.logging.error(f"Failed to verify synapse: {e}")
             return synapse
 
 
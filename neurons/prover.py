@@ -0,0 +1,59 @@
+# The MIT License (MIT)
+# Copyright © 2024 Apollo
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+import argparse
+import os
+import signal
+import sys
+import time
+
+import bittensor as bt
+
+from utils import prover
+from utils.config import add_args
+
+
+def config() -> "bt.Config":
+    parser = argparse.ArgumentParser()
+    bt.logging.add_args(parser)
+    add_args(None, parser)
+    return bt.config(parser)
+
+
+# Runs the ZKG RPC server as a long-lived process that miners and validators attach to
+# with `--prover_attach`, so restarting a neuron does not reload the setup and precompute files.
+if __name__ == "__main__":
+    config = config()
+    bt.logging(config=config)
+    port = config.prover_port or 1337
+    # Clean up on `pm2 stop` / `kill` as well as on Ctrl-C.
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+
+    client = prover.launch(config, port)
+    try:
+        prover.write_record(config, client, port)
+        bt.logging.info(
+            f"Prover daemon serving on port {port}, record at {prover.record_path(config, port)}"
+        )
+        while True:
+            time.sleep(60)
+    except KeyboardInterrupt:
+        bt.logging.success("Prover daemon killed by keyboard interrupt.")
+    finally:
+        client.stop()
+        if os.path.exists(prover.record_path(config, port)):
+            os.remove(prover.record_path(config, port))
@@ -17,31 +17,109 @@
 
 
 import asyncio
+import math
+import secrets
 import time
-from typing import List
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
 
 # Bittensor
 import bittensor as bt
 import numpy as np
 
 # Import forward dependencies.
-from base.protocol import Prove
+from base.protocol import OVER_CAPACITY, Prove, ProveBatch
 
 # import base validator class which takes care of most of the boilerplate
 from base.validator import BaseValidatorNeuron
-from utils.uids import get_random_uids
+from utils import curve
+from utils.encoding import SCALAR_MODULUS, decode_scalar, is_point
+from utils.prover import ONE, ZERO
+from utils.uids import get_available_uids, get_random_uids
 
 
 class Challenge:
-    def __init__(self, polys: List[List[str]], alpha: str, evals: List[str]):
+    def __init__(
+        self, polys: List[List[str]], alpha: str, evals: List[str], timeout: float
+    ):
         self.polys = polys
         self.alpha = alpha
         self.evals = evals
+        # The time in seconds miners have to respond to the challenge.
+        self.timeout = timeout
 
     def to_synapse(self, i: int) -> Prove:
         return Prove(index=i, poly=self.polys[i], eval=self.evals[i], alpha=self.alpha)
 
 
+# A round queries each miner with one challenge row, or a batch of rows from
+# several challenges.
+Round = Union[Challenge, List[Challenge]]
+
+
+def to_synapse(challenge: Round, i: int) -> Union[Prove, ProveBatch]:
+    if isinstance(challenge, list):
+        return ProveBatch(
+            indices=[i] * len(challenge),
+            polys=[c.polys[i] for c in challenge],
+            alphas=[c.alpha for c in challenge],
+        )
+    return challenge.to_synapse(i)
+
+
+def round_timeout(challenge: Round) -> float:
+    """Miners get the timeout of every challenge in a batch."""
+    if isinstance(challenge, list):
+        return sum(c.timeout for c in challenge)
+    return challenge.timeout
+
+
+def round_rows(challenge: Round) -> int:
+    return len(challenge) if isinstance(challenge, list) else 1
+
+
+def timed_out(response: Union[Prove, ProveBatch], timeout: float) -> bool:
+    """The response was cut off by the dendrite or came in after `timeout`."""
+    process_time = response.dendrite.process_time
+    return response.dendrite.status_code == 408 or (
+        process_time is not None and float(process_time) > timeout
+    )
+
+
+def over_capacity(response: Union[Prove, ProveBatch]) -> bool:
+    """The miner turned the request away because its proof queue was full."""
+    return response.dendrite.status_code != 200 and OVER_CAPACITY in (
+        response.dendrite.status_message or ""
+    )
+
+
+def answered(response: Union[Prove, ProveBatch]) -> bool:
+    if isinstance(response, ProveBatch):
+        return any(c is not None for c in response.commitments or [])
+    return response.commitment is not None and response.proof is not None
+
+
+async def wait_for_quorum(
+    tasks: Iterable[asyncio.Future], quorum: int, deadline: Optional[float] = None
+) -> Set[asyncio.Future]:
+    """
+    Waits until `quorum` of the dendrite tasks have answered, all of them are done
+    or `deadline` seconds have passed, and returns the tasks that are done.
+    """
+    loop = asyncio.get_event_loop()
+    end = None if deadline is None else loop.time() + deadline
+    done, pending = set(), set(tasks)
+    while pending and sum(answered(task.result()[0]) for task in done) < quorum:
+        timeout = None if end is None else end - loop.time()
+        if timeout is not None and timeout <= 0:
+            break
+        finished, pending = await asyncio.wait(
+            pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+        )
+        done |= finished
+    return done
+
+
 class Validator(BaseValidatorNeuron):
     """
     Validator class for the ZKG network.
@@ -52,6 +130,12 @@ class Validator(BaseValidatorNeuron):
 
     def __init__(self, config=None):
         super(Validator, self).__init__(config=config)
+        # Commitments to the constant one polynomial of each row, by row and width.
+        self.unit_commitments: Dict[Tuple[int, int], str] = {}
+        # Queries still running after their round closed, and the uid each one queries.
+        self.stragglers: Dict[asyncio.Future, int] = {}
+        # Consecutive requests each miner refused for lack of capacity, by hotkey.
+        self.capacity_refusals: Dict[str, int] = {}
         bt.logging.info("load_state()")
         self.load_state()
 
@@ -85,6 +169,15 @@ class Validator(BaseValidatorNeuron):
                 raise Exception("Failed to verify the proof.")
             return response.json().get("valid")
 
+    def rpc_worker_commit(self, i: int, poly: List[str]) -> str:
+        with self.client.worker_commit(i, poly) as response:
+            if response.status_code != 200:
+                bt.logging.error(
+                    f"RPC request failed with status: {response.status_code}"
+                )
+                raise Exception("Failed to commit to the polynomial.")
+            return response.json().get("commitment")
+
     def rpc_random_x(self) -> str:
         with self.client.random_point() as response:
             if response.status_code != 200:
@@ -112,19 +205,42 @@ class Validator(BaseValidatorNeuron):
         poly = self.rpc_random_poly()
         alpha = self.rpc_random_x()
         evals = []
-        for i in range(machines_count):
+        # There are no more rows than the polynomial was split into.
+        for i in range(min(machines_count, len(poly))):
             fft_coeffs = self.rpc_fft(poly[i], left=True, inverse=True)
             eval = self.rpc_eval(fft_coeffs, alpha)
             evals.append(eval)
 
-        return Challenge(polys=poly, alpha=alpha, evals=evals)
+        return Challenge(
+            polys=poly, alpha=alpha, evals=evals, timeout=self.query_timeout()
+        )
+
+    def query_timeout(self) -> float:
+        """
+        The time in seconds miners get to answer a challenge, at most `--neuron.timeout`.
+        With `--neuron.adaptive_timeout` it is a multiple of a recent percentile of
+        the latency of valid proofs, so rounds only wait as long as healthy miners need.
+        """
+        ceiling = self.config.neuron.timeout
+        latency = self.metrics.percentile(
+            "miner_latency_s", self.config.neuron.timeout_quantile
+        )
+        if not self.config.neuron.adaptive_timeout or latency is None:
+            return ceiling
+        timeout = float(
+            np.clip(
+                self.config.neuron.timeout_margin * latency,
+                self.config.neuron.timeout_floor,
+                ceiling,
+            )
+        )
+        self.metrics.set("query_timeout_s", timeout)
+        return timeout
 
     async def forward(self):
         try:
             bt.logging.info("generating challenge for miners")
-            challenge = self.generate_challenge(
-                min(self.config.neuron.sample_size, self.metagraph.n.item())
-            )
+            challenge = self.generate_round()
             bt.logging.info("sending challenge to miners")
             await self.query(challenge)
         except Exception as e:
@@ -132,27 +248,50 @@ class Validator(BaseValidatorNeuron):
             bt.logging.error("Retrying in 5 seconds...")
             time.sleep(5)
 
-    def reward(
-        self,
-        challenge: Prove,
-        response: Prove,
-        timeout: float,
-    ) -> np.float32:
+    def precheck(self, response: Prove, timeout: float) -> bool:
         """
-        Calculate the miner reward based on correctness and processing time.
+        Cheap checks a response has to pass before its proof is verified.
         """
 
         # Don't bother verifying if we don't have all info
         if response.commitment is None or response.proof is None:
             bt.logging.warning("Received incomplete proof.")
-            return 0.0
+            return False
+
+        # Malformed points can never verify, don't spend a prover call on them.
+        if not (is_point(response.commitment) and is_point(response.proof)):
+            bt.logging.warning("Received malformed proof.")
+            return False
 
         # Don't even bother spending resources on verifying if the synapse
         # came in too late
         if response.dendrite.process_time > timeout:
             bt.logging.warning("Received proof which was too slow.")
+            return False
+
+        return True
+
+    def reward(
+        self,
+        challenge: Prove,
+        response: Prove,
+        timeout: float,
+        verified: bool = False,
+        scale: float = None,
+    ) -> np.float32:
+        """
+        Calculate the miner reward based on correctness and processing time.
+        Responses later than `timeout` get nothing, the others are rewarded
+        relative to `scale`, which defaults to the timeout.
+        With `verified`, the proof was already checked as part of an aggregate.
+        """
+        if not self.precheck(response, timeout):
             return 0.0
 
+        scale = scale or timeout
+        if verified:
+            return 1.0 - response.dendrite.process_time / scale
+
         # We take the proof and commitment from the response
         proof = response.proof
         commitment = response.commitment
@@ -173,37 +312,194 @@ class Validator(BaseValidatorNeuron):
             bt.logging.warning("Invalid proof.")
             return 0.0
 
-        return 1.0 - response.dendrite.process_time / timeout
+        return 1.0 - response.dendrite.process_time / scale
 
     def get_rewards(
         self,
         challenge: Challenge,
         responses: List[Prove],
         timeout: float,
+        scale: float = None,
     ) -> np.array:
         """
         Calculate the miner rewards based on correctness and processing time.
         """
+        complete = [self.precheck(response, timeout) for response in responses]
+        verified = self.config.neuron.aggregate_verification and self.verify_aggregate(
+            challenge,
+            [response for response, ok in zip(responses, complete) if ok],
+        )
+
         # Get the fastest processing time.
         scores = [
-            self.reward(challenge.to_synapse(response.index), response, timeout)
-            for response in responses
+            self.reward(
+                challenge.to_synapse(response.index),
+                response,
+                timeout,
+                verified=verified,
+                scale=scale,
+            )
+            if ok
+            else 0.0
+            for response, ok in zip(responses, complete)
         ]
         return np.array(scores, dtype=np.float32)
 
-    async def query(self, challenge: Challenge):
+    def get_batch_rewards(
+        self,
+        challenges: List[Challenge],
+        responses: List[ProveBatch],
+        timeout: float,
+        scale: float = None,
+    ) -> np.array:
+        """
+        Calculate the miner rewards for batches: the fraction of valid rows,
+        scaled by how quickly the whole batch came back. This rewards sustained
+        throughput rather than the latency of a single proof.
+        """
+        rewards = np.zeros(len(responses), dtype=np.float32)
+        for k, challenge in enumerate(challenges):
+            # Rows of the same challenge are verified together.
+            rows = [response.row(k) for response in responses]
+            rewards += self.get_rewards(challenge, rows, timeout, scale)
+        return rewards / len(challenges)
+
+    def score(
+        self, challenge: Round, responses: List[Union[Prove, ProveBatch]]
+    ) -> np.array:
+        """
+        Rewards the responses to a round. Rewards are always relative to the
+        timeout ceiling, so they stay comparable while adaptive timeouts move.
+        """
+        timeout = round_timeout(challenge)
+        scale = self.config.neuron.timeout * round_rows(challenge)
+        if isinstance(challenge, list):
+            rewards = self.get_batch_rewards(challenge, responses, timeout, scale)
+        else:
+            rewards = self.get_rewards(challenge, responses, timeout, scale)
+
+        # Valid responses make up the latency distribution adaptive timeouts follow.
+        # Responses cut off by the timeout count at the cutoff, otherwise the timeout
+        # would never learn that miners became slower than itself.
+        rows = round_rows(challenge)
+        for response, reward in zip(responses, rewards):
+            if reward > 0:
+                self.metrics.observe(
+                    "miner_latency_s", response.dendrite.process_time / rows
+                )
+            elif timed_out(response, timeout):
+                self.metrics.observe("miner_latency_s", timeout / rows)
+        return rewards
+
+    def hold_refused(
+        self,
+        uids: np.ndarray,
+        hotkeys: List[str],
+        responses: List[Union[Prove, ProveBatch]],
+        rewards: np.ndarray,
+    ) -> np.ndarray:
+        """
+        A miner that refused the request because its proof queue was full is not
+        scored like a failed proof: its reward is its current score, which holds the
+        score for the round. This lasts for up to `--neuron.capacity_grace`
+        consecutive refusals.
+        """
+        held = np.zeros(len(hotkeys), dtype=bool)
+        for k, (hotkey, response) in enumerate(zip(hotkeys, responses)):
+            if not over_capacity(response):
+                self.capacity_refusals.pop(hotkey, None)
+                continue
+            self.metrics.inc("capacity_refusals")
+            refusals = self.capacity_refusals.get(hotkey, 0) + 1
+            self.capacity_refusals[hotkey] = refusals
+            held[k] = refusals <= self.config.neuron.capacity_grace
+
+        rewards = rewards.copy()
+        with self.scores_lock:
+            held &= uids < len(self.scores)
+            rewards[held] = self.scores[uids[held]]
+        return rewards
+
+    def unit_commitment(self, i: int, width: int) -> str:
+        """The commitment to the constant one polynomial in row `i`."""
+        if (i, width) not in self.unit_commitments:
+            self.unit_commitments[i, width] = self.rpc_worker_commit(i, [ONE] * width)
+        return self.unit_commitments[i, width]
+
+    def verify_aggregate(self, challenge: Challenge, responses: List[Prove]) -> bool:
+        """
+        Checks all openings of a round with a single prover call.
+
+        A valid opening of row i satisfies e(C_i - y_i * U_i, 1) = e(pi_i, tau - alpha),
+        where U_i commits to the constant one polynomial in row i. The equations
+        are linear in the points, so a random combination of them is a single
+        opening at alpha with eval zero, checked against row 0. A valid
+        combination means all openings are valid, except with probability 2^-64.
+        If it fails, the openings have to be checked one by one.
+        """
+        if len(responses) < 2:
+            return False
+
+        start = time.perf_counter()
+        try:
+            commitment, proof = None, None
+            row_scalars = defaultdict(int)
+            for response in responses:
+                r = secrets.randbits(64) | 1
+                commitment = curve.add(
+                    commitment, curve.multiply(curve.decompress(response.commitment), r)
+                )
+                proof = curve.add(
+                    proof, curve.multiply(curve.decompress(response.proof), r)
+                )
+                row_scalars[response.index] += r * decode_scalar(
+                    challenge.evals[response.index]
+                )
+            for i, scalar in row_scalars.items():
+                unit = curve.decompress(
+                    self.unit_commitment(i, len(challenge.polys[i]))
+                )
+                commitment = curve.add(
+                    commitment, curve.multiply(unit, -scalar % SCALAR_MODULUS)
+                )
+
+            valid = self.rpc_worker_verify(
+                i=0,
+                proof=curve.compress(proof),
+                alpha=challenge.alpha,
+                eval=ZERO,
+                commitment=curve.compress(commitment),
+            )
+        except Exception as e:
+            bt.logging.warning(f"Failed to verify the round as an aggregate: {e}")
+            valid = False
+
+        self.metrics.observe("aggregate_verify_s", time.perf_counter() - start)
+        self.metrics.inc("aggregate_verified" if valid else "aggregate_fallbacks")
+        if not valid:
+            bt.logging.info("Aggregate check failed, verifying openings one by one.")
+        return valid
+
+    async def dispatch(
+        self, challenge: Round
+    ) -> Tuple[np.ndarray, List[Union[Prove, ProveBatch]]]:
         """
         Query the connected miners with a challenge
         Each miner will receive a different challenge and each challenge can be independently verified.
-        The sum of all valid solutions can be used to generate a larger commitment, although not yet implemented, and not necessary for checking miner honesty.
+        The sum of all valid solutions can be used to generate a larger commitment, as the sharded commitment API does (see `api/shard.py`), but is not necessary for checking miner honesty.
         """
+        # Miners still answering an earlier round are left out if possible.
         miner_uids = get_random_uids(
-            self, k=min(self.config.neuron.sample_size, self.metagraph.n.item())
+            self,
+            k=min(self.config.neuron.sample_size, self.metagraph.n.item()),
+            exclude=list(self.stragglers.values()),
         )
 
         if len(miner_uids) == 0:
             raise Exception("No miners available to query.")
-        timeout = 30.0
+
+        metagraph = self.metagraph
+        axons = [metagraph.axons[uid] for uid in miner_uids]
 
         bt.logging.info(f"Querying {len(miner_uids)} miners with challenge.")
         # We have to create seperate tasks for each miner to query them concurrently.
@@ -212,39 +508,151 @@ class Validator(BaseValidatorNeuron):
         tasks = [
             asyncio.ensure_future(
                 self.dendrite(
-                    synapse=challenge.to_synapse(i),
+                    synapse=to_synapse(challenge, i),
                     deserialize=False,
-                    timeout=timeout,
-                    axons=[self.metagraph.axons[uid]],
+                    timeout=round_timeout(challenge),
+                    axons=[axon],
                 )
             )
-            for i, uid in enumerate(miner_uids)
+            for i, axon in enumerate(axons)
         ]
 
-        responses = [response[0] for response in await asyncio.gather(*tasks)]
-        if all(
-            [
-                response.commitment is None and response.proof is None
-                for response in responses
-            ]
-        ):
+        # Close the round once a quorum has answered or the soft deadline passed.
+        done = await wait_for_quorum(
+            tasks,
+            quorum=math.ceil(self.config.neuron.quorum * len(tasks)),
+            deadline=self.config.neuron.soft_deadline or None,
+        )
+        for uid, task in zip(miner_uids, tasks):
+            if task not in done:
+                self.track_straggler(challenge, uid, metagraph.hotkeys[uid], task)
+        miner_uids = np.array(
+            [uid for uid, task in zip(miner_uids, tasks) if task in done], dtype=int
+        )
+        responses = [task.result()[0] for task in tasks if task in done]
+
+        if not any(answered(response) for response in responses):
             bt.logging.error("No responses received.")
             raise Exception("No responses received.")
 
-        response_count = [
-            response.commitment is not None and response.proof is not None
-            for response in responses
-        ].count(True)
+        response_count = [answered(response) for response in responses].count(True)
         bt.logging.info(f"Received {response_count} responses.")
+        return miner_uids, responses
+
+    def track_straggler(
+        self, challenge: Round, uid: int, hotkey: str, task: asyncio.Future
+    ):
+        """Scores a query that is still running when its round closes once it lands."""
+
+        async def land():
+            response = (await task)[0]
+            rewards = await self.loop.run_in_executor(
+                None, self.score, challenge, [response]
+            )
+            self.metrics.inc("late_responses")
+            self.apply_round((np.array([uid]), [hotkey], [response]), rewards)
+
+        straggler = asyncio.ensure_future(land())
+        self.stragglers[straggler] = uid
+        straggler.add_done_callback(self.forget_straggler)
+        self.metrics.set("stragglers", len(self.stragglers))
+
+    def forget_straggler(self, straggler: asyncio.Future):
+        self.stragglers.pop(straggler, None)
+        self.metrics.set("stragglers", len(self.stragglers))
+        if not straggler.cancelled() and straggler.exception() is not None:
+            bt.logging.error(
+                f"Failed to score a late response: {straggler.exception()}"
+            )
+
+    async def close_rounds(self):
+        """Also cancels the late responses still waiting to be scored."""
+        await super().close_rounds()
+        stragglers = list(self.stragglers)
+        for straggler in stragglers:
+            straggler.cancel()
+        await asyncio.gather(*stragglers, return_exceptions=True)
+
+    async def query(self, challenge: Round):
+        miner_uids, responses = await self.dispatch(challenge)
 
         # Adjust the scores based on responses from miners.
-        rewards = self.get_rewards(challenge, responses, timeout)
+        rewards = self.score(challenge, responses)
         bt.logging.info(f"Scored responses: {rewards}")
 
         # Update the scores based on the rewards.
         # You may want to define your own update_scores function for custom behavior.
+        hotkeys = [self.metagraph.hotkeys[uid] for uid in miner_uids]
+        rewards = self.hold_refused(miner_uids, hotkeys, responses, rewards)
         self.update_scores(rewards, miner_uids)
 
+    def generate_round(self) -> Round:
+        machines_count = min(self.config.neuron.sample_size, self.metagraph.n.item())
+        if self.config.neuron.batch_size > 1:
+            return [
+                self.generate_challenge(machines_count)
+                for _ in range(self.config.neuron.batch_size)
+            ]
+        return self.generate_challenge(machines_count)
+
+    async def dispatch_round(
+        self, challenge: Round
+    ) -> Tuple[np.ndarray, List[str], List[Prove]]:
+        # Remember who was queried, the metagraph may change before the round is applied.
+        metagraph = self.metagraph
+        miner_uids, responses = await self.dispatch(challenge)
+        hotkeys = [metagraph.hotkeys[uid] for uid in miner_uids]
+        return np.array(miner_uids), hotkeys, responses
+
+    def candidate_uids(self) -> List[int]:
+        return get_available_uids(self)
+
+    def challenge_rows(self, challenge: Round) -> int:
+        # Only the rows with an eval can be checked.
+        if isinstance(challenge, list):
+            return len(challenge[0].evals)
+        return len(challenge.evals)
+
+    async def dispatch_row(
+        self, challenge: Round, row: int, uid: int
+    ) -> Tuple[np.ndarray, List[str], List[Prove]]:
+        metagraph = self.metagraph
+        responses = await self.dendrite(
+            synapse=to_synapse(challenge, row),
+            deserialize=False,
+            timeout=round_timeout(challenge),
+            axons=[metagraph.axons[uid]],
+        )
+        return np.array([uid]), [metagraph.hotkeys[uid]], responses
+
+    def verify_round(
+        self,
+        challenge: Round,
+        dispatched: Tuple[np.ndarray, List[str], List[Prove]],
+    ) -> np.ndarray:
+        _, _, responses = dispatched
+        return self.score(challenge, responses)
+
+    def apply_round(
+        self,
+        dispatched: Tuple[np.ndarray, List[str], List[Prove]],
+        rewards: np.ndarray,
+    ):
+        miner_uids, hotkeys, responses = dispatched
+        bt.logging.info(f"Scored responses: {rewards}")
+
+        # Drop rewards of uids whose hotkey was replaced while the round was in flight.
+        current = self.metagraph.hotkeys
+        keep = np.array(
+            [
+                uid < len(current) and current[uid] == hotkey
+                for uid, hotkey in zip(miner_uids, hotkeys)
+            ],
+            dtype=bool,
+        )
+        rewards = self.hold_refused(miner_uids, hotkeys, responses, rewards)
+        self.update_scores(rewards[keep], miner_uids[keep])
+
 
 # The main function parses the configuration and runs the validator.
 if __name__ == "__main__":
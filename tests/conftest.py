@@ -20,6 +20,8 @@ import subprocess
 
 import pytest
 
+from utils import artifacts
+
 REPO_NAME = "fourier"
 FOURIER_URL = "https://github.com/apollozkp/fourier"
 
@@ -30,8 +32,25 @@ TEST_PRECOMPUTE_PATH = "test_precompute.compressed"
 TEST_BINARY = "test_prover"
 
 
+def pytest_addoption(parser):
+    parser.addoption(
+        "--real-prover",
+        action="store_true",
+        default=False,
+        help="Build and test against the Fourier prover instead of the stand-in prover.",
+    )
+
+
+@pytest.fixture(scope="session")
+def prover_stub(request):
+    return not request.config.getoption("--real-prover")
+
+
 @pytest.fixture(scope="session", autouse=True)
-def compile_prover_lib():
+def compile_prover_lib(prover_stub):
+    if prover_stub:
+        return
+
     if os.path.exists(REPO_NAME):
         subprocess.check_call(f"rm -rf {REPO_NAME}", shell=True)
 
@@ -63,14 +82,28 @@ def compile_prover_lib():
         # "./prover setup --setup-path setup --precompute-path precompute --scale 6 --machines-scale 4 --generate-setup --generate-precompute --overwrite",
         shell=True,
     )
+    # The neurons refuse artifacts without an index.
+    for path in [TEST_SETUP_PATH, TEST_PRECOMPUTE_PATH]:
+        artifacts.write_index(
+            path, artifacts.build_index(path, TEST_SCALE, TEST_MACHINES_SCALE)
+        )
 
 
 @pytest.fixture(scope="session", autouse=True)
-def cleanup_env(request):
+def cleanup_env(request, prover_stub):
+    if prover_stub:
+        return
+
     def cleanup():
         if os.path.exists(REPO_NAME):
             subprocess.check_call(f"rm -rf {REPO_NAME}", shell=True)
-        for file in [TEST_BINARY, TEST_SETUP_PATH, TEST_PRECOMPUTE_PATH]:
+        for file in [
+            TEST_BINARY,
+            TEST_SETUP_PATH,
+            TEST_PRECOMPUTE_PATH,
+            artifacts.index_path(TEST_SETUP_PATH),
+            artifacts.index_path(TEST_PRECOMPUTE_PATH),
+        ]:
             if os.path.exists(file):
                 subprocess.check_call(f"rm {file}", shell=True)
 
@@ -0,0 +1,156 @@
+# The MIT License (MIT)
+# Copyright © 2024 Apollo
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+import gzip
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from utils import artifacts, prover
+
+CHUNK = 1024
+
+
+@pytest.fixture
+def setup_file(tmp_path):
+    path = tmp_path / "setup_6_2.uncompressed"
+    path.write_bytes(os.urandom(10 * CHUNK + 17))
+    return str(path)
+
+
+def test_chunk_digests_match_sequential(setup_file):
+    parallel = artifacts.chunk_digests(setup_file, CHUNK, workers=4)
+    sequential = artifacts.chunk_digests(setup_file, CHUNK, workers=1)
+
+    assert parallel == sequential
+    assert len(parallel) == 11
+
+
+def test_ensure_verified(setup_file):
+    # Files without an index are refused unless indexing them is asked for.
+    with pytest.raises(Exception, match="no index"):
+        artifacts.ensure_verified(setup_file, 6, 2, CHUNK)
+
+    artifacts.ensure_verified(setup_file, 6, 2, CHUNK, index_new=True)
+    assert artifacts.load_index(setup_file)["scale"] == 6
+
+    # A second run verifies against the index written by the first.
+    artifacts.ensure_verified(setup_file, 6, 2, CHUNK)
+
+    with pytest.raises(Exception):
+        artifacts.ensure_verified(setup_file, 8, 2, CHUNK)
+
+
+def flip_byte(path: str, offset: int):
+    with open(path, "r+b") as f:
+        f.seek(offset)
+        byte = f.read(1)
+        f.seek(offset)
+        f.write(bytes([byte[0] ^ 1]))
+
+
+def test_ensure_verified_skips_unchanged_files(setup_file):
+    index = artifacts.build_index(setup_file, 6, 2, CHUNK)
+    del index["mtime_ns"]  # As shipped, the first start hashes the file.
+    artifacts.write_index(setup_file, index)
+    artifacts.ensure_verified(setup_file, 6, 2, CHUNK)
+    stat = os.stat(setup_file)
+    assert artifacts.load_index(setup_file)["mtime_ns"] == stat.st_mtime_ns
+
+    # Only the size and modification time are checked on later starts.
+    flip_byte(setup_file, 5 * CHUNK)
+    os.utime(setup_file, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    artifacts.ensure_verified(setup_file, 6, 2, CHUNK)
+    with pytest.raises(Exception, match="1 of 11 chunks"):
+        artifacts.ensure_verified(setup_file, 6, 2, CHUNK, full=True)
+
+    os.utime(setup_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+    with pytest.raises(Exception, match="1 of 11 chunks"):
+        artifacts.ensure_verified(setup_file, 6, 2, CHUNK)
+
+
+def test_verify_detects_corruption(setup_file):
+    index = artifacts.build_index(setup_file, 6, 2, CHUNK)
+    flip_byte(setup_file, 5 * CHUNK)
+
+    with pytest.raises(Exception, match="1 of 11 chunks"):
+        artifacts.verify(setup_file, index)
+
+
+def artifacts_config(setup_path: str, precompute_path: str, tmp_path):
+    return SimpleNamespace(
+        setup_path=setup_path,
+        precompute_path=precompute_path,
+        scale=6,
+        machines_scale=2,
+        prover_stub=False,
+        artifacts=SimpleNamespace(
+            cache_dir=str(tmp_path / "cache"),
+            chunk_size=1,
+            workers=0,
+            index_new=False,
+            full_verify=False,
+            no_verify=False,
+        ),
+    )
+
+
+def test_prepare_decompresses_once(setup_file, tmp_path):
+    with open(setup_file, "rb") as src, gzip.open(f"{setup_file}.gz", "wb") as dst:
+        dst.write(src.read())
+    # The uncompressed precompute file ships with its index.
+    artifacts.write_index(setup_file, artifacts.build_index(setup_file, 6, 2, CHUNK))
+    config = artifacts_config(f"{setup_file}.gz", setup_file, tmp_path)
+
+    setup, precompute = artifacts.prepare(config)
+    assert precompute == setup_file
+    with open(setup, "rb") as a, open(setup_file, "rb") as b:
+        assert a.read() == b.read()
+
+    modified = os.path.getmtime(setup)
+    assert artifacts.prepare(config)[0] == setup
+    assert os.path.getmtime(setup) == modified
+
+
+def test_launch_indexes_unindexed_files(setup_file, tmp_path, monkeypatch):
+    # Artifacts fetched by the Makefile may come without an index.
+    started = []
+
+    class FakeClient:
+        def start(self, scale, machines_scale):
+            started.append((scale, machines_scale))
+
+    monkeypatch.setattr(prover, "make_client", lambda *args: FakeClient())
+
+    precompute_file = tmp_path / "precompute_6_2.uncompressed"
+    precompute_file.write_bytes(os.urandom(3 * CHUNK))
+    config = artifacts_config(setup_file, str(precompute_file), tmp_path)
+    with pytest.raises(Exception, match="no index"):
+        prover.launch(config, 1337)
+    assert started == []
+
+    config.artifacts.index_new = True
+    prover.launch(config, 1337)
+    assert started == [(6, 2)]
+    assert artifacts.load_index(setup_file)["scale"] == 6
+    assert artifacts.load_index(str(precompute_file))["scale"] == 6
+
+    # Later starts verify against the index written on first use.
+    config.artifacts.index_new = False
+    prover.launch(config, 1337)
+    assert started == [(6, 2)] * 2
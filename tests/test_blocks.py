@@ -0,0 +1,97 @@
+# The MIT License (MIT)
+# Copyright © 2024 Apollo
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+import gc
+import time
+
+from base.blocks import BlockTracker, block_tracker, trackers
+
+
+class FakeSubtensor:
+    def __init__(self, block: int = 100):
+        self.current = block
+        self.calls = 0
+
+    def get_current_block(self) -> int:
+        self.calls += 1
+        return self.current
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_block_tracker_extrapolates_at_most_one_block():
+    subtensor = FakeSubtensor()
+    clock = FakeClock()
+    tracker = BlockTracker(subtensor, block_time=12.0, clock=clock)
+    tracker.start = lambda: None  # No follower, only extrapolation.
+
+    assert tracker.block == 100
+    clock.now = 11.0
+    assert tracker.block == 100
+    clock.now = 13.0
+    assert tracker.block == 101
+    # The next head is late, reads wait for it instead of running ahead.
+    clock.now = 40.0
+    assert tracker.block == 101
+
+    tracker.publish(101)
+    assert tracker.block == 101
+    tracker.publish(100)  # Stale, ignored.
+    assert tracker.head[0] == 101
+    assert subtensor.calls == 1
+
+
+def test_block_tracker_follows_the_head():
+    subtensor = FakeSubtensor()
+    tracker = BlockTracker(subtensor, block_time=0.01)
+    try:
+        assert tracker.block == 100
+        subtensor.current = 107
+        deadline = time.monotonic() + 5
+        while tracker.head[0] != 107 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert tracker.head[0] == 107
+    finally:
+        tracker.stop()
+    assert tracker.thread is None
+
+
+def test_block_tracker_is_shared_per_subtensor():
+    first, second = FakeSubtensor(), FakeSubtensor()
+    assert block_tracker(first) is block_tracker(first)
+    assert block_tracker(first) is not block_tracker(second)
+
+
+def test_block_tracker_is_released_with_its_subtensor():
+    subtensor = FakeSubtensor()
+    tracker = block_tracker(subtensor)
+    tracker.block_time = 0.01
+    assert tracker.block == 100
+    thread = tracker.thread
+
+    del subtensor
+    gc.collect()
+
+    assert tracker not in trackers.values()
+    thread.join(5)
+    assert not thread.is_alive()
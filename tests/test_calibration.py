@@ -0,0 +1,47 @@
+# The MIT License (MIT)
+# Copyright © 2024 Apollo
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+import pytest
+
+from utils.calibration import calibrate
+from utils.stub_prover import StubClient
+
+TEST_PORT = 13371
+
+
+@pytest.fixture(scope="module")
+def stub_client():
+    client = StubClient(port=TEST_PORT, latency={"worker_open": 0.01})
+    client.start(scale=6, machines_scale=2)
+    yield client
+    client.stop()
+
+
+def test_calibrate(stub_client):
+    capacity = calibrate(stub_client, levels=[1, 2, 4], cycles=2, deadline=1.0)
+
+    assert set(capacity["levels"]) == {1, 2, 4}
+    assert capacity["workers"] in capacity["levels"]
+    assert capacity["proofs_per_sec"] > 0
+    assert capacity["latency_s"] >= 0.01
+    assert capacity["queue_limit"] >= 0
+
+
+def test_calibrate_short_deadline_leaves_no_queue(stub_client):
+    # No request that has to wait for a worker could still meet the deadline.
+    capacity = calibrate(stub_client, levels=[1, 2], cycles=2, deadline=0.001)
+    assert capacity["queue_limit"] == 0
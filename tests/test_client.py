@@ -0,0 +1,153 @@
+# The MIT License (MIT)
+# Copyright © 2024 Apollo
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+import asyncio
+from types import SimpleNamespace
+
+import bittensor as bt
+import numpy as np
+import pytest
+
+from api.client import ApiClient
+from api.commit import commit
+from api.open import open as open_api
+from utils.stub_prover import point
+
+
+def make_metagraph(hotkeys):
+    return SimpleNamespace(
+        netuid=1,
+        uids=np.arange(len(hotkeys)),
+        # uid 0 has the least stake, so it is never a candidate.
+        S=np.arange(len(hotkeys), dtype=np.float32),
+        validator_trust=np.ones(len(hotkeys)),
+        hotkeys=hotkeys,
+        axons=[
+            bt.AxonInfo(
+                version=1,
+                ip="127.0.0.1",
+                port=9000 + uid,
+                ip_type=4,
+                hotkey=hotkey,
+                coldkey=hotkey,
+            )
+            for uid, hotkey in enumerate(hotkeys)
+        ],
+    )
+
+
+class FakeSubtensor:
+    def __init__(self, hotkeys):
+        self.hotkeys = hotkeys
+        self.syncs = 0
+
+    def metagraph(self, netuid):
+        self.syncs += 1
+        return make_metagraph(self.hotkeys)
+
+
+class FakeDendrite:
+    """Answers pings from reachable hotkeys, and proofs after the configured delay."""
+
+    def __init__(self, behaviour):
+        self.behaviour = behaviour
+        self.pings = 0
+
+    async def call(self, target_axon, synapse, timeout, deserialize):
+        # Like the real dendrite, give every request its own terminal info.
+        synapse.axon = bt.TerminalInfo(hotkey=target_axon.hotkey)
+        delay, commitment = self.behaviour[target_axon.hotkey]
+        if delay is None:
+            synapse.dendrite = bt.TerminalInfo(status_code=408)
+            return synapse
+        if type(synapse) is bt.Synapse:
+            self.pings += 1
+        else:
+            await asyncio.sleep(delay)
+            synapse.commitment = commitment and point(commitment)
+        synapse.dendrite = bt.TerminalInfo(status_code=200, process_time=str(delay))
+        return synapse
+
+    async def aclose_session(self):
+        pass
+
+
+def make_client(behaviour, **kwargs):
+    subtensor = FakeSubtensor(list(behaviour))
+    client = ApiClient(
+        bt.MockWallet(),
+        netuid=1,
+        subtensor=subtensor,
+        n=1.0,
+        dendrite=FakeDendrite(behaviour),
+        **kwargs,
+    )
+    return client, subtensor
+
+
+def test_queries_reuse_the_metagraph_and_pool():
+    behaviour = {
+        "low-stake": (0.0, "low-stake"),
+        "slow": (0.05, "slow"),
+        "fast": (0.01, "fast"),
+        "down": (None, None),
+    }
+    client, subtensor = make_client(behaviour)
+
+    async def scenario():
+        async with client:
+            return [await commit([], None, client=client, k=1) for _ in range(3)]
+
+    assert asyncio.run(scenario()) == [point("fast")] * 3
+    assert subtensor.syncs == 1
+    # Only the candidates were pinged, once by the first refresh.
+    assert client.dendrite.pings == 2
+    assert [entry["uid"] for entry in client.pool.live()] == [2, 1]
+
+
+def test_failing_axons_lose_rank():
+    client, _ = make_client(
+        {"low-stake": (0.0, "x"), "a": (0.01, None), "b": (0.02, "b")}
+    )
+
+    async def scenario():
+        await client.refresh()
+        for _ in range(5):
+            assert await commit([], None, client=client, k=2) == point("b")
+        return client.pool.best(1)
+
+    assert [axon.hotkey for axon in asyncio.run(scenario())] == ["b"]
+
+
+def test_metagraph_is_synced_again_after_ttl():
+    client, subtensor = make_client({"a": (0.0, "a"), "b": (0.0, "b")}, metagraph_ttl=0)
+
+    async def scenario():
+        await client.refresh()
+        await client.refresh()
+
+    asyncio.run(scenario())
+    assert subtensor.syncs == 2
+
+
+def test_open_rejects_a_verifier_the_client_does_not_use():
+    client, _ = make_client({"a": (0.0, point(1))})
+
+    with pytest.raises(Exception, match="verifier"):
+        asyncio.run(
+            open_api(["0"], "0", bt.MockWallet(), client=client, verifier=object())
+        )
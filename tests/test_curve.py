@@ -0,0 +1,55 @@
+# The MIT License (MIT)
+# Copyright © 2024 Apollo
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+import pytest
+
+from utils import curve
+from utils.encoding import SCALAR_MODULUS
+
+# The compressed generator of G1.
+GENERATOR = "l/HTpzGX15QmlWOMT6msD8NojE+XdLkFoU46PxcbrFhsVeg/+Xoa7/s68ArbIsa7"
+
+
+def test_compress_roundtrip():
+    g = curve.decompress(GENERATOR)
+
+    assert curve.compress(g) == GENERATOR
+    assert curve.decompress(curve.compress(None)) is None
+
+
+def test_aggregate():
+    g = curve.decompress(GENERATOR)
+    negated = curve.compress((g[0], curve.P - g[1]))
+
+    assert curve.aggregate([GENERATOR, GENERATOR]) == curve.compress(curve.add(g, g))
+    assert curve.aggregate([GENERATOR, negated]) == curve.compress(None)
+
+
+def test_rejects_points_off_the_curve():
+    # 1 + 4 is not a square modulo P, so there is no point with x = 1.
+    with pytest.raises(Exception):
+        curve.decompress(curve.compress((1, 0)))
+    with pytest.raises(Exception):
+        curve.decompress("not a point")
+
+
+def test_multiply():
+    g = curve.decompress(GENERATOR)
+
+    assert curve.multiply(g, 3) == curve.add(curve.add(g, g), g)
+    assert curve.multiply(g, SCALAR_MODULUS) is None
+    assert curve.multiply(g, SCALAR_MODULUS - 1) == (g[0], curve.P - g[1])
@@ -0,0 +1,82 @@
+# The MIT License (MIT)
+# Copyright © 2024 Apollo
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+import asyncio
+
+import bittensor as bt
+from aiohttp import web
+
+from base.dendrite import PooledDendrite, changed_endpoints
+
+
+def axon_info(ip: str, port: int) -> "bt.AxonInfo":
+    return bt.AxonInfo(
+        version=1,
+        ip=ip,
+        port=port,
+        ip_type=4,
+        hotkey="hotkey",
+        coldkey="coldkey",
+    )
+
+
+def test_changed_endpoints():
+    before = [axon_info("1.1.1.1", 8091), axon_info("2.2.2.2", 8091)]
+    after = [axon_info("1.1.1.1", 8091), axon_info("3.3.3.3", 8092)]
+
+    assert changed_endpoints(before, after) == {("2.2.2.2", 8091)}
+
+
+def test_connections_are_reused_and_recycled():
+    async def scenario():
+        async def handle(request):
+            return web.Response(text="ok")
+
+        app = web.Application()
+        app.router.add_get("/", handle)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        url = f"http://127.0.0.1:{port}/"
+
+        dendrite = PooledDendrite(wallet=bt.MockWallet())
+
+        async def get():
+            async with (await dendrite.session).get(url) as response:
+                assert await response.text() == "ok"
+
+        try:
+            for _ in range(5):
+                await get()
+            reused = dendrite.stats()
+
+            assert dendrite.recycle({("127.0.0.1", port)}) == 1
+            await get()
+            recycled = dendrite.stats()
+        finally:
+            await dendrite.aclose_session()
+            await runner.cleanup()
+        return reused, recycled
+
+    reused, recycled = asyncio.run(scenario())
+
+    assert reused["requests"] == 5
+    assert reused["connections_created"] == 1
+    assert reused["connections_reused"] == 4
+    assert recycled["connections_created"] == 2
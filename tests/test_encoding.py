@@ -0,0 +1,50 @@
+# The MIT License (MIT)
+# Copyright © 2024 Apollo
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+import base64
+
+from utils.encoding import BASE_MODULUS, SCALAR_MODULUS, is_point, is_scalar
+from utils.prover import ONE, ZERO
+from utils.stub_prover import point, scalar
+
+
+def encode(data: bytes) -> str:
+    return base64.b64encode(data).decode()
+
+
+def test_scalars():
+    assert is_scalar(ZERO) and is_scalar(ONE)
+    assert is_scalar(scalar("x"))
+    assert is_scalar(encode((SCALAR_MODULUS - 1).to_bytes(32, "big")))
+    assert not is_scalar(encode(SCALAR_MODULUS.to_bytes(32, "big")))
+    assert not is_scalar(encode(bytes(31)))
+    assert not is_scalar("not base64!")
+    assert not is_scalar(None)
+
+
+def test_points():
+    assert is_point(point("x"))
+    assert is_point(encode(bytes([0xC0]) + bytes(47)))
+    # Not compressed.
+    assert not is_point(encode(bytes(48)))
+    # Point at infinity with a coordinate.
+    assert not is_point(encode(bytes([0xC0]) + bytes(46) + b"\x01"))
+    # x equal to the modulus.
+    x = bytearray(BASE_MODULUS.to_bytes(48, "big"))
+    x[0] |= 0x80
+    assert not is_point(encode(bytes(x)))
+    assert not is_point(scalar("x"))
@@ -0,0 +1,159 @@
+# The MIT License (MIT)
+# Copyright © 2024 Apollo
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+import asyncio
+
+import bittensor as bt
+
+from api.hedge import AUTO, HedgedAPI, hedged_call
+from base.protocol import Prove
+
+
+class FakeDendrite:
+    """Answers every axon after its configured delay, with its configured commitment."""
+
+    def __init__(self, behaviour):
+        self.behaviour = behaviour
+        self.started = []
+        self.cancelled = []
+
+    async def call(self, target_axon, synapse, timeout, deserialize):
+        self.started.append(target_axon)
+        delay, commitment = self.behaviour[target_axon]
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self.cancelled.append(target_axon)
+            raise
+        synapse.commitment = commitment
+        synapse.dendrite.status_code = 200
+        synapse.dendrite.process_time = str(delay)
+        return synapse
+
+
+def has_commitment(response):
+    return isinstance(response.commitment, str)
+
+
+def race(behaviour, hedge_delay=None):
+    dendrite = FakeDendrite(behaviour)
+
+    async def scenario():
+        result = await hedged_call(
+            dendrite,
+            list(behaviour),
+            Prove(index=0, poly=[]),
+            has_commitment,
+            hedge_delay=hedge_delay,
+        )
+        # Let the cancelled requests unwind.
+        await asyncio.sleep(0)
+        return result
+
+    winner, received = asyncio.run(scenario())
+    return dendrite, winner, received
+
+
+def test_first_valid_response_wins():
+    dendrite, winner, received = race(
+        {"slow": (0.5, "slow"), "fast": (0.01, "fast"), "invalid": (0.0, None)}
+    )
+
+    assert winner.commitment == "fast"
+    assert [response.commitment for response in received] == [None, "fast"]
+    assert dendrite.cancelled == ["slow"]
+
+
+def test_no_valid_response():
+    _, winner, received = race({"a": (0.0, None), "b": (0.01, None)})
+
+    assert winner is None
+    assert len(received) == 2
+
+
+def test_hedge_is_only_sent_after_delay():
+    dendrite, winner, _ = race({"a": (0.01, "a"), "b": (0.01, "b")}, hedge_delay=0.2)
+
+    assert winner.commitment == "a"
+    assert dendrite.started == ["a"]
+
+
+def test_slow_axon_is_hedged():
+    dendrite, winner, _ = race({"a": (0.5, "a"), "b": (0.01, "b")}, hedge_delay=0.05)
+
+    assert winner.commitment == "b"
+    assert dendrite.started == ["a", "b"]
+
+
+def test_invalid_response_hedges_immediately():
+    dendrite, winner, _ = race({"a": (0.0, None), "b": (0.01, "b")}, hedge_delay=10.0)
+
+    assert winner.commitment == "b"
+
+
+class CommitmentAPI(HedgedAPI):
+    def prepare_synapse(self, poly):
+        return Prove(index=0, poly=poly)
+
+    def validate(self, response):
+        return super().validate(response) and has_commitment(response)
+
+    def output(self, response):
+        return response.commitment
+
+
+def test_auto_hedge_delay_uses_observed_latency():
+    api = CommitmentAPI(bt.MockWallet(), hedge_delay=AUTO)
+    assert api.current_hedge_delay(AUTO) is None
+
+    api.dendrite = FakeDendrite({"a": (0.02, "a"), "b": (0.03, "b")})
+    commitment = asyncio.run(api(axons=["a", "b"], poly=[]))
+
+    assert commitment == "a"
+    assert api.current_hedge_delay(AUTO) == 0.02
+
+
+def test_unverified_response_loses_to_verified_one():
+    dendrite = FakeDendrite({"fast": (0.0, "forged"), "slow": (0.05, "honest")})
+
+    async def verify(response):
+        await asyncio.sleep(0.01)
+        return response.commitment == "honest"
+
+    winner, received = asyncio.run(
+        hedged_call(
+            dendrite,
+            ["fast", "slow"],
+            Prove(index=0, poly=[]),
+            has_commitment,
+            verify=verify,
+        )
+    )
+
+    assert winner.commitment == "honest"
+    assert len(received) == 2
+
+
+def test_explicit_zero_hedge_delay_overrides_the_default():
+    api = CommitmentAPI(bt.MockWallet(), hedge_delay=10.0)
+    api.dendrite = FakeDendrite({"a": (0.5, "a"), "b": (0.01, "b")})
+
+    commitment = asyncio.run(api(axons=["a", "b"], poly=[], hedge_delay=0))
+
+    # Both axons were queried at once instead of after the default delay.
+    assert commitment == "b"
+    assert api.dendrite.started == ["a", "b"]
@@ -0,0 +1,122 @@
+# The MIT License (MIT)
+# Copyright © 2024 Apollo
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+import argparse
+import asyncio
+from types import SimpleNamespace
+
+import bittensor as bt
+
+import benchmarks.loadgen as loadgen
+from benchmarks.loadgen import LoadGenerator, find_knee, sweep
+from neurons.validator import Challenge
+
+
+class StubDendrite:
+    """Answers every request after a fixed delay, as a miner that always proves."""
+
+    created = []
+
+    def __init__(self, wallet=None, delay: float = 0.01):
+        self.delay = delay
+        self.closed = False
+        StubDendrite.created.append(self)
+
+    async def call(self, target_axon, synapse, timeout, deserialize):
+        await asyncio.sleep(self.delay)
+        synapse.commitment = "commitment"
+        synapse.proof = "proof"
+        synapse.dendrite.status_code = 200
+        return synapse
+
+    async def aclose_session(self):
+        self.closed = True
+
+
+def stub_generator(monkeypatch) -> LoadGenerator:
+    StubDendrite.created = []
+    monkeypatch.setattr(loadgen.bt, "dendrite", StubDendrite)
+    validator = SimpleNamespace(wallet=None, rpc_worker_verify=lambda **kwargs: True)
+    challenge = Challenge(
+        polys=[["1"], ["2"]], alpha="3", evals=["4", "5"], timeout=1.0
+    )
+    axon = bt.AxonInfo(
+        version=1, ip="127.0.0.1", port=1, ip_type=4, hotkey="m", coldkey="m"
+    )
+    return LoadGenerator(validator, axon, [challenge], timeout=1.0)
+
+
+def run_sweep(generator: LoadGenerator, mode: str, levels: str) -> dict:
+    args = argparse.Namespace(
+        mode=mode, levels=levels, duration=0.2, target="127.0.0.1:1"
+    )
+    return asyncio.run(sweep(generator, args))
+
+
+def test_closed_loop_sweep(monkeypatch):
+    generator = stub_generator(monkeypatch)
+    result = run_sweep(generator, "closed", "1,4")
+
+    for level in ("1", "4"):
+        report = result["levels"][level]
+        assert report["requests"] > 0
+        assert report["outcomes"] == {"ok": report["requests"]}
+    # Four clients keep four requests in flight against a fixed delay.
+    assert (
+        result["levels"]["4"]["ops_per_sec"] > 2 * result["levels"]["1"]["ops_per_sec"]
+    )
+    assert len(StubDendrite.created) == 4
+
+
+def test_open_loop_sweep(monkeypatch):
+    generator = stub_generator(monkeypatch)
+    result = run_sweep(generator, "open", "50")
+
+    report = result["levels"]["50"]
+    assert report["outcomes"] == {"ok": report["requests"]}
+    assert report["offered_per_sec"] >= 40
+
+
+def test_sweep_closes_dendrites(monkeypatch):
+    generator = stub_generator(monkeypatch)
+    run_sweep(generator, "closed", "2")
+
+    assert StubDendrite.created
+    assert all(dendrite.closed for dendrite in StubDendrite.created)
+    assert generator.dendrites == []
+
+
+def report(ops_per_sec: float, p95_s: float) -> dict:
+    return {"ops_per_sec": ops_per_sec, "p95_s": p95_s}
+
+
+def test_find_knee_throughput_plateau():
+    levels = [1, 2, 4, 8]
+    reports = [report(10, 0.1), report(19, 0.1), report(20, 0.15), report(20, 0.3)]
+    assert find_knee(levels, reports) == 2
+
+
+def test_find_knee_latency_blowup():
+    levels = [1, 2, 4]
+    reports = [report(10, 0.1), report(20, 0.25), report(40, 0.3)]
+    assert find_knee(levels, reports) == 1
+
+
+def test_find_knee_not_reached():
+    levels = [1, 2, 4]
+    reports = [report(10, 0.1), report(20, 0.1), report(40, 0.12)]
+    assert find_knee(levels, reports) is None
@@ -0,0 +1,54 @@
+# The MIT License (MIT)
+# Copyright © 2024 Apollo
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+from base.mock import MockLink
+from base.neuron import BaseNeuron
+from benchmarks.loopback import Loopback
+from tests.conftest import (
+    TEST_BINARY,
+    TEST_MACHINES_SCALE,
+    TEST_PRECOMPUTE_PATH,
+    TEST_SCALE,
+    TEST_SETUP_PATH,
+)
+
+
+def test_loopback_round(prover_stub):
+    config = BaseNeuron.config()
+    config.scale = TEST_SCALE
+    config.machines_scale = TEST_MACHINES_SCALE
+    config.setup_path = TEST_SETUP_PATH
+    config.precompute_path = TEST_PRECOMPUTE_PATH
+    config.prover_path = f"./{TEST_BINARY}"
+    config.prover_stub = prover_stub
+
+    loopback = Loopback(2, MockLink(latency=0.001), config=config)
+    try:
+        hotkeys = {miner.wallet.hotkey.ss58_address for miner in loopback.miners}
+        assert len(hotkeys) == 2
+        # The validator verifies on the prover the miners prove on.
+        assert loopback.validator.prover_attached
+
+        results = loopback.run(rounds=2)
+    finally:
+        loopback.close()
+
+    assert results["throughput"]["failed_rounds"] == 0
+    assert results["throughput"]["proofs"] == 4
+    assert results["throughput"]["proofs_per_sec"] > 0
+    for stage in ["round", "generate", "dispatch", "verify", "apply", "prove"]:
+        assert results[stage]["mean_s"] > 0
@@ -0,0 +1,42 @@
+# The MIT License (MIT)
+# Copyright © 2024 Apollo
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+import json
+
+from utils.metrics import Metrics
+
+
+def test_metrics_snapshot(tmp_path):
+    metrics = Metrics(window=4)
+    metrics.set("workers", 4)
+    metrics.inc("proofs")
+    metrics.inc("proofs", 2)
+    for latency in [1.0, 2.0, 3.0, 4.0, 5.0]:
+        metrics.observe("latency_s", latency)
+
+    # Only the most recent `window` observations are kept.
+    assert metrics.percentile("latency_s", 0) == 2.0
+    assert metrics.percentile("missing", 50, default=7.0) == 7.0
+
+    path = tmp_path / "metrics.json"
+    metrics.dump(str(path))
+    with open(path) as f:
+        snapshot = json.load(f)
+    assert snapshot["gauges"] == {"workers": 4}
+    assert snapshot["counters"] == {"proofs": 3}
+    assert snapshot["latencies"]["latency_s"]["count"] == 4
+    assert snapshot["latencies"]["latency_s"]["p50_s"] == 3.5
@@ -16,12 +16,19 @@
 # DEALINGS IN THE SOFTWARE.
 
 
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
 from bittensor.mock.wallet_mock import get_mock_wallet
 
+from base.mock import MockDendrite
 from base.neuron import BaseNeuron
-from base.protocol import Prove
+from base.protocol import OVER_CAPACITY, Prove, ProveBatch, Verify
 from neurons.miner import Miner
+from neurons.validator import over_capacity
 from tests.conftest import (
     TEST_BINARY,
     TEST_MACHINES_SCALE,
@@ -60,7 +67,7 @@ TEST_SYNAPSE = Prove(
 
 
 @pytest.fixture(scope="module")
-def setup_miner():
+def setup_miner(prover_stub):
     config = BaseNeuron.config()
     config.mock = True
     config.netuid = 1
@@ -74,6 +81,7 @@ def setup_miner():
     config.setup_path = TEST_SETUP_PATH
     config.precompute_path = TEST_PRECOMPUTE_PATH
     config.prover_path = f"./{TEST_BINARY}"
+    config.prover_stub = prover_stub
 
     miner = Miner(config)
     yield miner
@@ -121,6 +129,143 @@ def test_miner_forward(setup_miner, include_point):
         assert ret_synapse.proof == proof
 
 
+def test_miner_forward_commit_only(setup_miner):
+    miner = setup_miner
+    with miner.client.worker_commit(i=TEST_WORKER_INDEX, poly=TEST_POLY) as resp:
+        commitment = resp.json().get("commitment")
+
+    ret_synapse = miner.forward(Prove(index=TEST_WORKER_INDEX, poly=TEST_POLY))
+
+    assert ret_synapse.commitment == commitment
+    assert ret_synapse.proof is None
+
+
+def test_miner_forward_verify(setup_miner):
+    miner = setup_miner
+    opened = miner.forward(
+        Prove(index=TEST_WORKER_INDEX, poly=TEST_POLY, alpha=TEST_POINT)
+    )
+
+    def verify(proof: str) -> Verify:
+        return miner.forward_verify(
+            Verify(
+                index=TEST_WORKER_INDEX,
+                commitment=opened.commitment,
+                alpha=TEST_POINT,
+                eval=opened.eval,
+                proof=proof,
+            )
+        )
+
+    assert verify(opened.proof).valid is True
+    assert verify(opened.commitment).valid is False
+
+
+def test_miner_forward_batch(setup_miner):
+    miner = setup_miner
+    single = miner.forward(
+        Prove(index=TEST_WORKER_INDEX, poly=TEST_POLY, alpha=TEST_POINT)
+    )
+
+    batch = miner.forward_batch(
+        ProveBatch(
+            indices=[TEST_WORKER_INDEX] * 2,
+            polys=[TEST_POLY] * 2,
+            alphas=[TEST_POINT] * 2,
+        )
+    )
+
+    assert batch.commitments == [single.commitment] * 2
+    assert batch.evals == [single.eval] * 2
+    assert batch.proofs == [single.proof] * 2
+    assert batch.polys == []
+
+
+def test_calibrated_miner_rejects_requests_over_the_queue_limit(setup_miner):
+    miner = setup_miner
+
+    def request() -> Prove:
+        synapse = Prove(index=TEST_WORKER_INDEX, poly=TEST_POLY, alpha=TEST_POINT)
+        synapse.dendrite.hotkey = miner.metagraph.hotkeys[0]
+        return synapse
+
+    miner.config.neuron.calibration_cycles = 1
+    miner.config.neuron.calibration_deadline = 0.05
+    miner.calibrate()
+    workers = miner.config.neuron.proof_workers
+    limit = miner.config.neuron.proof_queue_limit
+    saved = (miner.proof_slots, miner.proof_queue_limit)
+    miner.proof_slots = threading.BoundedSemaphore(workers)
+    miner.proof_queue_limit = limit
+
+    # Every worker is busy, so admitted requests wait in the queue.
+    for _ in range(workers):
+        miner.proof_slots.acquire()
+    try:
+        with ThreadPoolExecutor(max_workers=limit + 2) as executor:
+            futures = [
+                executor.submit(miner.forward, request()) for _ in range(limit + 2)
+            ]
+            deadline = time.monotonic() + 10
+            while sum(f.done() for f in futures) < 2 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            # New requests are refused by the axon while the queue is full.
+            assert asyncio.run(miner.blacklist(request())) == (True, OVER_CAPACITY)
+            for _ in range(workers):
+                miner.proof_slots.release()
+            errors = [future.exception() for future in futures]
+            responses = [future.result() for future, e in zip(futures, errors) if not e]
+    finally:
+        miner.proof_slots, miner.proof_queue_limit = saved
+
+    # Requests that got past the admission check are refused by the forward function.
+    refused = [e for e in errors if e is not None]
+    assert len(refused) == 2
+    assert all(str(e) == OVER_CAPACITY for e in refused)
+    assert all(r.proof is not None for r in responses)
+    assert asyncio.run(miner.blacklist(request())) == (False, "Admitted")
+
+
+def test_miner_behind_mock_dendrite(setup_miner):
+    miner = setup_miner
+    dendrite = MockDendrite(
+        miner.wallet, handlers={miner.wallet.hotkey.ss58_address: miner}
+    )
+    axon = miner.metagraph.axons[miner.uid]
+    synapse = Prove(index=TEST_WORKER_INDEX, poly=TEST_POLY, alpha=TEST_POINT)
+
+    response = asyncio.get_event_loop().run_until_complete(
+        dendrite(axons=[axon], synapse=synapse, timeout=30)
+    )[0]
+
+    assert response.dendrite.status_code == 200
+    assert response.commitment == miner.forward(synapse).commitment
+    assert response.proof is not None
+
+
+def test_full_miner_is_seen_as_over_capacity(setup_miner):
+    miner = setup_miner
+    dendrite = MockDendrite(
+        miner.wallet, handlers={miner.wallet.hotkey.ss58_address: miner}
+    )
+    axon = miner.metagraph.axons[miner.uid]
+    synapse = Prove(index=TEST_WORKER_INDEX, poly=TEST_POLY, alpha=TEST_POINT)
+
+    saved = (miner.proof_slots, miner.proof_queue_limit, miner.proofs_waiting)
+    miner.proof_slots = threading.BoundedSemaphore(1)
+    miner.proof_queue_limit, miner.proofs_waiting = 1, 1
+    try:
+        response = asyncio.get_event_loop().run_until_complete(
+            dendrite(axons=[axon], synapse=synapse, timeout=30)
+        )[0]
+    finally:
+        miner.proof_slots, miner.proof_queue_limit, miner.proofs_waiting = saved
+
+    assert response.dendrite.status_code == 403
+    assert over_capacity(response)
+    assert response.commitment is None
+
+
 @pytest.mark.asyncio
 @pytest.mark.parametrize(
     "allow_non_registered,force_vpermit",
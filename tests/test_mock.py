@@ -1,7 +1,19 @@
+import asyncio
+import time
+from typing import Tuple
+
 import bittensor as bt
+import numpy as np
 import pytest
 
-from base.mock import MockMetagraph, MockSubtensor
+from base.mock import (
+    MockDendrite,
+    MockLink,
+    MockMetagraph,
+    MockNetwork,
+    MockSubtensor,
+)
+from base.protocol import Prove, Verify
 
 
 @pytest.mark.parametrize("netuid", [2, 3, 4])
@@ -44,3 +56,117 @@ def test_mock_metagraph(n):
         assert axon.port == 8091
 
     mock_subtensor.reset()
+
+
+def test_mock_network():
+    network = MockNetwork(netuid=77, seed=0)
+    network.populate(512, validators=32, serving=0.9)
+    metagraph = network.metagraph()
+
+    assert metagraph.n.item() == 512
+    assert metagraph.validator_permit.sum().item() == 32
+    assert 400 < sum(axon.is_serving for axon in metagraph.axons) < 512
+    served = [(axon.ip, axon.port) for axon in metagraph.axons if axon.is_serving]
+    assert len(set(served)) == len(served)
+    # Validators hold most of the stake.
+    stake = np.asarray(metagraph.S)
+    assert stake[np.asarray(metagraph.validator_permit)].sum() > stake.sum() / 2
+
+    before = list(metagraph.hotkeys)
+    changed = network.churn(replace=0.05, register=4)
+    metagraph.sync(subtensor=network.subtensor)
+
+    assert metagraph.n.item() == 516
+    assert len(changed) == 26 + 4
+    assert all(metagraph.hotkeys[uid] != before[uid] for uid in changed[:26])
+    assert not metagraph.validator_permit[changed[:26]].any()
+    assert not network.subtensor.is_hotkey_registered(
+        netuid=77, hotkey_ss58=before[changed[0]]
+    )
+    assert network.subtensor.is_hotkey_registered(
+        netuid=77, hotkey_ss58=metagraph.hotkeys[changed[0]]
+    )
+
+
+def axon_info(hotkey: str) -> "bt.AxonInfo":
+    return bt.AxonInfo(
+        version=1, ip="127.0.0.0", port=8091, ip_type=4, hotkey=hotkey, coldkey="c"
+    )
+
+
+class FakeMiner:
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+
+    def axon_handlers(self):
+        return [
+            (self.forward, self.blacklist, None),
+            (self.forward_verify, self.blacklist, None),
+        ]
+
+    async def blacklist(self, synapse: Prove) -> Tuple[bool, str]:
+        return synapse.dendrite.hotkey is None, ""
+
+    def forward(self, synapse: Prove) -> Prove:
+        time.sleep(self.delay)
+        return Prove(index=synapse.index, poly=[], commitment="c", proof="p")
+
+    def forward_verify(self, synapse: Verify) -> Verify:
+        synapse.valid = True
+        return synapse
+
+
+def query(dendrite, hotkey, synapse, timeout=1.0):
+    responses = asyncio.get_event_loop().run_until_complete(
+        dendrite(axons=[axon_info(hotkey)], synapse=synapse, timeout=timeout)
+    )
+    return responses[0]
+
+
+def test_mock_dendrite_routes_to_neurons():
+    dendrite = MockDendrite(bt.MockWallet(), handlers={"miner": FakeMiner()})
+
+    response = query(dendrite, "miner", Prove(index=3, poly=["1"], alpha="2"))
+    assert response.dendrite.status_code == 200
+    assert (response.index, response.commitment, response.proof) == (3, "c", "p")
+    assert response.poly == []
+
+    verify = Verify(index=0, commitment="c", alpha="a", eval="e", proof="p")
+    response = query(dendrite, "miner", verify)
+    assert response.valid is True
+
+    # Unrouted hotkeys keep the random behavior.
+    response = query(dendrite, "other", Prove(index=0, poly=["1"]))
+    assert response.dendrite.status_code == 200
+    assert response.commitment is None
+
+
+def test_mock_dendrite_link_models():
+    wallet = bt.MockWallet()
+    slow = MockDendrite(
+        wallet, handlers={"miner": FakeMiner()}, link=MockLink(latency=0.05)
+    )
+    response = query(slow, "miner", Prove(index=0, poly=["1"]))
+    assert float(response.dendrite.process_time) >= 0.1
+
+    response = query(slow, "miner", Prove(index=0, poly=["1"]), timeout=0.05)
+    assert response.dendrite.status_code == 408
+    assert response.commitment is None
+
+    busy = MockDendrite(wallet, handlers={"miner": FakeMiner(delay=0.2)})
+    response = query(busy, "miner", Prove(index=0, poly=["1"]), timeout=0.1)
+    assert response.dendrite.status_code == 408
+
+    narrow = MockDendrite(
+        wallet,
+        handlers={"miner": FakeMiner()},
+        links={"miner": MockLink(bandwidth=10_000)},
+    )
+    response = query(narrow, "miner", Prove(index=0, poly=["1" * 1000]))
+    assert float(response.dendrite.process_time) >= 0.1
+
+    lossy = MockDendrite(
+        wallet, handlers={"miner": FakeMiner()}, link=MockLink(error_rate=1.0)
+    )
+    response = query(lossy, "miner", Prove(index=0, poly=["1"]))
+    assert response.dendrite.status_code == 503
@@ -0,0 +1,91 @@
+# The MIT License (MIT)
+# Copyright © 2024 Apollo
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+import asyncio
+import itertools
+import random
+
+from base.pipeline import RoundPipeline
+
+
+def make_pipeline(loop, depth, fail=()):
+    counter = itertools.count()
+    state = {"dispatching": 0, "max_dispatching": 0, "applied": []}
+
+    def generate():
+        return next(counter)
+
+    async def dispatch(challenge):
+        state["dispatching"] += 1
+        state["max_dispatching"] = max(state["max_dispatching"], state["dispatching"])
+        # Later rounds may finish before earlier ones.
+        await asyncio.sleep(random.uniform(0.001, 0.02))
+        state["dispatching"] -= 1
+        if challenge in fail:
+            raise Exception("no responses")
+        return challenge
+
+    def verify(challenge, dispatched):
+        return dispatched * 10
+
+    def apply(dispatched, rewards):
+        state["applied"].append((dispatched, rewards))
+
+    pipeline = RoundPipeline(
+        loop, generate, dispatch, verify, apply, depth=depth, retry_delay=0.0
+    )
+    return pipeline, state
+
+
+def test_rounds_overlap_and_apply_in_order():
+    loop = asyncio.new_event_loop()
+    pipeline, state = make_pipeline(loop, depth=4)
+
+    for _ in range(20):
+        loop.run_until_complete(pipeline.step())
+
+    assert state["applied"] == [(i, i * 10) for i in range(20)]
+    assert state["max_dispatching"] > 1
+    assert len(pipeline.rounds) == 3
+    loop.run_until_complete(pipeline.close())
+    loop.close()
+
+
+def test_sequential_with_depth_one():
+    loop = asyncio.new_event_loop()
+    pipeline, state = make_pipeline(loop, depth=1)
+
+    for _ in range(5):
+        loop.run_until_complete(pipeline.step())
+
+    assert [dispatched for dispatched, _ in state["applied"]] == list(range(5))
+    assert state["max_dispatching"] == 1
+    loop.run_until_complete(pipeline.close())
+    loop.close()
+
+
+def test_failed_round_is_skipped():
+    loop = asyncio.new_event_loop()
+    pipeline, state = make_pipeline(loop, depth=3, fail={2})
+
+    for _ in range(5):
+        loop.run_until_complete(pipeline.step())
+
+    assert [dispatched for dispatched, _ in state["applied"]] == [0, 1, 3, 4]
+    assert pipeline.metrics.counters["rounds_failed"] == 1
+    loop.run_until_complete(pipeline.close())
+    loop.close()
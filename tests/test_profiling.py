@@ -0,0 +1,83 @@
+# The MIT License (MIT)
+# Copyright © 2024 Apollo
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+import os
+import signal
+import time
+
+from utils.profiling import Profiler
+
+
+def test_profiler_window(tmp_path):
+    profiler = Profiler(output_dir=str(tmp_path), name="test", calls=2, interval=0.001)
+
+    # Nothing is recorded until the profiler is armed.
+    with profiler.track():
+        time.sleep(0.01)
+    assert os.listdir(tmp_path) == []
+
+    profiler.arm()
+    for _ in range(2):
+        with profiler.track():
+            time.sleep(0.02)
+
+    files = os.listdir(tmp_path)
+    assert len(files) == 1
+    assert files[0].endswith(".folded")
+    with open(tmp_path / files[0]) as f:
+        lines = f.read().splitlines()
+    assert len(lines) > 0
+    for line in lines:
+        stack, count = line.rsplit(" ", 1)
+        assert stack.startswith("thread:")
+        assert int(count) > 0
+
+
+def test_signal_arms_every_profiler(tmp_path):
+    first = Profiler(output_dir=str(tmp_path), name="first", calls=1)
+    second = Profiler(output_dir=str(tmp_path), name="second", calls=1)
+    first.install_signal_handler()
+    second.install_signal_handler()
+
+    os.kill(os.getpid(), signal.SIGUSR1)
+    for profiler in (first, second):
+        with profiler.track():
+            time.sleep(0.01)
+
+    assert sorted(name.split("-")[1] for name in os.listdir(tmp_path)) == [
+        "first",
+        "second",
+    ]
+
+
+def test_signal_inside_tracked_call(tmp_path):
+    profiler = Profiler(output_dir=str(tmp_path), name="test", calls=1)
+    profiler.install_signal_handler()
+
+    # The handler runs on the thread holding the lock and must not wait for it.
+    with profiler.lock:
+        os.kill(os.getpid(), signal.SIGUSR1)
+        time.sleep(0.01)
+    with profiler.track():
+        assert profiler.sampler is not None
+        os.kill(os.getpid(), signal.SIGUSR1)
+        time.sleep(0.01)
+    assert len(os.listdir(tmp_path)) == 1
+
+    # The signal received during the window arms the next one.
+    with profiler.track():
+        assert profiler.sampler is not None
@@ -0,0 +1,87 @@
+# The MIT License (MIT)
+# Copyright © 2024 Apollo
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from utils import prover
+
+PORT = 13372
+
+
+@pytest.fixture
+def daemon_config(tmp_path):
+    return SimpleNamespace(
+        prover_stub=True,
+        prover_stub_latency=0.0,
+        setup_path=str(tmp_path / "setup"),
+        precompute_path=str(tmp_path / "precompute"),
+        scale=6,
+        machines_scale=2,
+    )
+
+
+@pytest.fixture
+def daemon(daemon_config):
+    client = prover.make_client(daemon_config, PORT)
+    client.start(scale=6, machines_scale=2)
+    prover.write_record(daemon_config, client, PORT)
+    yield client
+    client.stop()
+
+
+def test_attach(daemon, daemon_config):
+    client = prover.attach(daemon_config, PORT)
+
+    assert client is not None
+    with client.random_poly() as response:
+        assert response.status_code == 200
+
+
+def test_attach_without_daemon(daemon_config):
+    assert prover.attach(daemon_config, PORT) is None
+
+
+def test_attach_scale_mismatch(daemon, daemon_config):
+    daemon_config.scale = 8
+    with pytest.raises(prover.ProverMismatch):
+        prover.attach(daemon_config, PORT)
+
+
+def test_attach_setup_mismatch(daemon, daemon_config):
+    path = prover.record_path(daemon_config, PORT)
+    with open(path) as f:
+        record = json.load(f)
+    record["fingerprint"] = "tampered"
+    with open(path, "w") as f:
+        json.dump(record, f)
+
+    with pytest.raises(prover.ProverMismatch):
+        prover.attach(daemon_config, PORT)
+
+
+def test_attach_stale_record(daemon_config):
+    client = prover.make_client(daemon_config, PORT)
+    client.start(scale=6, machines_scale=2)
+    prover.write_record(daemon_config, client, PORT)
+    client.stop()
+
+    # The recorded daemon is gone, so its record does not block a new prover.
+    daemon_config.precompute_path += ".new"
+    assert prover.attach(daemon_config, PORT) is None
@@ -0,0 +1,112 @@
+# The MIT License (MIT)
+# Copyright © 2024 Apollo
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+import asyncio
+import itertools
+import random
+from collections import Counter
+
+from base.scheduler import RollingScheduler
+
+ROWS = 4
+
+
+def make_scheduler(loop, uids, target, fail=()):
+    counter = itertools.count()
+    state = {"busy": set(), "max_inflight": 0, "overlap": False, "applied": []}
+
+    def generate():
+        challenge = next(counter)
+        if challenge in fail:
+            raise Exception("prover unavailable")
+        return challenge
+
+    async def dispatch(challenge, row, uid):
+        state["overlap"] |= uid in state["busy"]
+        state["busy"].add(uid)
+        state["max_inflight"] = max(state["max_inflight"], len(state["busy"]))
+        await asyncio.sleep(random.uniform(0.001, 0.02))
+        state["busy"].discard(uid)
+        return challenge, row, uid
+
+    def verify(challenge, dispatched):
+        return 1.0
+
+    def apply(dispatched, rewards):
+        state["applied"].append(dispatched)
+
+    scheduler = RollingScheduler(
+        loop,
+        lambda: uids,
+        generate,
+        lambda challenge: ROWS,
+        dispatch,
+        verify,
+        apply,
+        target=target,
+        retry_delay=0.0,
+    )
+    return scheduler, state
+
+
+def test_covers_the_metagraph_evenly():
+    loop = asyncio.new_event_loop()
+    scheduler, state = make_scheduler(loop, list(range(10)), target=3)
+
+    while len(state["applied"]) < 30:
+        loop.run_until_complete(scheduler.step())
+
+    evaluated = Counter(uid for _, _, uid in state["applied"])
+    assert max(evaluated.values()) - min(evaluated.values()) <= 2
+    assert len(evaluated) == 10
+    assert state["max_inflight"] == 3
+    assert not state["overlap"]
+
+    # Every row of a challenge is handed out once.
+    rows = Counter((challenge, row) for challenge, row, _ in state["applied"])
+    assert set(rows.values()) == {1}
+    assert all(row < ROWS for _, row in rows)
+    assert scheduler.metrics.counters["evaluations"] == len(state["applied"])
+    loop.run_until_complete(scheduler.close())
+    loop.close()
+
+
+def test_never_queries_a_miner_twice_at_once():
+    loop = asyncio.new_event_loop()
+    scheduler, state = make_scheduler(loop, [0, 1], target=5)
+
+    for _ in range(10):
+        loop.run_until_complete(scheduler.step())
+
+    assert state["max_inflight"] == 2
+    assert not state["overlap"]
+    assert len(scheduler.cycle) <= 4
+    loop.run_until_complete(scheduler.close())
+    loop.close()
+
+
+def test_failed_challenge_is_regenerated():
+    loop = asyncio.new_event_loop()
+    scheduler, state = make_scheduler(loop, list(range(5)), target=1, fail={0})
+
+    for _ in range(3):
+        loop.run_until_complete(scheduler.step())
+
+    assert scheduler.metrics.counters["evaluations_failed"] == 1
+    assert [challenge for challenge, _, _ in state["applied"]] == [1, 1]
+    loop.run_until_complete(scheduler.close())
+    loop.close()
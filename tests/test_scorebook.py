@@ -0,0 +1,64 @@
+# The MIT License (MIT)
+# Copyright © 2024 Apollo
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+import numpy as np
+import pytest
+
+from base.scorebook import ScoreBook
+
+
+def test_update_is_a_moving_average_in_place():
+    book = ScoreBook(alpha=0.5, capacity=4)
+    book.sync(["a", "b", "c"])
+    book.scores[:] = [0.2, 0.4, 0.8]
+    column = book._scores
+
+    book.update(np.array([0, 2]), np.array([1.0, 0.0]), block=7)
+
+    assert book.scores == pytest.approx([0.6, 0.2, 0.4])
+    assert book.scores.dtype == np.float32
+    assert book._scores is column
+    assert book.updated.tolist() == [7, 0, 7]
+    assert book.samples.tolist() == [1, 0, 1]
+
+
+def test_sync_clears_replaced_hotkeys_and_grows():
+    book = ScoreBook(alpha=0.5, capacity=2)
+    book.sync(["a", "b"])
+    book.update(np.array([0, 1]), np.array([1.0, 1.0]), block=3)
+
+    book.sync(["a", "x", "c"])
+
+    assert book.capacity == 4
+    assert book.hotkeys == ["a", "x", "c"]
+    assert book.scores.tolist() == [0.5, 0.0, 0.0]
+    assert book.samples.tolist() == [1, 0, 0]
+    assert book.scores.dtype == np.float32
+
+
+def test_state_round_trip():
+    book = ScoreBook(alpha=0.5)
+    book.sync(["a", "b"])
+    book.update(np.array([1]), np.array([1.0]), block=9)
+
+    restored = ScoreBook(alpha=0.5)
+    restored.load(book.state())
+
+    assert restored.hotkeys == ["a", "b"]
+    assert restored.scores.tolist() == book.scores.tolist()
+    assert restored.updated.tolist() == [0, 9]
+    assert restored.samples.tolist() == [0, 1]
@@ -0,0 +1,90 @@
+# The MIT License (MIT)
+# Copyright © 2024 Apollo
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+import asyncio
+
+import bittensor as bt
+import pytest
+
+from api.shard import ShardedCommitmentAPI, split
+from utils import curve
+from utils.stub_prover import StubProver, scalar
+
+PROVER = StubProver()
+
+
+class FakeDendrite:
+    """Commits to rows with the stub prover; `broken` axons return garbage."""
+
+    def __init__(self, broken=(), delay=0.0):
+        self.broken = broken
+        self.delay = delay
+        self.rows = {}
+
+    async def call(self, target_axon, synapse, timeout, deserialize):
+        await asyncio.sleep(self.delay)
+        synapse.axon = bt.TerminalInfo(hotkey=target_axon)
+        synapse.dendrite = bt.TerminalInfo(status_code=200, process_time="0.0")
+        if target_axon in self.broken:
+            synapse.commitment = "garbage"
+        else:
+            self.rows[synapse.index] = target_axon
+            synapse.commitment = PROVER.worker_commit(synapse.index, synapse.poly)[
+                "commitment"
+            ]
+        return synapse
+
+
+def commit(dendrite, axons, poly, machines_scale):
+    api = ShardedCommitmentAPI(bt.MockWallet(), dendrite=dendrite)
+    return asyncio.run(api(axons=axons, poly=poly, machines_scale=machines_scale))
+
+
+def expected(poly, machines_scale):
+    return curve.aggregate(
+        [
+            PROVER.worker_commit(i, row)["commitment"]
+            for i, row in enumerate(split(poly, machines_scale))
+        ]
+    )
+
+
+def test_rows_are_spread_and_aggregated():
+    poly = [scalar(i) for i in range(16)]
+    dendrite = FakeDendrite()
+
+    assert commit(dendrite, ["a", "b", "c", "d"], poly, 2) == expected(poly, 2)
+    assert dendrite.rows == {0: "a", 1: "b", 2: "c", 3: "d"}
+
+
+def test_rows_of_failed_miners_are_reassigned():
+    poly = [scalar(i) for i in range(16)]
+    dendrite = FakeDendrite(broken=("b",))
+
+    assert commit(dendrite, ["a", "b"], poly, 2) == expected(poly, 2)
+    assert set(dendrite.rows.values()) == {"a"}
+
+
+def test_no_commitment_without_every_row():
+    poly = [scalar(i) for i in range(8)]
+
+    assert commit(FakeDendrite(broken=("a",)), ["a"], poly, 1) is None
+
+
+def test_split_rejects_uneven_polynomials():
+    with pytest.raises(Exception):
+        split([scalar(i) for i in range(6)], 2)
@@ -0,0 +1,88 @@
+# The MIT License (MIT)
+# Copyright © 2024 Apollo
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+import base64
+
+import pytest
+import requests
+
+from utils.stub_prover import StubProver
+
+TEST_PORT = 13370
+
+
+@pytest.fixture(scope="module")
+def stub_prover():
+    prover = StubProver(port=TEST_PORT, scale=6, machines_scale=2)
+    prover.start()
+    yield prover
+    prover.stop()
+
+
+def call(method: str, **params):
+    response = requests.post(f"http://127.0.0.1:{TEST_PORT}/{method}", json=params)
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_stub_prover_roundtrip(stub_prover):
+    poly = call("random_poly")["poly"]
+    assert len(poly) == 4
+    assert all(len(row) == 16 for row in poly)
+
+    alpha = call("random_point")["point"]
+    coeffs = call("fft", poly=poly[1], left=True, inverse=True)["poly"]
+    eval = call("eval", poly=coeffs, x=alpha)["y"]
+
+    commitment = call("worker_commit", i=1, poly=poly[1])["commitment"]
+    opening = call("worker_open", i=1, poly=poly[1], x=alpha)
+    assert opening["eval"] == eval
+    assert len(base64.b64decode(opening["proof"])) == 48
+
+    valid = call(
+        "worker_verify",
+        i=1,
+        proof=opening["proof"],
+        alpha=alpha,
+        eval=eval,
+        commitment=commitment,
+    )["valid"]
+    assert valid
+
+    # Any other worker index, evaluation or commitment fails verification.
+    for i, eval_, commitment_ in [(0, eval, commitment), (1, alpha, commitment)]:
+        assert not call(
+            "worker_verify",
+            i=i,
+            proof=opening["proof"],
+            alpha=alpha,
+            eval=eval_,
+            commitment=commitment_,
+        )["valid"]
+
+
+def test_stub_prover_deterministic():
+    prover = StubProver(seed=1)
+    other = StubProver(seed=1)
+    assert prover.random_poly() == other.random_poly()
+    assert prover.random_point() == other.random_point()
+    assert prover.random_point() != prover.random_point()
+
+
+def test_stub_prover_unknown_method(stub_prover):
+    response = requests.post(f"http://127.0.0.1:{TEST_PORT}/unknown", json={})
+    assert response.status_code == 404
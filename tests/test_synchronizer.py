@@ -0,0 +1,122 @@
+# The MIT License (MIT)
+# Copyright © 2024 Apollo
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+import threading
+import time
+from types import SimpleNamespace
+
+from base.neuron import BaseNeuron
+from base.synchronizer import ChainSynchronizer
+from utils.metrics import Metrics
+
+
+class FakeNeuron:
+    def __init__(self, outcome=None):
+        self.metrics = Metrics()
+        self.should_exit = False
+        self.syncs = 0
+        self.outcome = outcome
+        self.synced = threading.Event()
+
+    def sync(self):
+        self.syncs += 1
+        self.synced.set()
+        if self.outcome is not None:
+            raise self.outcome
+
+
+def test_syncs_in_background():
+    neuron = FakeNeuron()
+    synchronizer = ChainSynchronizer(neuron, interval=0.01)
+    synchronizer.start()
+    assert neuron.synced.wait(1.0)
+    synchronizer.stop()
+
+    syncs = neuron.syncs
+    time.sleep(0.05)
+    assert neuron.syncs == syncs
+    assert neuron.metrics.snapshot()["latencies"]["sync_latency_s"]["count"] >= 1
+
+
+def test_failed_sync_keeps_running():
+    neuron = FakeNeuron(outcome=Exception("websocket closed"))
+    synchronizer = ChainSynchronizer(neuron, interval=0.01)
+
+    synchronizer.sync_once()
+    synchronizer.sync_once()
+
+    assert neuron.metrics.counters["sync_failures"] == 2
+    assert not neuron.should_exit
+
+
+def test_deregistration_stops_neuron():
+    neuron = FakeNeuron(outcome=SystemExit())
+    synchronizer = ChainSynchronizer(neuron, interval=0.01)
+    synchronizer.start()
+    assert neuron.synced.wait(1.0)
+    synchronizer.thread.join(1.0)
+
+    assert neuron.should_exit
+    assert neuron.syncs == 1
+
+
+class ChainNeuron:
+    """Runs `BaseNeuron.sync` and records whether the subtensor lock was held."""
+
+    sync = BaseNeuron.sync
+
+    def __init__(self, tmp_path):
+        self.subtensor_lock = threading.RLock()
+        self.metrics = Metrics()
+        self.config = SimpleNamespace(neuron=SimpleNamespace(full_path=str(tmp_path)))
+        self.locked = []
+
+    def held_elsewhere(self) -> bool:
+        free = []
+
+        def probe():
+            free.append(self.subtensor_lock.acquire(blocking=False))
+            if free[0]:
+                self.subtensor_lock.release()
+
+        thread = threading.Thread(target=probe)
+        thread.start()
+        thread.join()
+        return not free[0]
+
+    def check_registered(self):
+        self.locked.append(self.held_elsewhere())
+
+    def should_sync_metagraph(self):
+        return True
+
+    def resync_metagraph(self):
+        self.locked.append(self.held_elsewhere())
+
+    def should_set_weights(self):
+        return False
+
+    def save_state(self):
+        pass
+
+
+def test_background_sync_holds_the_subtensor_lock(tmp_path):
+    neuron = ChainNeuron(tmp_path)
+    ChainSynchronizer(neuron).sync_once()
+
+    assert neuron.locked == [True, True]
+    assert not neuron.held_elsewhere()
@@ -15,13 +15,23 @@
 # OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
 # DEALINGS IN THE SOFTWARE.
 
+import asyncio
 import base64
+import secrets
+from contextlib import contextmanager
+from types import SimpleNamespace
 from typing import List, Tuple
 
+import bittensor as bt
+import numpy as np
 import pytest
 
-from base.protocol import Prove
+from base.protocol import OVER_CAPACITY, Prove, ProveBatch
 from neurons.validator import Challenge, Validator
+from utils import curve
+from utils.encoding import SCALAR_MODULUS, decode_scalar
+from utils.prover import ONE
+from utils.stub_prover import scalar
 from tests.conftest import (
     TEST_BINARY,
     TEST_MACHINES_SCALE,
@@ -34,7 +44,7 @@ TEST_MACHINE_COUNT = 2
 
 
 @pytest.fixture(scope="module")
-def setup_validator():
+def setup_validator(prover_stub):
     config = Validator.config()
     config.mock = True
     config.netuid = 10
@@ -50,6 +60,7 @@ def setup_validator():
     config.setup_path = TEST_SETUP_PATH
     config.precompute_path = TEST_PRECOMPUTE_PATH
     config.prover_path = f"./{TEST_BINARY}"
+    config.prover_stub = prover_stub
 
     validator = Validator(config)
     yield validator
@@ -75,7 +86,6 @@ def test_reward(
     half_time,
     expected_value,
 ):
-
     def change_proof(proof: str):
         # Update if we change to base64
         decoded_proof = base64.b64decode(proof)
@@ -121,6 +131,257 @@ def test_reward(
         assert reward == expected
 
 
+def test_apply_round_drops_replaced_hotkeys(setup_validator):
+    validator = setup_validator
+    alpha = validator.config.neuron.moving_average_alpha
+    uids = np.array([0, 1])
+    hotkeys = [validator.metagraph.hotkeys[0], "replaced"]
+    before = validator.scores.copy()
+
+    validator.apply_round((uids, hotkeys, []), np.array([1.0, 1.0], dtype=np.float32))
+
+    assert validator.scores[0] == pytest.approx(alpha + (1 - alpha) * before[0])
+    assert validator.scores[1] == pytest.approx((1 - alpha) * before[1])
+
+
+def test_capacity_refusals_keep_the_score_for_a_grace_period(setup_validator):
+    validator = setup_validator
+    validator.config.neuron.capacity_grace = 2
+    uids = np.array([0, 1])
+    hotkeys = [validator.metagraph.hotkeys[uid] for uid in uids]
+
+    def refused() -> Prove:
+        response = Prove(index=0, poly=[])
+        response.dendrite.status_code = 403
+        response.dendrite.status_message = (
+            f"Forbidden. Key is blacklisted: {OVER_CAPACITY}."
+        )
+        return response
+
+    def failed() -> Prove:
+        response = Prove(index=0, poly=[])
+        response.dendrite.status_code = 200
+        return response
+
+    validator.apply_round(
+        (uids, hotkeys, [failed(), failed()]), np.ones(2, dtype=np.float32)
+    )
+    before = validator.scores.copy()
+
+    # Refusing for lack of capacity is not scored like a failed proof, for a while.
+    for _ in range(2):
+        validator.apply_round(
+            (uids, hotkeys, [refused(), failed()]), np.zeros(2, dtype=np.float32)
+        )
+    assert validator.scores[0] == pytest.approx(before[0])
+    assert validator.scores[1] < before[1]
+
+    validator.apply_round(
+        (uids, hotkeys, [refused(), failed()]), np.zeros(2, dtype=np.float32)
+    )
+    assert validator.scores[0] < before[0]
+    assert validator.metrics.counters["capacity_refusals"] == 3
+
+    # Answering resets the grace period.
+    validator.apply_round((uids, hotkeys, [failed(), failed()]), np.zeros(2))
+    assert hotkeys[0] not in validator.capacity_refusals
+
+
+@pytest.mark.parametrize("invalid_proof", [False, True])
+def test_aggregate_verification_matches_per_worker_checks(
+    setup_validator, invalid_proof
+):
+    validator = setup_validator
+    challenge, responses, _ = make_proofs(validator)
+    for response in responses:
+        response.dendrite.process_time = 0.0
+    if invalid_proof:
+        responses[0].proof = responses[1].proof
+
+    validator.config.neuron.aggregate_verification = True
+    try:
+        rewards = validator.get_rewards(challenge, responses, 10.0)
+    finally:
+        validator.config.neuron.aggregate_verification = False
+
+    assert list(rewards) == ([0.0, 1.0] if invalid_proof else [1.0, 1.0])
+
+
+def test_batch_rewards(setup_validator):
+    validator = setup_validator
+    (first, responses, _), (second, _, _) = make_proofs(validator), make_proofs(
+        validator
+    )
+
+    batches = []
+    for i in range(TEST_MACHINE_COUNT):
+        with validator.client.worker_commit(i, second.polys[i]) as resp:
+            commitment = resp.json().get("commitment")
+        with validator.client.worker_open(i, second.polys[i], second.alpha) as resp:
+            eval, proof = resp.json().get("eval"), resp.json().get("proof")
+        batch = ProveBatch(
+            indices=[i, i],
+            polys=[],
+            alphas=[],
+            commitments=[responses[i].commitment, commitment],
+            evals=[responses[i].eval, eval],
+            proofs=[responses[i].proof, proof],
+        )
+        batch.dendrite.process_time = 5.0
+        batches.append(batch)
+    # The second miner only proved the first row correctly.
+    batches[1].proofs[1] = batches[1].proofs[0]
+
+    rewards = validator.get_batch_rewards([first, second], batches, 10.0)
+
+    assert list(rewards) == [0.5, 0.25]
+
+
+def test_adaptive_timeout(setup_validator):
+    validator = setup_validator
+    config = validator.config.neuron
+    assert validator.query_timeout() == config.timeout
+
+    config.adaptive_timeout = True
+    try:
+        validator.metrics.observe("miner_latency_s", 3.0)
+        assert validator.query_timeout() == pytest.approx(config.timeout_margin * 3.0)
+
+        validator.metrics.observe("miner_latency_s", 1000.0)
+        assert validator.query_timeout() == config.timeout
+    finally:
+        config.adaptive_timeout = False
+        validator.metrics.latencies.pop("miner_latency_s")
+
+
+def test_adaptive_timeout_widens_when_miners_slow_down(setup_validator):
+    validator = setup_validator
+    config = validator.config.neuron
+    config.adaptive_timeout = True
+    try:
+        for _ in range(20):
+            validator.metrics.observe("miner_latency_s", 1.0)
+        fast = validator.query_timeout()
+
+        # Every miner is now slower than any timeout learned so far.
+        for _ in range(20):
+            challenge, responses, _ = make_proofs(validator)
+            challenge.timeout = validator.query_timeout()
+            for response in responses:
+                response.dendrite.process_time = 2 * config.timeout
+            assert not validator.score(challenge, responses).any()
+
+        assert validator.query_timeout() > fast
+        assert validator.query_timeout() == config.timeout
+    finally:
+        config.adaptive_timeout = False
+        validator.metrics.latencies.pop("miner_latency_s")
+
+
+def test_rewards_are_relative_to_the_timeout_ceiling(setup_validator):
+    validator = setup_validator
+    challenge, responses, _ = make_proofs(validator)
+    challenge.timeout = 5.0
+    responses[0].dendrite.process_time = 3.0
+    responses[1].dendrite.process_time = 6.0
+
+    rewards = validator.score(challenge, responses)
+
+    assert rewards[0] == pytest.approx(1.0 - 3.0 / validator.config.neuron.timeout)
+    # Too late for this round's timeout, even though below the ceiling.
+    assert rewards[1] == 0.0
+    validator.metrics.latencies.pop("miner_latency_s")
+
+
+# The compressed generator of G1.
+GENERATOR = curve.decompress(
+    "l/HTpzGX15QmlWOMT6msD8NojE+XdLkFoU46PxcbrFhsVeg/+Xoa7/s68ArbIsa7"
+)
+
+
+class TrapdoorProver:
+    """
+    A prover that knows the trapdoor of its setup. It commits and verifies like
+    a KZG prover whose row i is scaled by `units[i]`, without pairings.
+    """
+
+    def __init__(self, rows: int):
+        self.tau = secrets.randbelow(SCALAR_MODULUS)
+        self.units = [secrets.randbelow(SCALAR_MODULUS) for _ in range(rows)]
+
+    def point(self, value: int) -> str:
+        return curve.compress(curve.multiply(GENERATOR, value % SCALAR_MODULUS))
+
+    @contextmanager
+    def worker_commit(self, i, poly):
+        assert poly == [ONE] * len(poly)
+        yield SimpleNamespace(
+            status_code=200, json=lambda: {"commitment": self.point(self.units[i])}
+        )
+
+    @contextmanager
+    def worker_verify(self, i, proof, alpha, eval, commitment):
+        lhs = curve.add(
+            curve.decompress(commitment),
+            curve.decompress(self.point(-decode_scalar(eval) * self.units[i])),
+        )
+        rhs = curve.multiply(
+            curve.decompress(proof), (self.tau - decode_scalar(alpha)) % SCALAR_MODULUS
+        )
+        yield SimpleNamespace(status_code=200, json=lambda: {"valid": lhs == rhs})
+
+    def open(self, i: int, value: int, alpha: str, eval: str) -> Prove:
+        """An opening of a row that evaluates to `value` at tau and `eval` at alpha."""
+        quotient = (value - decode_scalar(eval)) * pow(
+            self.tau - decode_scalar(alpha), -1, SCALAR_MODULUS
+        )
+        return Prove(
+            index=i,
+            poly=[],
+            commitment=self.point(value * self.units[i]),
+            proof=self.point(quotient * self.units[i]),
+        )
+
+
+def test_verify_aggregate_with_a_linear_prover(setup_validator):
+    validator = setup_validator
+    prover = TrapdoorProver(rows=3)
+    alpha = scalar("alpha")
+    challenge = Challenge(
+        polys=[[ONE] * 4] * 3,
+        alpha=alpha,
+        evals=[scalar("eval", i) for i in range(3)],
+        timeout=10.0,
+    )
+    responses = [
+        prover.open(i, secrets.randbelow(SCALAR_MODULUS), alpha, challenge.evals[i])
+        for i in range(3)
+    ]
+    # Two miners on the same row.
+    responses.append(prover.open(1, 7, alpha, challenge.evals[1]))
+
+    client, unit_commitments = validator.client, validator.unit_commitments
+    validator.client, validator.unit_commitments = prover, {}
+    try:
+        assert validator.verify_aggregate(challenge, responses)
+
+        # Errors that cancel out in a plain sum are caught by the random combination.
+        offset = curve.decompress(prover.point(5))
+        forged = [response.copy() for response in responses]
+        forged[0].commitment = curve.compress(
+            curve.add(curve.decompress(forged[0].commitment), offset)
+        )
+        forged[1].commitment = curve.compress(
+            curve.add(
+                curve.decompress(forged[1].commitment),
+                curve.decompress(prover.point(-5)),
+            )
+        )
+        assert not validator.verify_aggregate(challenge, forged)
+    finally:
+        validator.client, validator.unit_commitments = client, unit_commitments
+
+
 def make_proofs(validator) -> Tuple[Challenge, List[Prove], List[bool]]:
     challenge = validator.generate_challenge(TEST_MACHINE_COUNT)
 
@@ -161,3 +422,99 @@ def make_proofs(validator) -> Tuple[Challenge, List[Prove], List[bool]]:
         is_valid.append(valid)
 
     return challenge, responses, is_valid
+
+
+def test_pipelined_rounds_are_closed_on_shutdown(setup_validator, monkeypatch):
+    validator = setup_validator
+    validator.config.neuron.max_inflight_rounds = 2
+
+    async def dispatch_round(challenge):
+        return np.array([0]), ["hotkey"], []
+
+    monkeypatch.setattr(validator, "dispatch_round", dispatch_round)
+    monkeypatch.setattr(validator, "verify_round", lambda *args: np.ones(1))
+    monkeypatch.setattr(validator, "apply_round", lambda *args: None)
+    try:
+        validator.loop.run_until_complete(validator.pipelined_forward())
+        pipeline = validator.pipeline
+        assert pipeline.prefetched is not None
+
+        validator.stop_rounds()
+
+        assert validator.pipeline is None
+        assert not pipeline.rounds and pipeline.prefetched is None
+    finally:
+        validator.config.neuron.max_inflight_rounds = 1
+
+
+def test_rolling_forward(setup_validator):
+    validator = setup_validator
+    validator.config.neuron.rolling_inflight = 2
+    try:
+        validator.loop.run_until_complete(validator.rolling_forward())
+        assert validator.metrics.counters["evaluations"] >= 2
+        assert len(validator.scheduler.inflight) <= 2
+    finally:
+        scheduler = validator.scheduler
+        validator.stop_rounds()
+        validator.config.neuron.rolling_inflight = 0
+
+    assert validator.scheduler is None
+    assert not scheduler.inflight and scheduler.prefetched is None
+
+
+def test_quorum_closes_the_round_and_scores_stragglers_later(
+    setup_validator, monkeypatch
+):
+    validator = setup_validator
+    rows = 4
+    challenge = Challenge(
+        polys=[["0"]] * rows, alpha="0", evals=["0"] * rows, timeout=10.0
+    )
+    monkeypatch.setattr(validator.config.neuron, "sample_size", rows)
+    monkeypatch.setattr(validator.config.neuron, "quorum", 0.5)
+
+    async def dendrite(synapse, deserialize, timeout, axons):
+        # Half of the miners are slow.
+        process_time = 0.01 if synapse.index % 2 == 0 else 0.2
+        await asyncio.sleep(process_time)
+        response = synapse.copy()
+        response.commitment, response.proof = "commitment", "proof"
+        response.dendrite = bt.TerminalInfo(process_time=process_time)
+        return [response]
+
+    applied = []
+    monkeypatch.setattr(validator, "dendrite", dendrite)
+    monkeypatch.setattr(
+        validator, "score", lambda challenge, responses: np.ones(len(responses))
+    )
+    monkeypatch.setattr(
+        validator, "apply_round", lambda dispatched, rewards: applied.append(dispatched)
+    )
+
+    uids, responses = validator.loop.run_until_complete(validator.dispatch(challenge))
+    assert len(uids) == len(responses) == rows // 2
+    assert all(response.index % 2 == 0 for response in responses)
+    assert len(validator.stragglers) == rows // 2
+    stragglers = set(validator.stragglers.values())
+
+    async def settle():
+        while validator.stragglers:
+            await asyncio.sleep(0.01)
+
+    validator.loop.run_until_complete(settle())
+    assert {int(dispatched[0][0]) for dispatched in applied} == stragglers
+    assert validator.metrics.counters["late_responses"] == rows // 2
+
+
+def test_stragglers_are_cancelled_on_shutdown(setup_validator):
+    validator = setup_validator
+    challenge = Challenge(polys=[["0"]], alpha="0", evals=["0"], timeout=10.0)
+    query = asyncio.ensure_future(asyncio.sleep(60), loop=validator.loop)
+    validator.track_straggler(challenge, 1, "hotkey", query)
+    assert len(validator.stragglers) == 1
+
+    validator.stop_rounds()
+
+    assert not validator.stragglers
+    assert query.cancelled()
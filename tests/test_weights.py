@@ -0,0 +1,116 @@
+# The MIT License (MIT)
+# Copyright © 2024 Apollo
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+import threading
+import time
+
+import bittensor as bt
+
+from base import weights
+from base.weights import WeightSubmitter, own_connection
+
+
+def wait_until(condition, timeout=2.0):
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+def test_superseded_weights_are_coalesced():
+    release = threading.Event()
+    submitted = []
+
+    def set_weights(snapshot):
+        submitted.append(snapshot)
+        release.wait(2.0)
+        return True, ""
+
+    submitter = WeightSubmitter(set_weights)
+    submitter.start()
+    submitter.submit(1)
+    wait_until(lambda: submitted == [1])
+
+    # Submissions while the chain call is in flight collapse into the newest.
+    for snapshot in (2, 3, 4):
+        submitter.submit(snapshot)
+    release.set()
+    wait_until(submitter.idle)
+    submitter.stop()
+
+    assert submitted == [1, 4]
+    assert submitter.metrics.counters["weights_superseded"] == 2
+    assert submitter.metrics.counters["weights_set"] == 2
+
+
+def test_failed_submission_is_retried():
+    outcomes = [(False, "pool full"), Exception("connection reset"), (True, "")]
+    attempts = []
+
+    def set_weights(snapshot):
+        attempts.append(snapshot)
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    submitter = WeightSubmitter(set_weights, retries=3, backoff=0.01)
+    submitter.start()
+    submitter.submit("weights")
+    wait_until(lambda: len(attempts) == 3 and submitter.idle())
+    submitter.stop()
+
+    assert submitter.metrics.counters["weights_failed"] == 2
+    assert submitter.metrics.counters["weights_set"] == 1
+    assert (
+        submitter.metrics.snapshot()["latencies"]["set_weights_latency_s"]["count"] == 3
+    )
+
+
+def test_retry_is_dropped_for_newer_weights():
+    attempts = []
+
+    def set_weights(snapshot):
+        attempts.append(snapshot)
+        return snapshot == "new", ""
+
+    submitter = WeightSubmitter(set_weights, retries=3, backoff=10.0)
+    submitter.start()
+    submitter.submit("old")
+    wait_until(lambda: attempts == ["old"])
+    submitter.submit("new")
+    wait_until(lambda: attempts == ["old", "new"] and submitter.idle())
+    submitter.stop()
+
+    assert submitter.metrics.counters["weights_set"] == 1
+
+
+def test_submitter_gets_its_own_connection(monkeypatch):
+    # The mock chain is in-process and has no websocket to share.
+    mock = bt.MockSubtensor()
+    assert own_connection(mock) is mock
+
+    class Connection(bt.subtensor):
+        def __init__(self, network: str):
+            self.chain_endpoint = network
+
+    monkeypatch.setattr(weights.bt, "subtensor", Connection)
+    shared = Connection("ws://127.0.0.1:9946")
+
+    connection = own_connection(shared)
+    assert connection is not shared
+    assert connection.chain_endpoint == shared.chain_endpoint
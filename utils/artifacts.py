@@ -0,0 +1,314 @@
+# The MIT License (MIT)
+# Copyright © 2024 Apollo
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+import bz2
+import glob
+import gzip
+import hashlib
+import json
+import lzma
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import bittensor as bt
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+MiB = 1024 * 1024
+INDEX_VERSION = 1
+
+# Openers for the container formats setup/precompute files can be shipped in.
+OPENERS = {
+    ".gz": gzip.open,
+    ".bz2": bz2.open,
+    ".xz": lzma.open,
+}
+if zstandard is not None:
+    OPENERS[".zst"] = zstandard.open
+
+
+def workers_count(workers: int = 0) -> int:
+    return workers or os.cpu_count() or 1
+
+
+def index_path(path: str) -> str:
+    return f"{path}.index.json"
+
+
+def combine(chunks: List[str]) -> str:
+    """The digest of a file, computed over the digests of its chunks."""
+    return hashlib.sha256("".join(chunks).encode()).hexdigest()
+
+
+def chunk_digests(path: str, chunk_size: int = 64 * MiB, workers: int = 0) -> List[str]:
+    """
+    Hashes the chunks of a file in parallel. hashlib releases the GIL while
+    hashing, so threads reading with `os.pread` use all cores.
+    """
+    size = os.path.getsize(path)
+    fd = os.open(path, os.O_RDONLY)
+    try:
+
+        def digest(offset: int) -> str:
+            return hashlib.sha256(os.pread(fd, chunk_size, offset)).hexdigest()
+
+        with ThreadPoolExecutor(max_workers=workers_count(workers)) as executor:
+            return list(executor.map(digest, range(0, size, chunk_size)))
+    finally:
+        os.close(fd)
+
+
+def build_index(
+    path: str,
+    scale: int,
+    machines_scale: int,
+    chunk_size: int = 64 * MiB,
+    workers: int = 0,
+    chunks: Optional[List[str]] = None,
+) -> Dict:
+    chunks = chunks if chunks is not None else chunk_digests(path, chunk_size, workers)
+    return {
+        "version": INDEX_VERSION,
+        "scale": scale,
+        "machines_scale": machines_scale,
+        "size": os.path.getsize(path),
+        "mtime_ns": os.stat(path).st_mtime_ns,
+        "chunk_size": chunk_size,
+        "chunks": chunks,
+        "digest": combine(chunks),
+    }
+
+
+def load_index(path: str) -> Optional[Dict]:
+    try:
+        with open(index_path(path)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def write_index(path: str, index: Dict):
+    with open(index_path(path), "w") as f:
+        json.dump(index, f)
+
+
+def verify(path: str, index: Dict, workers: int = 0):
+    """
+    Checks a file against its index.
+
+    Raises:
+        Exception: If the size or any chunk of the file does not match the index.
+    """
+    size = os.path.getsize(path)
+    if size != index["size"]:
+        raise Exception(
+            f"{path} is {size} bytes, its index expects {index['size']} bytes."
+        )
+    chunks = chunk_digests(path, index["chunk_size"], workers)
+    bad = [i for i, (a, b) in enumerate(zip(chunks, index["chunks"])) if a != b]
+    if bad:
+        raise Exception(
+            f"{path} does not match its index: {len(bad)} of {len(chunks)} chunks differ, "
+            f"starting at byte {bad[0] * index['chunk_size']}."
+        )
+
+
+def ensure_verified(
+    path: str,
+    scale: int,
+    machines_scale: int,
+    chunk_size: int = 64 * MiB,
+    workers: int = 0,
+    index_new: bool = False,
+    full: bool = False,
+):
+    """
+    Verifies a file against its index. A file whose size and modification time
+    match the index was verified before and is not hashed again, unless `full`.
+    Files without an index are refused, unless `index_new`, which indexes them.
+
+    Raises:
+        Exception: If the file has no index, was indexed for a different scale,
+            or does not match its index.
+    """
+    index = load_index(path)
+    if index is None:
+        if not index_new:
+            raise Exception(
+                f"{path} has no index at {index_path(path)}. Use --artifacts.index_new "
+                "to index a file you generated yourself."
+            )
+        bt.logging.info(f"Indexing {path}")
+        write_index(path, build_index(path, scale, machines_scale, chunk_size, workers))
+        return
+
+    if (index["scale"], index["machines_scale"]) != (scale, machines_scale):
+        raise Exception(
+            f"{path} was indexed for scale {index['scale']} with machines scale "
+            f"{index['machines_scale']}, expected {scale} with {machines_scale}."
+        )
+    stat = os.stat(path)
+    if not full and (stat.st_size, stat.st_mtime_ns) == (
+        index["size"],
+        index.get("mtime_ns"),
+    ):
+        bt.logging.info(f"{path} is unchanged since it was verified")
+        return
+
+    verify(path, index, workers)
+    bt.logging.info(f"Verified {path} ({len(index['chunks'])} chunks)")
+    if index.get("mtime_ns") != stat.st_mtime_ns:
+        # Shipped indexes don't know the local modification time, later starts do.
+        try:
+            write_index(path, {**index, "mtime_ns": stat.st_mtime_ns})
+        except OSError as e:
+            bt.logging.warning(f"Could not update the index of {path}: {e}")
+
+
+def decompress(
+    source: str,
+    target: str,
+    scale: int,
+    machines_scale: int,
+    chunk_size: int = 64 * MiB,
+) -> Dict:
+    """
+    Decompresses `source` to `target`, hashing the output as it is written,
+    and returns the index of `target`. The output is written to a temporary file
+    first so an interrupted conversion never leaves a partial artifact behind.
+    """
+    opener = OPENERS[os.path.splitext(source)[1]]
+    partial = f"{target}.partial"
+    chunks = []
+    with opener(source, "rb") as src, open(partial, "wb") as dst:
+        while True:
+            chunk = src.read(chunk_size)
+            if not chunk:
+                break
+            dst.write(chunk)
+            chunks.append(hashlib.sha256(chunk).hexdigest())
+    os.replace(partial, target)
+    return build_index(target, scale, machines_scale, chunk_size, chunks=chunks)
+
+
+class ArtifactCache:
+    """
+    Directory of decompressed artifacts keyed by (kind, scale, machines_scale,
+    digest of the compressed source). Only the newest entry for a given kind
+    and scale is kept, so disk usage stays bounded when artifacts are updated.
+    """
+
+    def __init__(self, root: str):
+        self.root = os.path.expanduser(root)
+        os.makedirs(self.root, exist_ok=True)
+
+    def key(self, kind: str, scale: int, machines_scale: int, digest: str) -> str:
+        return f"{kind}_{scale}_{machines_scale}_{digest[:16]}"
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.root, key, "artifact")
+
+    def lookup(self, key: str) -> Optional[str]:
+        path = self.path(key)
+        if os.path.exists(path) and load_index(path) is not None:
+            return path
+        return None
+
+    def prune(self, kind: str, scale: int, machines_scale: int, keep: str):
+        for entry in glob.glob(
+            os.path.join(self.root, f"{kind}_{scale}_{machines_scale}_*")
+        ):
+            if os.path.basename(entry) != keep:
+                bt.logging.info(f"Removing stale artifact {entry}")
+                shutil.rmtree(entry, ignore_errors=True)
+
+    def convert(
+        self,
+        kind: str,
+        source: str,
+        scale: int,
+        machines_scale: int,
+        chunk_size: int = 64 * MiB,
+        workers: int = 0,
+    ) -> Tuple[str, bool]:
+        """
+        Returns the path of the decompressed `source`, decompressing it if it is
+        not cached yet, and whether the cached copy was reused.
+        """
+        digest = combine(chunk_digests(source, chunk_size, workers))
+        key = self.key(kind, scale, machines_scale, digest)
+        path = self.lookup(key)
+        if path is not None:
+            return path, True
+
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        bt.logging.info(f"Decompressing {source} to {path}")
+        write_index(path, decompress(source, path, scale, machines_scale, chunk_size))
+        self.prune(kind, scale, machines_scale, keep=key)
+        return path, False
+
+
+def is_compressed(path: str) -> bool:
+    return os.path.splitext(path)[1] in OPENERS
+
+
+def prepare(config: "bt.Config") -> Tuple[str, str]:
+    """
+    Resolves the setup and precompute files the prover should load: compressed
+    files are decompressed into the artifact cache once, and every file is
+    checked against its chunk index before the prover is launched.
+
+    Returns:
+        Tuple[str, str]: The setup and precompute paths to pass to the prover.
+
+    Raises:
+        Exception: If an artifact does not match its index.
+    """
+    chunk_size = config.artifacts.chunk_size * MiB
+    workers = workers_count(config.artifacts.workers)
+    cache = ArtifactCache(config.artifacts.cache_dir)
+
+    def resolve(kind: str, path: str) -> str:
+        if is_compressed(path):
+            path, cached = cache.convert(
+                kind, path, config.scale, config.machines_scale, chunk_size, workers
+            )
+            if not cached or config.artifacts.no_verify:
+                return path
+        if not config.artifacts.no_verify:
+            ensure_verified(
+                path,
+                config.scale,
+                config.machines_scale,
+                chunk_size,
+                workers,
+                index_new=config.artifacts.index_new,
+                full=config.artifacts.full_verify,
+            )
+        return path
+
+    # The two artifacts are independent, so they are converted and verified concurrently.
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        setup = executor.submit(resolve, "setup", config.setup_path)
+        precompute = executor.submit(resolve, "precompute", config.precompute_path)
+        return setup.result(), precompute.result()
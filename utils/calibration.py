@@ -0,0 +1,109 @@
+# The MIT License (MIT)
+# Copyright © 2024 Apollo
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+import bittensor as bt
+
+
+def _check(response, what: str):
+    if response.status_code != 200:
+        bt.logging.error(f"RPC request failed with status: {response.status_code}")
+        raise Exception(f"Failed to {what} during calibration.")
+    return response.json()
+
+
+def calibrate(
+    client,
+    levels: List[int] = None,
+    cycles: int = 4,
+    deadline: float = 30.0,
+    efficiency: float = 0.9,
+) -> Dict:
+    """
+    Measures the commit/open latency and throughput of a running prover at increasing
+    concurrency levels, using a synthetic challenge at the prover's configured scale.
+
+    Args:
+        client (fourier.Client): Client of a started prover.
+        levels (List[int], optional): Concurrency levels to measure. Defaults to powers of
+            two up to the number of cores.
+        cycles (int): Commit/open cycles per worker and level.
+        deadline (float): The time a request may take end to end, used to size the queue.
+        efficiency (float): The fraction of peak throughput at which to stop adding workers.
+
+    Returns:
+        dict: The measurements per level, the chosen number of proof `workers`, the
+        `queue_limit` of requests that can wait for a worker and still meet the deadline,
+        and the `proofs_per_sec` and `latency_s` at that number of workers.
+    """
+    if levels is None:
+        cores = os.cpu_count() or 1
+        levels = [2**k for k in range(cores.bit_length()) if 2**k <= cores]
+
+    with client.random_poly() as response:
+        rows = _check(response, "generate a polynomial").get("poly")
+    with client.random_point() as response:
+        alpha = _check(response, "generate a point").get("point")
+
+    def cycle(k: int) -> float:
+        i = k % len(rows)
+        before = time.perf_counter()
+        with client.worker_commit(i, rows[i]) as response:
+            _check(response, "commit")
+        with client.worker_open(i, rows[i], alpha) as response:
+            _check(response, "open")
+        return time.perf_counter() - before
+
+    # Warm up the prover before measuring.
+    cycle(0)
+
+    measurements = {}
+    for level in levels:
+        with ThreadPoolExecutor(max_workers=level) as executor:
+            before = time.perf_counter()
+            latencies = list(executor.map(cycle, range(level * cycles)))
+            wall = time.perf_counter() - before
+        measurements[level] = {
+            "latency_s": sum(latencies) / len(latencies),
+            "proofs_per_sec": len(latencies) / wall,
+        }
+        bt.logging.info(
+            f"Calibration at concurrency {level}: "
+            f"{measurements[level]['proofs_per_sec']:.2f} proofs/s, "
+            f"{measurements[level]['latency_s']:.3f}s latency"
+        )
+
+    peak = max(m["proofs_per_sec"] for m in measurements.values())
+    workers = min(
+        level
+        for level, m in measurements.items()
+        if m["proofs_per_sec"] >= efficiency * peak
+    )
+    chosen = measurements[workers]
+    # Requests beyond what the workers can clear before the deadline would time out anyway.
+    queue_limit = max(0, int(deadline * chosen["proofs_per_sec"]) - workers)
+    return {
+        "levels": measurements,
+        "workers": workers,
+        "queue_limit": queue_limit,
+        "proofs_per_sec": chosen["proofs_per_sec"],
+        "latency_s": chosen["latency_s"],
+    }
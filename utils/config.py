@@ -79,6 +79,20 @@ def add_args(cls, parser):
         default=100,
     )
 
+    parser.add_argument(
+        "--neuron.background_sync",
+        action="store_true",
+        help="Check registration, refresh the metagraph and set weights on a background thread instead of between steps.",
+        default=False,
+    )
+
+    parser.add_argument(
+        "--neuron.sync_interval",
+        type=float,
+        help="Seconds between background syncs with the chain.",
+        default=24.0,
+    )
+
     parser.add_argument(
         "--mock",
         action="store_true",
@@ -149,6 +163,76 @@ def add_args(cls, parser):
         default="./precompute",
     )
 
+    parser.add_argument(
+        "--prover_stub",
+        action="store_true",
+        help="Use the pure-Python stand-in prover instead of the prover binary. For testing and benchmarking only.",
+        default=False,
+    )
+
+    parser.add_argument(
+        "--prover_stub_latency",
+        type=float,
+        help="Artificial latency in seconds added to every call to the stand-in prover.",
+        default=0.0,
+    )
+
+    parser.add_argument(
+        "--prover_attach",
+        action="store_true",
+        help="Attach to a prover daemon already running on the prover port (see neurons/prover.py) instead of starting one.",
+        default=False,
+    )
+
+    parser.add_argument(
+        "--prover_port",
+        type=int,
+        help="The port of the prover RPC server. Defaults to 1337 for miners and 1338 for validators.",
+        default=None,
+    )
+
+    parser.add_argument(
+        "--artifacts.cache_dir",
+        type=str,
+        help="The directory compressed setup and precompute files are decompressed into.",
+        default="~/.bittensor/artifacts",
+    )
+
+    parser.add_argument(
+        "--artifacts.chunk_size",
+        type=int,
+        help="The chunk size in MiB used to checksum setup and precompute files.",
+        default=64,
+    )
+
+    parser.add_argument(
+        "--artifacts.workers",
+        type=int,
+        help="The number of threads used to checksum setup and precompute files. 0 uses all cores.",
+        default=0,
+    )
+
+    parser.add_argument(
+        "--artifacts.index_new",
+        action="store_true",
+        help="Index setup and precompute files that have no checksum index yet, e.g. files generated locally, instead of refusing them.",
+        default=False,
+    )
+
+    parser.add_argument(
+        "--artifacts.full_verify",
+        action="store_true",
+        help="Hash the setup and precompute files on every start, even if their size and modification time match their checksum index.",
+        default=False,
+    )
+
+    parser.add_argument(
+        "--artifacts.no_verify",
+        action="store_true",
+        help="Skip verifying the setup and precompute files against their checksum index before starting the prover.",
+        default=False,
+    )
+
     parser.add_argument(
         "--scale",
         type=int,
@@ -163,6 +247,27 @@ def add_args(cls, parser):
         default=8,
     )
 
+    parser.add_argument(
+        "--neuron.profile",
+        action="store_true",
+        help="Profile the first forward calls after startup. Send SIGUSR1 to profile at runtime.",
+        default=False,
+    )
+
+    parser.add_argument(
+        "--neuron.profile_calls",
+        type=int,
+        help="The number of forward calls covered by a profiling window.",
+        default=10,
+    )
+
+    parser.add_argument(
+        "--neuron.profile_interval",
+        type=float,
+        help="The stack sampling interval of the profiler in seconds.",
+        default=0.005,
+    )
+
     parser.add_argument(
         "--debug",
         action="store_true",
@@ -195,6 +300,41 @@ def add_miner_args(cls, parser):
         default=False,
     )
 
+    parser.add_argument(
+        "--neuron.calibrate",
+        action="store_true",
+        help="Measure the prover at startup and size the proof workers and queue from the result.",
+        default=False,
+    )
+
+    parser.add_argument(
+        "--neuron.calibration_cycles",
+        type=int,
+        help="Commit/open cycles per worker for each concurrency level measured during calibration.",
+        default=4,
+    )
+
+    parser.add_argument(
+        "--neuron.calibration_deadline",
+        type=float,
+        help="The time in seconds a proof request may take end to end, used to size the proof queue.",
+        default=30.0,
+    )
+
+    parser.add_argument(
+        "--neuron.proof_workers",
+        type=int,
+        help="The number of proofs generated concurrently. 0 means no limit.",
+        default=0,
+    )
+
+    parser.add_argument(
+        "--neuron.proof_queue_limit",
+        type=int,
+        help="The number of requests allowed to wait for a proof worker before new requests are rejected. 0 means no limit.",
+        default=0,
+    )
+
     parser.add_argument(
         "--wandb.project_name",
         type=str,
@@ -223,8 +363,36 @@ def add_validator_args(cls, parser):
     parser.add_argument(
         "--neuron.timeout",
         type=float,
-        help="The timeout for each forward call in seconds.",
-        default=10,
+        help="The time in seconds miners get to answer a challenge. With --neuron.adaptive_timeout, the ceiling of the timeout.",
+        default=30,
+    )
+
+    parser.add_argument(
+        "--neuron.adaptive_timeout",
+        action="store_true",
+        help="Derive the query timeout from the recent latency of valid proofs, between --neuron.timeout_floor and --neuron.timeout.",
+        default=False,
+    )
+
+    parser.add_argument(
+        "--neuron.timeout_quantile",
+        type=float,
+        help="The percentile of recent proof latencies adaptive timeouts are based on.",
+        default=90,
+    )
+
+    parser.add_argument(
+        "--neuron.timeout_margin",
+        type=float,
+        help="The multiple of the latency percentile miners get with adaptive timeouts.",
+        default=2.0,
+    )
+
+    parser.add_argument(
+        "--neuron.timeout_floor",
+        type=float,
+        help="The shortest adaptive timeout in seconds.",
+        default=2.0,
     )
 
     parser.add_argument(
@@ -234,6 +402,34 @@ def add_validator_args(cls, parser):
         default=1,
     )
 
+    parser.add_argument(
+        "--neuron.max_inflight_rounds",
+        type=int,
+        help="The number of validation rounds in flight at once. Above 1, challenge generation, querying and verification of consecutive rounds overlap.",
+        default=1,
+    )
+
+    parser.add_argument(
+        "--neuron.rolling_inflight",
+        type=int,
+        help="The number of miner evaluations kept in flight by the rolling scheduler, which starts a new one whenever one completes. 0 runs synchronized rounds instead.",
+        default=0,
+    )
+
+    parser.add_argument(
+        "--neuron.batch_size",
+        type=int,
+        help="The number of challenge rows sent to each miner per query. Above 1, miners are scored on the throughput of the whole batch.",
+        default=1,
+    )
+
+    parser.add_argument(
+        "--neuron.aggregate_verification",
+        action="store_true",
+        help="Check all openings of a round with one random linear combination, verifying them one by one only if it fails.",
+        default=False,
+    )
+
     parser.add_argument(
         "--neuron.sample_size",
         type=int,
@@ -241,6 +437,48 @@ def add_validator_args(cls, parser):
         default=20,
     )
 
+    parser.add_argument(
+        "--neuron.quorum",
+        type=float,
+        help="The fraction of queried miners that have to answer before a round closes. Miners answering later are scored when their response lands.",
+        default=1.0,
+    )
+
+    parser.add_argument(
+        "--neuron.soft_deadline",
+        type=float,
+        help="The time in seconds after which a round closes even without a quorum. 0 waits for the quorum.",
+        default=0,
+    )
+
+    parser.add_argument(
+        "--neuron.capacity_grace",
+        type=int,
+        help="The number of consecutive rounds a miner that refuses requests because its proof queue is full keeps its score, instead of scoring zero like a failed proof.",
+        default=3,
+    )
+
+    parser.add_argument(
+        "--neuron.dendrite_pool_size",
+        type=int,
+        help="The maximum number of open connections to miners.",
+        default=256,
+    )
+
+    parser.add_argument(
+        "--neuron.dendrite_pool_per_axon",
+        type=int,
+        help="The maximum number of open connections to a single miner.",
+        default=8,
+    )
+
+    parser.add_argument(
+        "--neuron.dendrite_keepalive",
+        type=float,
+        help="Seconds an idle connection to a miner is kept open for reuse.",
+        default=60.0,
+    )
+
     parser.add_argument(
         "--neuron.disable_set_weights",
         action="store_true",
@@ -248,6 +486,27 @@ def add_validator_args(cls, parser):
         default=False,
     )
 
+    parser.add_argument(
+        "--neuron.async_set_weights",
+        action="store_true",
+        help="Submit weights from a background job instead of blocking the sync on the extrinsic.",
+        default=False,
+    )
+
+    parser.add_argument(
+        "--neuron.set_weights_retries",
+        type=int,
+        help="How often a failed asynchronous weight submission is retried.",
+        default=3,
+    )
+
+    parser.add_argument(
+        "--neuron.set_weights_backoff",
+        type=float,
+        help="Seconds before the first retry of a failed weight submission, doubled on every further retry.",
+        default=4.0,
+    )
+
     parser.add_argument(
         "--neuron.moving_average_alpha",
         type=float,
@@ -0,0 +1,140 @@
+# The MIT License (MIT)
+# Copyright © 2024 Apollo
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+import base64
+from typing import List, Optional, Tuple
+
+from utils.encoding import (
+    BASE_MODULUS as P,
+    COMPRESSION_FLAG,
+    INFINITY_FLAG,
+    POINT_BYTES,
+    SORT_FLAG,
+    decode,
+    is_point,
+)
+
+# Affine points on the BLS12-381 G1 curve y^2 = x^3 + 4, None is the point at infinity.
+Point = Optional[Tuple[int, int]]
+
+B = 4
+
+
+def lift_x(x: int, greatest: bool = False) -> Point:
+    """Returns the point with coordinate `x`, or raises if there is none."""
+    rhs = (pow(x, 3, P) + B) % P
+    # P = 3 mod 4, so a square root is a single exponentiation.
+    y = pow(rhs, (P + 1) // 4, P)
+    if y * y % P != rhs:
+        raise Exception(f"No point with x = {x:#x} on the curve.")
+    if (y > P - y) != greatest:
+        y = P - y
+    return x, y
+
+
+def decompress(value: str) -> Point:
+    """
+    Decodes a compressed G1 point, raising if it is malformed or not on the curve.
+    Subgroup membership is not checked.
+    """
+    if not is_point(value):
+        raise Exception("Malformed G1 point.")
+    data = decode(value, POINT_BYTES)
+    if data[0] & INFINITY_FLAG:
+        return None
+    x = int.from_bytes(bytes([data[0] & 0x1F]) + data[1:], "big")
+    return lift_x(x, greatest=bool(data[0] & SORT_FLAG))
+
+
+def compress(point: Point) -> str:
+    if point is None:
+        data = bytearray(POINT_BYTES)
+        data[0] = COMPRESSION_FLAG | INFINITY_FLAG
+    else:
+        x, y = point
+        data = bytearray(x.to_bytes(POINT_BYTES, "big"))
+        data[0] |= COMPRESSION_FLAG | (SORT_FLAG if y > P - y else 0)
+    return base64.b64encode(bytes(data)).decode().rstrip("=")
+
+
+def add(a: Point, b: Point) -> Point:
+    if a is None:
+        return b
+    if b is None:
+        return a
+    (x1, y1), (x2, y2) = a, b
+    if x1 == x2:
+        if (y1 + y2) % P == 0:
+            return None
+        slope = 3 * x1 * x1 * pow(2 * y1, -1, P) % P
+    else:
+        slope = (y2 - y1) * pow(x2 - x1, -1, P) % P
+    x3 = (slope * slope - x1 - x2) % P
+    return x3, (slope * (x1 - x3) - y1) % P
+
+
+def _double(X: int, Y: int, Z: int) -> Tuple[int, int, int]:
+    if Z == 0 or Y == 0:
+        return 1, 1, 0
+    A, B = X * X % P, Y * Y % P
+    C = B * B % P
+    D = 2 * ((X + B) ** 2 - A - C) % P
+    E = 3 * A % P
+    X3 = (E * E - 2 * D) % P
+    return X3, (E * (D - X3) - 8 * C) % P, 2 * Y * Z % P
+
+
+def _add_affine(X: int, Y: int, Z: int, x: int, y: int) -> Tuple[int, int, int]:
+    """Adds the affine point (x, y) to a point in Jacobian coordinates."""
+    if Z == 0:
+        return x, y, 1
+    ZZ = Z * Z % P
+    U, S = x * ZZ % P, y * ZZ * Z % P
+    if U == X:
+        return _double(X, Y, Z) if S == Y else (1, 1, 0)
+    H, R = (U - X) % P, (S - Y) % P
+    HH = H * H % P
+    HHH, V = H * HH % P, X * HH % P
+    X3 = (R * R - HHH - 2 * V) % P
+    return X3, (R * (V - X3) - Y * HHH) % P, Z * H % P
+
+
+def multiply(point: Point, scalar: int) -> Point:
+    """
+    Multiplies `point` by a non-negative `scalar`, doubling and adding in Jacobian
+    coordinates so that only the final conversion needs an inversion.
+    """
+    if point is None or scalar == 0:
+        return None
+    x, y = point
+    X, Y, Z = 1, 1, 0
+    for bit in bin(scalar)[2:]:
+        X, Y, Z = _double(X, Y, Z)
+        if bit == "1":
+            X, Y, Z = _add_affine(X, Y, Z, x, y)
+    if Z == 0:
+        return None
+    inverse = pow(Z, -1, P)
+    return X * inverse**2 % P, Y * inverse**3 % P
+
+
+def aggregate(commitments: List[str]) -> str:
+    """Sums compressed G1 points, e.g. the row commitments of a bivariate polynomial."""
+    total = None
+    for commitment in commitments:
+        total = add(total, decompress(commitment))
+    return compress(total)
@@ -0,0 +1,71 @@
+# The MIT License (MIT)
+# Copyright © 2024 Apollo
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+import base64
+import binascii
+from typing import Optional
+
+# BLS12-381 scalar field and base field moduli.
+SCALAR_MODULUS = 0x73EDA753299D7D483339D80809A1D80553BDA402FFFE5BFEFFFFFFFF00000001
+BASE_MODULUS = 0x1A0111EA397FE69A4B1BA7B6434BACD764774B84F38512BF6730D2A0F6B0F6241EABFFFEB153FFFFB9FEFFFFFFFFAAAB
+
+SCALAR_BYTES = 32
+POINT_BYTES = 48
+
+# Flags in the top bits of a compressed G1 point.
+COMPRESSION_FLAG = 0x80
+INFINITY_FLAG = 0x40
+SORT_FLAG = 0x20
+
+
+def decode(value: str, size: int) -> Optional[bytes]:
+    """Decodes base64 `value`, padded or not, returning None unless it holds `size` bytes."""
+    if not isinstance(value, str) or len(value) > 4 * ((size + 2) // 3):
+        return None
+    try:
+        data = base64.b64decode(value + "=" * (-len(value) % 4), validate=True)
+    except (binascii.Error, ValueError):
+        return None
+    return data if len(data) == size else None
+
+
+def is_scalar(value: str) -> bool:
+    """Checks that `value` encodes a big-endian element of the scalar field."""
+    data = decode(value, SCALAR_BYTES)
+    return data is not None and int.from_bytes(data, "big") < SCALAR_MODULUS
+
+
+def decode_scalar(value: str) -> int:
+    """Decodes a scalar field element, raising if `value` is not one."""
+    if not is_scalar(value):
+        raise Exception("Malformed scalar.")
+    return int.from_bytes(decode(value, SCALAR_BYTES), "big")
+
+
+def is_point(value: str) -> bool:
+    """
+    Checks that `value` is a well-formed compressed G1 point: the compression flag
+    is set, the point at infinity carries no coordinate and x is below the modulus.
+    Whether x is on the curve is left to the prover.
+    """
+    data = decode(value, POINT_BYTES)
+    if data is None or not data[0] & COMPRESSION_FLAG:
+        return False
+    x = int.from_bytes(bytes([data[0] & 0x1F]) + data[1:], "big")
+    if data[0] & INFINITY_FLAG:
+        return x == 0 and not data[0] & SORT_FLAG
+    return x < BASE_MODULUS
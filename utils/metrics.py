@@ -0,0 +1,80 @@
+# The MIT License (MIT)
+# Copyright © 2024 Apollo
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+import json
+import threading
+from collections import defaultdict, deque
+from typing import Dict
+
+import numpy as np
+
+
+class Metrics:
+    """
+    Thread-safe in-process metrics: gauges, counters and latency windows.
+
+    A snapshot of all metrics is written next to the neuron state, see `dump`.
+    """
+
+    def __init__(self, window: int = 1024):
+        self.lock = threading.Lock()
+        self.gauges: Dict[str, float] = {}
+        self.counters: Dict[str, int] = defaultdict(int)
+        self.latencies: Dict[str, deque] = defaultdict(lambda: deque(maxlen=window))
+
+    def set(self, name: str, value: float):
+        with self.lock:
+            self.gauges[name] = value
+
+    def inc(self, name: str, value: int = 1):
+        with self.lock:
+            self.counters[name] += value
+
+    def observe(self, name: str, seconds: float):
+        with self.lock:
+            self.latencies[name].append(seconds)
+
+    def percentile(self, name: str, q: float, default: float = None) -> float:
+        """Returns the q-th percentile of the most recent observations of `name`."""
+        with self.lock:
+            samples = list(self.latencies.get(name, ()))
+        if not samples:
+            return default
+        return float(np.percentile(samples, q))
+
+    def snapshot(self) -> Dict:
+        with self.lock:
+            latencies = {
+                name: list(samples) for name, samples in self.latencies.items()
+            }
+            snapshot = {"gauges": dict(self.gauges), "counters": dict(self.counters)}
+        snapshot["latencies"] = {}
+        for name, samples in latencies.items():
+            if not samples:
+                continue
+            p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+            snapshot["latencies"][name] = {
+                "count": len(samples),
+                "p50_s": float(p50),
+                "p95_s": float(p95),
+                "p99_s": float(p99),
+            }
+        return snapshot
+
+    def dump(self, path: str):
+        with open(path, "w") as f:
+            json.dump(self.snapshot(), f, indent=2)
@@ -0,0 +1,188 @@
+# The MIT License (MIT)
+# Copyright © 2024 Apollo
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+import os
+import signal
+import sys
+import threading
+import time
+import weakref
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+import bittensor as bt
+
+# The signal handler is process wide, so it is installed once per signal and arms
+# every profiler registered for it. Profilers drop out when their neuron is gone.
+_handlers_lock = threading.Lock()
+_registered: Dict[int, weakref.WeakSet] = {}
+
+
+def _arm_registered(signum: int, *_):
+    for profiler in list(_registered.get(signum, ())):
+        profiler.signalled += 1
+
+
+class StackSampler:
+    """
+    Periodically samples the call stacks of every thread in the process and
+    aggregates them as collapsed stacks (`frame;frame;frame count`), the format
+    consumed by flamegraph.pl, inferno and speedscope.
+    """
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="stack-sampler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        own_ident = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own_ident:
+                    continue
+                self.stacks[self._collapse(names.get(ident, ident), frame)] += 1
+            self.samples += 1
+
+    @staticmethod
+    def _collapse(thread_name, frame) -> str:
+        frames = []
+        while frame is not None:
+            code = frame.f_code
+            frames.append(
+                f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+            )
+            frame = frame.f_back
+        frames.append(f"thread:{thread_name}")
+        return ";".join(reversed(frames))
+
+    def write(self, path: str):
+        with open(path, "w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class Profiler:
+    """
+    Bounded sampling profiler window around a unit of work.
+
+    Once armed, the window opens on the next tracked call and closes after
+    `calls` tracked calls have completed, at which point the collapsed stacks
+    are written to `output_dir`. A window can be armed from the config at
+    startup or at runtime by sending the process SIGUSR1.
+    """
+
+    def __init__(
+        self,
+        output_dir: str,
+        name: str,
+        calls: int = 10,
+        interval: float = 0.005,
+    ):
+        self.output_dir = output_dir
+        self.name = name
+        self.calls = calls
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.armed = 0
+        self.remaining = 0
+        self.sampler: Optional[StackSampler] = None
+        # Signals received and handled. The handler runs on the main thread, possibly
+        # while `track()` holds the lock there, so it only counts the signal and the
+        # next tracked call arms the window.
+        self.signalled = 0
+        self.handled = 0
+
+    def arm(self, calls: Optional[int] = None):
+        """Profiles the next `calls` tracked calls."""
+        with self.lock:
+            self.armed = calls or self.calls
+        bt.logging.info(f"Profiler armed for {self.armed} {self.name} calls.")
+
+    def install_signal_handler(self, signum: Optional[int] = None):
+        """
+        Arms a profiling window whenever the process receives `signum`. The handler
+        is shared, so one signal arms every profiler in the process.
+        """
+        signum = signum or getattr(signal, "SIGUSR1", None)
+        if signum is None:
+            return
+        with _handlers_lock:
+            if signum not in _registered:
+                try:
+                    signal.signal(signum, _arm_registered)
+                except ValueError:
+                    # Signal handlers can only be installed from the main thread.
+                    bt.logging.debug("Not installing profiler signal handler.")
+                    return
+                _registered[signum] = weakref.WeakSet()
+            _registered[signum].add(self)
+
+    @contextmanager
+    def track(self):
+        """Wraps one unit of work, e.g. a forward pass."""
+        with self.lock:
+            if self.handled != self.signalled:
+                self.handled = self.signalled
+                self.armed = self.armed or self.calls
+                bt.logging.info(
+                    f"Profiler armed for {self.armed} {self.name} calls by signal."
+                )
+            if self.sampler is None and self.armed:
+                self.remaining = self.armed
+                self.armed = 0
+                self.sampler = StackSampler(self.interval)
+                self.sampler.start()
+            sampler = self.sampler
+        try:
+            yield
+        finally:
+            if sampler is not None:
+                self._complete(sampler)
+
+    def _complete(self, sampler: StackSampler):
+        with self.lock:
+            if self.sampler is not sampler:
+                return
+            self.remaining -= 1
+            if self.remaining > 0:
+                return
+            self.sampler = None
+
+        sampler.stop()
+        path = os.path.join(
+            self.output_dir, f"profile-{self.name}-{int(time.time())}.folded"
+        )
+        sampler.write(path)
+        bt.logging.info(f"Wrote {sampler.samples} profile samples to {path}")
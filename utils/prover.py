@@ -0,0 +1,177 @@
+# The MIT License (MIT)
+# Copyright © 2024 Apollo
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+import base64
+import json
+import os
+from typing import Dict, Optional
+
+import bittensor as bt
+from fourier import Client
+
+from utils import artifacts
+from utils.stub_prover import StubClient
+
+# Field elements are 32 byte big-endian integers, base64 encoded without padding.
+ZERO = base64.b64encode(bytes(32)).decode().rstrip("=")
+ONE = base64.b64encode(bytes(31) + b"\x01").decode().rstrip("=")
+
+
+def make_client(
+    config: "bt.Config",
+    port: int,
+    setup_path: Optional[str] = None,
+    precompute_path: Optional[str] = None,
+) -> Client:
+    """
+    Builds a client for the prover configured in `config`, without starting it.
+    `setup_path` and `precompute_path` override the files from the config.
+    """
+    if config.prover_stub:
+        return StubClient(port=port, latency=config.prover_stub_latency)
+    return Client(
+        port=port,
+        bin=config.prover_path,
+        uncompressed=config.uncompressed,
+        setup_path=setup_path or config.setup_path,
+        precompute_path=precompute_path or config.precompute_path,
+    )
+
+
+def launch(config: "bt.Config", port: int) -> Client:
+    """
+    Starts a prover on `port` and returns a client for it. The setup and precompute
+    files are decompressed and verified by the artifact manager first.
+    """
+    if config.prover_stub:
+        client = make_client(config, port)
+    else:
+        setup_path, precompute_path = artifacts.prepare(config)
+        client = make_client(config, port, setup_path, precompute_path)
+    client.start(scale=config.scale, machines_scale=config.machines_scale)
+    return client
+
+
+def record_path(config: "bt.Config", port: int) -> str:
+    """The file describing the prover daemon serving `config.setup_path` on `port`."""
+    return f"{os.path.abspath(config.setup_path)}.prover-{port}.json"
+
+
+def fingerprint(client: Client, scale: int, machines_scale: int) -> str:
+    """
+    Commits to a fixed polynomial. The commitment only depends on the setup the
+    prover has loaded, so it identifies that setup.
+    """
+    poly = [ONE] + [ZERO] * (2 ** (scale - machines_scale) - 1)
+    with client.worker_commit(0, poly) as response:
+        if response.status_code != 200:
+            raise Exception(f"Failed to fingerprint the prover: {response.status_code}")
+        return response.json().get("commitment")
+
+
+class ProverMismatch(Exception):
+    """A running prover was started with a different scale or setup."""
+
+
+def check_scale(client: Client, scale: int, machines_scale: int):
+    """
+    Checks that a running prover was started with `scale` and `machines_scale`.
+
+    Raises:
+        ProverMismatch: If the prover runs a different scale.
+        Exception: If the prover is unhealthy.
+    """
+    with client.random_poly() as response:
+        if response.status_code != 200:
+            raise Exception(f"Prover is unhealthy: {response.status_code}")
+        poly = response.json().get("poly")
+    if len(poly) != 2 ** machines_scale or len(poly[0]) != 2 ** (
+        scale - machines_scale
+    ):
+        raise ProverMismatch(
+            f"Prover runs a {len(poly)}x{len(poly[0])} setup, expected scale "
+            f"{scale} with machines scale {machines_scale}."
+        )
+
+
+def write_record(config: "bt.Config", client: Client, port: int):
+    """Records the setup of a prover daemon so neurons can attach to it."""
+    record = {
+        "port": port,
+        "pid": os.getpid(),
+        "scale": config.scale,
+        "machines_scale": config.machines_scale,
+        "setup_path": os.path.abspath(config.setup_path),
+        "precompute_path": os.path.abspath(config.precompute_path),
+        "fingerprint": fingerprint(client, config.scale, config.machines_scale),
+    }
+    with open(record_path(config, port), "w") as f:
+        json.dump(record, f, indent=2)
+
+
+def load_record(config: "bt.Config", port: int) -> Optional[Dict]:
+    try:
+        with open(record_path(config, port)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def attach(config: "bt.Config", port: int) -> Optional[Client]:
+    """
+    Attaches to a prover daemon already serving on `port`.
+
+    Returns:
+        Client: A client for the daemon, or None if no healthy daemon is running.
+
+    Raises:
+        ProverMismatch: If a daemon is running with a different scale or setup.
+    """
+    record = load_record(config, port)
+    if record is None:
+        bt.logging.warning(f"No prover daemon recorded at {record_path(config, port)}")
+        return None
+
+    # A record left behind by a daemon that is gone is stale, not a mismatch.
+    client = make_client(config, port)
+    try:
+        check_scale(client, config.scale, config.machines_scale)
+        live = fingerprint(client, config.scale, config.machines_scale)
+    except ProverMismatch:
+        raise
+    except Exception as e:
+        bt.logging.warning(f"Prover daemon on port {port} is not reachable: {e}")
+        return None
+
+    expected = {
+        "scale": config.scale,
+        "machines_scale": config.machines_scale,
+        "setup_path": os.path.abspath(config.setup_path),
+        "precompute_path": os.path.abspath(config.precompute_path),
+    }
+    for key, value in expected.items():
+        if record.get(key) != value:
+            raise ProverMismatch(
+                f"Prover daemon on port {port} runs with {key}={record.get(key)}, expected {value}."
+            )
+
+    if live != record["fingerprint"]:
+        raise ProverMismatch(
+            f"Prover on port {port} has a different setup loaded than recorded."
+        )
+    bt.logging.info(f"Attached to prover daemon on port {port} (pid {record['pid']})")
+    return client
@@ -0,0 +1,295 @@
+# The MIT License (MIT)
+# Copyright © 2024 Apollo
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+import argparse
+import base64
+import hashlib
+import itertools
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Union
+
+import bittensor as bt
+from fourier import Client
+
+from utils import curve
+
+SCALAR_BYTES = 32
+POINT_BYTES = 48
+
+
+def _digest(size: int, *parts) -> bytes:
+    h = hashlib.shake_256()
+    for part in parts:
+        h.update(str(part).encode())
+        h.update(b"\x00")
+    return h.digest(size)
+
+
+def _encode(data: bytes) -> str:
+    return base64.b64encode(data).decode().rstrip("=")
+
+
+def scalar(*parts) -> str:
+    """A deterministic field element, encoded like the prover encodes scalars."""
+    data = bytearray(_digest(SCALAR_BYTES, "scalar", *parts))
+    # Keep the value below the scalar field modulus.
+    data[0] &= 0x3F
+    return _encode(bytes(data))
+
+
+def point(*parts) -> str:
+    """
+    A deterministic stand-in for a compressed G1 point. It lies on the curve, so
+    stub commitments can be aggregated like real ones.
+    """
+    for attempt in itertools.count():
+        data = _digest(POINT_BYTES, "point", attempt, *parts)
+        x = int.from_bytes(data, "big") % curve.P
+        try:
+            return curve.compress(curve.lift_x(x, greatest=bool(data[-1] & 1)))
+        except Exception:
+            continue
+
+
+class StubProver:
+    """
+    Pure-Python stand-in for the Fourier prover RPC server.
+
+    Serves the methods used by the neurons (random_poly, random_point, fft, eval,
+    worker_commit, worker_open, worker_verify) with deterministic outputs derived
+    from `seed`. The outputs are hashes rather than real KZG objects, but they are
+    self-consistent: an opening produced by `worker_open` verifies against the
+    commitment from `worker_commit` and the evaluation obtained through
+    `fft(inverse=True)` and `eval`, and any modification fails verification.
+
+    Methods can be called as `POST /<method>` with the parameters as JSON body,
+    or as `POST /` with a `{"method": ..., "params": ...}` body.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 1337,
+        scale: int = 6,
+        machines_scale: int = 2,
+        latency: Union[float, Dict[str, float]] = 0.0,
+        seed: int = 0,
+    ):
+        self.host = host
+        self.port = port
+        self.scale = scale
+        self.machines_scale = machines_scale
+        self.latency = latency
+        self.seed = seed
+        self.counter = 0
+        self.counter_lock = threading.Lock()
+        self.server: Optional[ThreadingHTTPServer] = None
+        self.thread: Optional[threading.Thread] = None
+
+    def _next(self) -> int:
+        with self.counter_lock:
+            self.counter += 1
+            return self.counter
+
+    def _delay(self, method: str):
+        latency = self.latency
+        if isinstance(latency, dict):
+            latency = latency.get(method, 0.0)
+        if latency > 0:
+            time.sleep(latency)
+
+    def ping(self) -> Dict:
+        return {
+            "status": "ok",
+            "scale": self.scale,
+            "machines_scale": self.machines_scale,
+        }
+
+    def random_poly(self) -> Dict:
+        n = self._next()
+        rows = 2**self.machines_scale
+        cols = 2 ** (self.scale - self.machines_scale)
+        return {
+            "poly": [
+                [scalar(self.seed, "poly", n, row, col) for col in range(cols)]
+                for row in range(rows)
+            ]
+        }
+
+    def random_point(self) -> Dict:
+        return {"point": scalar(self.seed, "point", self._next())}
+
+    def fft(self, poly: List[str], left: bool = True, inverse: bool = False) -> Dict:
+        # Any bijection works as a stand-in, as long as the inverse undoes it.
+        return {"poly": list(reversed(poly))}
+
+    def eval(self, poly: List[str], x: str) -> Dict:
+        return {"y": scalar("eval", x, *poly)}
+
+    def worker_commit(self, i: int, poly: List[str]) -> Dict:
+        return {"commitment": point("commit", i, *poly)}
+
+    def worker_open(self, i: int, poly: List[str], x: str) -> Dict:
+        commitment = point("commit", i, *poly)
+        # `poly` is in evaluation form, its coefficients are the inverse transform.
+        eval = self.eval(self.fft(poly, inverse=True)["poly"], x)["y"]
+        return {"eval": eval, "proof": point("proof", i, commitment, x, eval)}
+
+    def worker_verify(
+        self, i: int, proof: str, alpha: str, eval: str, commitment: str
+    ) -> Dict:
+        return {"valid": proof == point("proof", i, commitment, alpha, eval)}
+
+    METHODS = (
+        "ping",
+        "random_poly",
+        "random_point",
+        "fft",
+        "eval",
+        "worker_commit",
+        "worker_open",
+        "worker_verify",
+    )
+
+    # Alternative parameter names accepted by some methods.
+    ALIASES = {
+        "worker_open": {"alpha": "x", "point": "x"},
+        "worker_verify": {"x": "alpha", "y": "eval"},
+    }
+
+    def handle(self, method: str, params: Union[Dict, List]) -> Dict:
+        """Dispatches an RPC call, raising KeyError for unknown methods."""
+        if method not in self.METHODS:
+            raise KeyError(method)
+        self._delay(method)
+        if isinstance(params, list):
+            return getattr(self, method)(*params)
+        aliases = self.ALIASES.get(method, {})
+        params = {aliases.get(key, key): value for key, value in params.items()}
+        return getattr(self, method)(**params)
+
+    def start(self):
+        prover = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _respond(self, status: int, body: Dict):
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _dispatch(self, body: Dict):
+                method = self.path.strip("/")
+                params = body
+                if not method:
+                    method = body.get("method", "")
+                    params = body.get("params", {})
+                try:
+                    self._respond(200, prover.handle(method, params))
+                except KeyError:
+                    self._respond(404, {"error": f"Unknown method {method}"})
+                except Exception as e:
+                    self._respond(400, {"error": str(e)})
+
+            def do_GET(self):
+                self._dispatch({})
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length)) if length else {}
+                self._dispatch(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(
+            target=self.server.serve_forever, name="stub-prover", daemon=True
+        )
+        self.thread.start()
+        bt.logging.info(f"Stub prover listening on {self.host}:{self.port}")
+
+    def stop(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+
+class StubClient(Client):
+    """
+    A `fourier.Client` backed by an in-process `StubProver` instead of the prover binary.
+    """
+
+    def __init__(
+        self,
+        port: int = 1337,
+        latency: Union[float, Dict[str, float]] = 0.0,
+        seed: int = 0,
+        **kwargs,
+    ):
+        super().__init__(port=port, **kwargs)
+        self.stub_port = port
+        self.stub_latency = latency
+        self.stub_seed = seed
+        self.stub: Optional[StubProver] = None
+
+    def start(self, scale: int, machines_scale: int):
+        self.stub = StubProver(
+            port=self.stub_port,
+            scale=scale,
+            machines_scale=machines_scale,
+            latency=self.stub_latency,
+            seed=self.stub_seed,
+        )
+        self.stub.start()
+
+    def stop(self):
+        if self.stub is not None:
+            self.stub.stop()
+            self.stub = None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the stand-in prover server.")
+    parser.add_argument("--host", type=str, default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=1337)
+    parser.add_argument("--scale", type=int, default=6)
+    parser.add_argument("--machines-scale", type=int, default=2)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args, _ = parser.parse_known_args()
+
+    prover = StubProver(
+        host=args.host,
+        port=args.port,
+        scale=args.scale,
+        machines_scale=args.machines_scale,
+        latency=args.latency,
+        seed=args.seed,
+    )
+    prover.start()
+    try:
+        prover.thread.join()
+    except KeyboardInterrupt:
+        prover.stop()
@@ -80,3 +80,17 @@ def get_random_uids(
         )
     uids = np.array(random.sample(available_uids, k))
     return uids
+
+
+def get_available_uids(self) -> List[int]:
+    """Returns all available uids in the metagraph.
+    Returns:
+        uids (List[int]): The uids that pass `check_uid_availability`.
+    """
+    return [
+        uid
+        for uid in range(self.metagraph.n.item())
+        if check_uid_availability(
+            self.metagraph, uid, self.config.neuron.vpermit_tao_limit
+        )
+    ]